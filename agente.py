@@ -2,309 +2,58 @@
 # -------------------------------------------
 # Agente de VR (LangChain + Tools pandas) – inteligência por ferramentas genéricas
 # -------------------------------------------
+# Inicialização preguiçosa: importar este módulo NÃO carrega LangChain nem cria
+# o modelo/agente. Tudo é construído no primeiro uso e memoizado (_llm, _tools,
+# _agente). As ferramentas pandas vivem em ferramentas.py e podem ser usadas
+# sozinhas (app, ETL, scripts) sem custo de inicialização.
 
 import os
 import json
-import yaml
-import pandas as pd
+import time
+import asyncio
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
 
-import warnings
-warnings.filterwarnings("ignore", category=DeprecationWarning, module="langchain")
-
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain.agents import initialize_agent, AgentType
-from langchain.tools import tool
+from cache_respostas import CacheRespostas, versao_dataset
+from ferramentas import (
+    REGRAS_YAML_PATH,
+    result_path,
+    carregar_result,
+    _normalizar_pergunta,
+    rotear_pergunta,
+    schema_info,
+    aggregate,
+    group_aggregate,
+    vr_por_matricula,
+    analise_zerados,
+    regras_resumo,
+    gerar_arquivo_layout,
+)
+from recuperacao import busca_semantica
 
 load_dotenv()
 
 # --------- Config ---------
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
 CHAT_MODEL = os.getenv("CHAT_MODEL", "gpt-4o-mini").strip()
-EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small").strip()
-REGRAS_YAML_PATH = os.getenv("REGRAS_YAML", "./regras.yml")
-
-if not OPENAI_API_KEY:
-    raise RuntimeError("Defina OPENAI_API_KEY no .env")
-if not os.path.exists(REGRAS_YAML_PATH):
-    raise FileNotFoundError(f"Arquivo de regras não encontrado: {REGRAS_YAML_PATH}")
-
-with open(REGRAS_YAML_PATH, "r", encoding="utf-8") as f:
-    REGRAS = yaml.safe_load(f)
-
-RESULT_XLSX = REGRAS["arquivos"]["result_xlsx"]
-
-# --------- Modelos ---------
-llm = ChatOpenAI(model=CHAT_MODEL, temperature=0)
-emb = OpenAIEmbeddings(model=EMBEDDING_MODEL)  # reservado para retriever futuro
-
-# --------- Utils ---------
-def _carregar_result() -> pd.DataFrame:
-    """Carrega o RESULT e normaliza colunas numéricas/chave."""
-    df = pd.read_excel(RESULT_XLSX, engine="openpyxl")
-    for col in ["VR_COLAB", "VR_EMPRESA", "VR_PROFISSIONAL", "VALOR_UNITARIO", "DIAS_ELEGIVEIS", "DIAS"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
-    if "MATRICULA" in df.columns:
-        df["MATRICULA"] = df["MATRICULA"].astype(str).str.strip()
-    return df
-
-def _fmt(v: float) -> str:
-    """Formata moeda pt-BR."""
-    return f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-def _safe_str(x):
-    return "—" if x is None or (isinstance(x, float) and pd.isna(x)) else str(x)
-
-def _apply_filters(df: pd.DataFrame, filters_json: str) -> pd.DataFrame:
-    """
-    Aplica filtros no formato JSON, ex.:
-    [
-      {"col":"VR_COLAB","op":">","value":0},
-      {"col":"SINDICATO","op":"in","value":["SINDPD RJ","SINDPD SP"]}
-    ]
-    Ops suportados: ==, !=, >, >=, <, <=, in, not_in
-    """
-    if not filters_json:
-        return df
-    try:
-        flt = json.loads(filters_json)
-    except Exception:
-        return df
-    if not isinstance(flt, list):
-        return df
-
-    out = df.copy()
-    for cond in flt:
-        col, op, val = cond.get("col"), cond.get("op"), cond.get("value")
-        if col not in out.columns:  # ignora filtros inválidos
-            continue
-        series = out[col]
-        if op == "==":
-            out = out[series == val]
-        elif op == "!=":
-            out = out[series != val]
-        elif op == ">":
-            out = out[pd.to_numeric(series, errors="coerce") > float(val)]
-        elif op == ">=":
-            out = out[pd.to_numeric(series, errors="coerce") >= float(val)]
-        elif op == "<":
-            out = out[pd.to_numeric(series, errors="coerce") < float(val)]
-        elif op == "<=":
-            out = out[pd.to_numeric(series, errors="coerce") <= float(val)]
-        elif op == "in":
-            out = out[series.astype(str).isin([str(x) for x in (val if isinstance(val, list) else [val])])]
-        elif op == "not_in":
-            out = out[~series.astype(str).isin([str(x) for x in (val if isinstance(val, list) else [val])])]
-    return out
-
-# --------- Ferramentas genéricas ---------
-@tool
-def schema_info(_: str = "") -> str:
-    """Retorna o esquema disponível (colunas) e sinônimos úteis.
-    JSON: {"ok":true,"colunas":[...],"sugestoes":{"destinatarios":"SINDICATO","funcionario":"MATRICULA"}}"""
-    df = _carregar_result()
-    sugestoes = {
-        "destinatarios": "SINDICATO",
-        "sindicatos": "SINDICATO",
-        "colaborador": "MATRICULA",
-        "funcionario": "MATRICULA",
-        "valor unitario": "VALOR_UNITARIO",
-        "valor diario": "VALOR_UNITARIO",
-        "total colaborador": "VR_COLAB",
-        "custo empresa": "VR_EMPRESA",
-        "desconto profissional": "VR_PROFISSIONAL",
-    }
-    return json.dumps({"ok": True, "colunas": list(df.columns), "sugestoes": sugestoes}, ensure_ascii=False)
-
-@tool
-def aggregate(op: str, column: str, filters_json: str = "", positive_only: bool = False) -> str:
-    """Agrega uma coluna (sum|mean|min|max|count) com filtros opcionais.
-    Args:
-      op: 'sum'|'mean'|'min'|'max'|'count'
-      column: alvo da agregação (para count pode ser qualquer coluna existente)
-      filters_json: ver _apply_filters docstring
-      positive_only: se True, ignora valores <= 0 (útil para média de quem recebeu VR)
-    Retorna JSON: {"ok":true,"op":"sum","column":"VR_COLAB","valor":<float>,"fmt":"R$ ...","denominador":<int>}
-    """
-    df = _apply_filters(_carregar_result(), filters_json)
-    if column not in df.columns:
-        return json.dumps({"ok": False, "erro": f"Coluna {column} ausente."}, ensure_ascii=False)
-
-    s = pd.to_numeric(df[column], errors="coerce")
-    if positive_only:
-        s = s[s > 0]
-
-    if op == "sum":
-        val = float(s.sum())
-        return json.dumps({"ok": True, "op": op, "column": column, "valor": val, "fmt": _fmt(val)}, ensure_ascii=False)
-    if op == "mean":
-        denom = int(s.count())
-        media = float(s.mean()) if denom > 0 else 0.0
-        return json.dumps({"ok": True, "op": op, "column": column, "valor": media, "fmt": _fmt(media), "denominador": denom}, ensure_ascii=False)
-    if op == "min":
-        v = float(s.min()) if len(s) else 0.0
-        return json.dumps({"ok": True, "op": op, "column": column, "valor": v, "fmt": _fmt(v)}, ensure_ascii=False)
-    if op == "max":
-        v = float(s.max()) if len(s) else 0.0
-        return json.dumps({"ok": True, "op": op, "column": column, "valor": v, "fmt": _fmt(v)}, ensure_ascii=False)
-    if op == "count":
-        return json.dumps({"ok": True, "op": op, "column": column, "valor": int(s.count())}, ensure_ascii=False)
-    return json.dumps({"ok": False, "erro": f"Operação {op} inválida."}, ensure_ascii=False)
-
-@tool("gerar_arquivo_layout")
-def gerar_arquivo_layout(_: str = "") -> str:
-    """Gera o XLSX final conforme regras.yml/layout e devolve o caminho salvo."""
-    try:
-        with open(REGRAS_YAML_PATH, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f)
-
-        result_path = cfg["arquivos"]["result_xlsx"]
-        layout = cfg["layout"]
-        export_cols = layout.get("export_columns", [])
-        mapping = layout.get("mapping", {})
-        out_path = layout.get("arquivo_export", "./data/ETL_OK/VR_MENSAL_EXPORT.xlsx")
-
-        df = pd.read_excel(result_path, engine="openpyxl")
-
-        out = pd.DataFrame()
-        for col in export_cols:
-            src = mapping.get(col, {})
-            if "from" in src and src["from"] in df.columns:
-                out[col] = df[src["from"]]
-            else:
-                out[col] = src.get("default", "")
-
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        out.to_excel(out_path, index=False)
-
-        return json.dumps(
-            {"ok": True, "path": out_path, "linhas": int(len(out)), "colunas": list(out.columns)},
-            ensure_ascii=False
-        )
-    except Exception as e:
-        return json.dumps({"ok": False, "erro": str(e)}, ensure_ascii=False)
-
-
-@tool
-def group_aggregate(op: str, target: str, group_by: str, k: int = 5, order: str = "desc", filters_json: str = "") -> str:
-    """Agrega por grupo e devolve TOP-K (ou todos se k<=0).
-    Args:
-      op: 'sum'|'mean'|'min'|'max'
-      target: coluna a agregar (ex.: 'VR_COLAB')
-      group_by: coluna de agrupamento (ex.: 'MATRICULA' ou 'SINDICATO')
-      k: quantidade de itens (1 para “quem foi o maior”)
-      order: 'desc' ou 'asc'
-      filters_json: filtros opcionais
-    Retorna JSON: {"ok":true,"itens":[{"grupo":"...", "valor":<float>, "fmt":"R$ ...", "matricula":"...", "nome":"..."}]}
-    """
-    df = _apply_filters(_carregar_result(), filters_json)
-    for c in [target, group_by]:
-        if c not in df.columns:
-            return json.dumps({"ok": False, "erro": f"Coluna {c} ausente."}, ensure_ascii=False)
-
-    s = pd.to_numeric(df[target], errors="coerce").fillna(0.0)
-    grp = df.copy()
-    grp[target] = s
-    if op == "sum":
-        agg = grp.groupby(group_by, as_index=False)[target].sum()
-    elif op == "mean":
-        agg = grp.groupby(group_by, as_index=False)[target].mean()
-    elif op == "min":
-        agg = grp.groupby(group_by, as_index=False)[target].min()
-    elif op == "max":
-        agg = grp.groupby(group_by, as_index=False)[target].max()
-    else:
-        return json.dumps({"ok": False, "erro": f"Operação {op} inválida."}, ensure_ascii=False)
-
-    agg = agg.sort_values(target, ascending=(order == "asc"))
-    if k and k > 0:
-        agg = agg.head(int(k))
-
-    itens = []
-    for _, r in agg.iterrows():
-        item = {"grupo": _safe_str(r[group_by]), "valor": float(r[target]), "fmt": _fmt(float(r[target]))}
-        # enriquecimento para matrícula/nome
-        if group_by.upper() == "MATRICULA":
-            mat = str(r[group_by])
-            item["matricula"] = mat
-            if "NOME" in df.columns:
-                n = df[df["MATRICULA"] == mat]["NOME"].dropna()
-                if not n.empty:
-                    item["nome"] = str(n.iloc[0])
-        itens.append(item)
-
-    return json.dumps({"ok": True, "itens": itens}, ensure_ascii=False)
-
-@tool
-def vr_por_matricula(matricula: str) -> str:
-    """Consulta detalhada por matrícula; soma valores se houver múltiplas linhas.
-    JSON: {ok, matricula, nome?, sindicato?, fmt_vr_colaborador, fmt_vr_empresa, fmt_vr_profissional}"""
-    df = _carregar_result()
-    if "MATRICULA" not in df.columns:
-        return json.dumps({"ok": False, "erro": "MATRICULA ausente."}, ensure_ascii=False)
-
-    mat = str(matricula).strip()
-    dfm = df[df["MATRICULA"] == mat]
-    if dfm.empty:
-        return json.dumps({"ok": False, "erro": f"Matrícula {mat} não encontrada."}, ensure_ascii=False)
-
-    vr_colab = float(dfm.get("VR_COLAB", 0).sum())
-    vr_emp   = float(dfm.get("VR_EMPRESA", 0).sum())
-    vr_prof  = float(dfm.get("VR_PROFISSIONAL", 0).sum())
-
-    nome = None
-    if "NOME" in dfm.columns:
-        nn = dfm["NOME"].dropna()
-        if not nn.empty: nome = str(nn.iloc[0])
-    sindicato = None
-    if "SINDICATO" in dfm.columns and not dfm["SINDICATO"].isna().all():
-        sindicato = str(dfm["SINDICATO"].iloc[0])
-
-    return json.dumps({
-        "ok": True,
-        "matricula": mat,
-        "nome": nome,
-        "sindicato": sindicato,
-        "vr_colaborador": vr_colab, "fmt_vr_colaborador": _fmt(vr_colab),
-        "vr_empresa": vr_emp,       "fmt_vr_empresa": _fmt(vr_emp),
-        "vr_profissional": vr_prof, "fmt_vr_profissional": _fmt(vr_prof),
-    }, ensure_ascii=False)
-
-@tool
-def analise_zerados(_: str = "") -> str:
-    """Conta VR zerado e aponta possíveis causas (heurísticas).
-    JSON: {"ok": true, "qtd_zerados": <int>, "causas": [{"causa":"...", "qtd": <int>}]}"""
-    df = _carregar_result()
-    if "VR_COLAB" not in df.columns:
-        return json.dumps({"ok": False, "erro": "VR_COLAB ausente."}, ensure_ascii=False)
-    base = df[df["VR_COLAB"] == 0]
-    qtd = int(len(base))
-    causas = []
-    if "DIAS_ELEGIVEIS" in base.columns:
-        causas.append({"causa": "Dias elegíveis = 0", "qtd": int((base["DIAS_ELEGIVEIS"] == 0).sum())})
-    if "VALOR_UNITARIO" in base.columns:
-        causas.append({"causa": "Valor unitário = 0", "qtd": int((base["VALOR_UNITARIO"] == 0).sum())})
-    return json.dumps({"ok": True, "qtd_zerados": qtd, "causas": causas}, ensure_ascii=False)
-
-@tool
-def regras_resumo(_: str = "") -> str:
-    """Resumo das regras do YAML (split 80/20 e desligamento).
-    JSON: {"ok":true,"empresa_pct":0.8,"prof_pct":0.2,"texto":"..."}"""
-    try:
-        with open(REGRAS_YAML_PATH, "r", encoding="utf-8") as f:
-            R = yaml.safe_load(f)
-        P = R.get("parametros", {})
-        split = P.get("split_percentual", {"empresa": 0.80, "profissional": 0.20})
-        reg  = P.get("regra_desligamento", {"ate_dia_15_paga": False, "acima_dia_15_proporcional": True})
-        texto = []
-        texto.append("Desligamento no mês:")
-        texto.append("- Até o dia 15: não paga VR." if not reg.get("ate_dia_15_paga", False) else "- Até o dia 15: paga.")
-        texto.append("- Após o dia 15: proporcional." if reg.get("acima_dia_15_proporcional", True) else "- Após o dia 15: integral.")
-        return json.dumps({"ok": True, "empresa_pct": float(split.get("empresa", 0.8)),
-                           "prof_pct": float(split.get("profissional", 0.2)), "texto": " ".join(texto)}, ensure_ascii=False)
-    except Exception as e:
-        return json.dumps({"ok": False, "erro": f"Falha ao ler regras.yml: {e}"}, ensure_ascii=False)
+CACHE_RESPOSTAS_MAX = int(os.getenv("CACHE_RESPOSTAS_MAX", "256"))
+CACHE_RESPOSTAS_TTL = float(os.getenv("CACHE_RESPOSTAS_TTL", str(6 * 3600)))  # segundos; 0 = sem expiração
+CACHE_RESPOSTAS_ARQUIVO = os.getenv("CACHE_RESPOSTAS_ARQUIVO", "./data/ETL_OK/_cache/respostas.json").strip()
+MAX_LLM_CONCORRENTES = int(os.getenv("AGENTE_MAX_LLM_CONCORRENTES", "4"))  # chamadas simultâneas ao LLM (modo async)
+MAX_PASSOS_AGENTE = int(os.getenv("AGENTE_MAX_PASSOS", "6"))               # rodadas LLM→tools por pergunta
+AGENTE_PAROU = "Agent stopped due to iteration limit or time limit."        # saída do AgentExecutor no limite
+
+# Funções expostas ao LLM como tools (ordem = ordem apresentada ao modelo)
+FUNCOES_TOOLS = [
+    schema_info,
+    aggregate,
+    group_aggregate,
+    vr_por_matricula,
+    analise_zerados,
+    regras_resumo,
+    gerar_arquivo_layout,
+    busca_semantica,
+]
 
 # --------- SYSTEM_PROMPT (intenção → ferramenta) ---------
 SYSTEM_PROMPT = """
@@ -335,44 +84,231 @@ ROTEAMENTO DE INTENÇÃO
 - "quantos com VR zerado e por quê" → analise_zerados
 - "regra do dia 15 / proporcional / percentuais" → regras_resumo
 - "VR da matrícula 12345" → vr_por_matricula("12345")
+- perguntas abertas/descritivas sobre registros ("quem do sindicato X com poucos dias", "casos parecidos com ...")
+  → busca_semantica(consulta, k, filters_json) — os hits são exemplos, não totais
+- cláusulas das convenções coletivas ("o que a CCT do SINDPD SP diz sobre VR", "valor do dia na convenção do RS")
+  → busca_semantica(consulta, k, filters_json, fonte="CCT") — cite arquivo e página
 
 ESTILO
 - Português formal e direto. Liste coleções em linhas: "MATRÍCULA – Nome: R$ ...".
 - Combine varias tools quando a pergunta pedir múltiplos números.
 """
 
-# --------- Agente ---------
-TOOLS = [
-    schema_info,
-    aggregate,
-    group_aggregate,
-    vr_por_matricula,
-    analise_zerados,
-    regras_resumo,
-    gerar_arquivo_layout,
-]
-
-agent = initialize_agent(
-    TOOLS,
-    llm,
-    agent=AgentType.OPENAI_FUNCTIONS,
-    verbose=False,
-    handle_parsing_errors=True,
-    agent_kwargs={"system_message": SYSTEM_PROMPT},
+# --------- Construção preguiçosa (memoizada) ---------
+_INIT_LOCK = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _llm():
+    """ChatOpenAI criado no primeiro uso; exige OPENAI_API_KEY só neste momento."""
+    if not os.getenv("OPENAI_API_KEY", "").strip():
+        raise RuntimeError("Defina OPENAI_API_KEY no .env")
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=CHAT_MODEL, temperature=0)
+
+@lru_cache(maxsize=1)
+def _tools() -> list:
+    """Embrulha FUNCOES_TOOLS como tools LangChain (nome/descrição vêm da função)."""
+    from langchain.tools import tool
+    return [tool(f) for f in FUNCOES_TOOLS]
+
+@lru_cache(maxsize=1)
+def _tools_por_nome() -> dict:
+    return {t.name: t for t in _tools()}
+
+def _agente():
+    """AgentExecutor (OPENAI_FUNCTIONS) construído uma única vez, mesmo com várias threads."""
+    with _INIT_LOCK:
+        return _agente_memo()
+
+@lru_cache(maxsize=1)
+def _agente_memo():
+    import warnings
+    warnings.filterwarnings("ignore", category=DeprecationWarning, module="langchain")
+    from langchain.agents import initialize_agent, AgentType
+    return initialize_agent(
+        _tools(),
+        _llm(),
+        agent=AgentType.OPENAI_FUNCTIONS,
+        verbose=False,
+        handle_parsing_errors=True,
+        agent_kwargs={"system_message": SYSTEM_PROMPT},
+    )
+
+def __getattr__(nome: str):
+    """Compatibilidade: `agente.llm`, `agente.agent` e `agente.TOOLS` continuam acessíveis (sob demanda)."""
+    if nome == "llm":
+        return _llm()
+    if nome == "agent":
+        return _agente()
+    if nome == "TOOLS":
+        return _tools()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+# --------- Cache de respostas ---------
+cache_respostas = CacheRespostas(
+    max_itens=CACHE_RESPOSTAS_MAX,
+    ttl=CACHE_RESPOSTAS_TTL,
+    arquivo=CACHE_RESPOSTAS_ARQUIVO or None,
 )
 
+def estatisticas_cache() -> dict:
+    """Hits/misses do cache de respostas (para monitoramento)."""
+    return cache_respostas.estatisticas()
+
 def responder_pergunta(pergunta: str) -> str:
-    """Invoca o agente e devolve apenas o texto final (com fallback em caso de erro)."""
+    """Consulta o cache; depois o roteador determinístico; por fim o agente (LLM).
+    Só respostas bem-sucedidas entram no cache."""
+    q = _normalizar_pergunta(pergunta)
+    versao = versao_dataset(result_path(), REGRAS_YAML_PATH)
+    cached = cache_respostas.obter(q, versao)
+    if cached is not None:
+        return cached
+
+    rota = rotear_pergunta(pergunta)
+    if rota is not None:
+        if rota["ok"]:
+            cache_respostas.guardar(q, versao, rota["resposta"])
+        return rota["resposta"]
     try:
-        resp = agent.invoke({"input": pergunta})
-        return resp["output"] if isinstance(resp, dict) and "output" in resp else str(resp)
+        resp = _agente().invoke({"input": pergunta})
+        saida = resp["output"] if isinstance(resp, dict) and "output" in resp else str(resp)
     except Exception as e:
         return f"Ocorreu um erro ao processar a pergunta. Detalhe técnico: {e}"
+    if saida.strip() != AGENTE_PAROU:
+        cache_respostas.guardar(q, versao, saida)
+    return saida
+
+# --------- API assíncrona ---------
+def _modelo_com_tools(modelo):
+    """Liga as tools ao modelo; modelos fake sem bind_tools são usados como estão."""
+    try:
+        return modelo.bind_tools(_tools())
+    except NotImplementedError:
+        return modelo
+
+async def _aexecutar_tool(chamada: dict):
+    from langchain_core.messages import ToolMessage
+    ferramenta = _tools_por_nome().get(chamada["name"])
+    if ferramenta is None:
+        conteudo = json.dumps({"ok": False, "erro": f"Tool {chamada['name']} inexistente."}, ensure_ascii=False)
+    else:
+        try:
+            conteudo = await asyncio.to_thread(ferramenta.invoke, chamada.get("args") or {})
+        except Exception as e:
+            conteudo = json.dumps({"ok": False, "erro": str(e)}, ensure_ascii=False)
+    return ToolMessage(content=str(conteudo), tool_call_id=chamada.get("id") or chamada["name"])
+
+async def _aexecutar_llm(pergunta: str, modelo, semaforo: asyncio.Semaphore) -> tuple[str, list[str], bool]:
+    """Laço LLM→tools com ainvoke. Todas as tool calls de uma rodada são independentes
+    entre si e rodam em paralelo (threads) sobre o mesmo RESULT em memória.
+    Retorna (texto, tools usadas, ok); ok=False quando estoura MAX_PASSOS_AGENTE."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+    mensagens = [SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=pergunta)]
+    usadas: list[str] = []
+    for _ in range(MAX_PASSOS_AGENTE):
+        async with semaforo:
+            ai = await modelo.ainvoke(mensagens)
+        mensagens.append(ai)
+        chamadas = getattr(ai, "tool_calls", None) or []
+        if not chamadas:
+            return str(ai.content), usadas, True
+        usadas.extend(c["name"] for c in chamadas)
+        mensagens.extend(await asyncio.gather(*(_aexecutar_tool(c) for c in chamadas)))
+    return "Não consegui concluir a resposta no limite de passos do agente.", usadas, False
+
+async def aresponder_detalhado(pergunta: str, *, modelo=None, semaforo: asyncio.Semaphore | None = None) -> dict:
+    """Versão assíncrona de responder_pergunta com metadados.
+    Args:
+      modelo: chat model (com ou sem tools ligadas); padrão é o ChatOpenAI de _llm().
+              Em testes, passe um fake que devolva AIMessage com tool_calls.
+      semaforo: limita chamadas simultâneas ao LLM (compartilhado em lotes).
+    Retorna {"pergunta","resposta","origem":"cache|roteador|llm|erro","ferramentas":[...],"latencia_s"}."""
+    t0 = time.perf_counter()
+    semaforo = semaforo or asyncio.Semaphore(MAX_LLM_CONCORRENTES)
+    q = _normalizar_pergunta(pergunta)
+    versao = await asyncio.to_thread(versao_dataset, result_path(), REGRAS_YAML_PATH)
+
+    def _saida(resposta: str, origem: str, ferramentas: list[str]) -> dict:
+        return {"pergunta": pergunta, "resposta": resposta, "origem": origem,
+                "ferramentas": ferramentas, "latencia_s": round(time.perf_counter() - t0, 4)}
+
+    cached = cache_respostas.obter(q, versao)
+    if cached is not None:
+        return _saida(cached, "cache", [])
+
+    rota = await asyncio.to_thread(rotear_pergunta, pergunta)
+    if rota is not None:
+        if rota["ok"]:
+            cache_respostas.guardar(q, versao, rota["resposta"])
+        return _saida(rota["resposta"], "roteador", rota["ferramentas"])
+
+    try:
+        resposta, usadas, ok = await _aexecutar_llm(pergunta, _modelo_com_tools(modelo or _llm()), semaforo)
+    except Exception as e:
+        return _saida(f"Ocorreu um erro ao processar a pergunta. Detalhe técnico: {e}", "erro", [])
+    if ok:
+        cache_respostas.guardar(q, versao, resposta)
+    return _saida(resposta, "llm", usadas)
+
+async def aresponder_pergunta(pergunta: str, *, modelo=None) -> str:
+    """Equivalente assíncrono de responder_pergunta (apenas o texto final)."""
+    return (await aresponder_detalhado(pergunta, modelo=modelo))["resposta"]
+
+async def aresponder_lote(perguntas: list[str], *, modelo=None, max_llm: int = MAX_LLM_CONCORRENTES) -> list[dict]:
+    """Responde várias perguntas em paralelo (no máximo `max_llm` chamadas ao LLM ao mesmo tempo).
+    Mantém a ordem de entrada."""
+    semaforo = asyncio.Semaphore(max(1, max_llm))
+    await asyncio.to_thread(carregar_result)  # uma única leitura do RESULT para o lote todo
+    return list(await asyncio.gather(*(aresponder_detalhado(p, modelo=modelo, semaforo=semaforo) for p in perguntas)))
+
+# --------- Modo lote (CLI) ---------
+def ler_perguntas(path: str) -> list[str]:
+    """Lê perguntas de .txt (uma por linha; '#' comenta) ou .json (lista de strings)."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            return [str(p).strip() for p in json.load(f) if str(p).strip()]
+        return [ln.strip() for ln in f if ln.strip() and not ln.lstrip().startswith("#")]
+
+def gravar_relatorio(linhas: list[dict], path: str) -> None:
+    """Relatório por pergunta (resposta, origem, tools, latência) em .json ou .csv."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.lower().endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(linhas, f, ensure_ascii=False, indent=2)
+        return
+    import csv
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:  # utf-8-sig: abre certo no Excel
+        w = csv.DictWriter(f, fieldnames=["pergunta", "resposta", "origem", "ferramentas", "latencia_s"], delimiter=";")
+        w.writeheader()
+        for ln in linhas:
+            w.writerow({**ln, "ferramentas": ", ".join(ln["ferramentas"])})
+
+def rodar_lote(entrada: str, saida: str, concorrencia: int = MAX_LLM_CONCORRENTES) -> list[dict]:
+    """Responde todas as perguntas do arquivo (RESULT lido uma vez) e grava o relatório."""
+    perguntas = ler_perguntas(entrada)
+    t0 = time.perf_counter()
+    linhas = asyncio.run(aresponder_lote(perguntas, max_llm=concorrencia))
+    gravar_relatorio(linhas, saida)
+    por_origem: dict[str, int] = {}
+    for ln in linhas:
+        por_origem[ln["origem"]] = por_origem.get(ln["origem"], 0) + 1
+    print(f"[OK] {len(linhas)} perguntas em {time.perf_counter() - t0:.2f}s {por_origem} -> {saida}")
+    return linhas
 
 if __name__ == "__main__":
-    print("\n=== Agente VR – pronto. Digite sua pergunta (ou 'sair') ===")
-    while True:
-        q = input("> ").strip()
-        if q.lower() in {"sair", "exit", "quit"}:
-            break
-        print(responder_pergunta(q))
+    import argparse
+    ap = argparse.ArgumentParser(description="Agente de VR: modo interativo (padrão) ou lote.")
+    ap.add_argument("--lote", help="arquivo .txt/.json com as perguntas (ex.: checklist de fechamento)")
+    ap.add_argument("--saida", default="./data/ETL_OK/_reports/respostas_lote.csv", help="relatório .csv ou .json")
+    ap.add_argument("--concorrencia", type=int, default=MAX_LLM_CONCORRENTES, help="máx. chamadas simultâneas ao LLM")
+    args = ap.parse_args()
+
+    if args.lote:
+        rodar_lote(args.lote, args.saida, args.concorrencia)
+    else:
+        print("\n=== Agente VR – pronto. Digite sua pergunta (ou 'sair') ===")
+        while True:
+            q = input("> ").strip()
+            if q.lower() in {"sair", "exit", "quit"}:
+                break
+            print(responder_pergunta(q))
@@ -1,7 +1,11 @@
 # app.py — Dark Pro + Download do EXPORT
 import os, json, yaml, streamlit as st
 from dotenv import load_dotenv
-from agente import responder_pergunta, vr_por_matricula
+from cache_respostas import hash_arquivo, versao_dataset
+from ferramentas import (  # pandas puro (sem LangChain)
+    vr_por_matricula, carregar_result, result_path,
+    montar_export, exportar_bytes, EXPORT_FORMATOS, _fmt,
+)
 
 # ------------- Setup -------------
 load_dotenv()
@@ -9,23 +13,59 @@ st.set_page_config(page_title="Agente de VR", page_icon="🍱", layout="wide")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
 if not OPENAI_API_KEY:
-    st.error("Defina OPENAI_API_KEY no .env")
-    st.stop()
+    st.warning("OPENAI_API_KEY ausente no .env: só perguntas diretas (botões rápidos) e a consulta por matrícula funcionarão.")
 
 REGRAS_YAML_PATH = os.getenv("REGRAS_YAML", "./regras.yml")
 if not os.path.exists(REGRAS_YAML_PATH):
     st.error(f"Arquivo de regras não encontrado: {REGRAS_YAML_PATH}")
     st.stop()
 
-with open(REGRAS_YAML_PATH, "r", encoding="utf-8") as f:
-    REGRAS = yaml.safe_load(f) or {}
+# ------------- Recursos em cache -------------
+# Compartilhados entre sessões e chaveados pelo hash do arquivo: um rerun do Streamlit
+# (qualquer clique) não relê YAML/planilhas; um arquivo novo gera outra chave.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _regras(regras_hash: str) -> dict:
+    with open(REGRAS_YAML_PATH, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
 
-# Caminho do arquivo final (tenta pelas duas chaves usadas no seu YAML)
-export_path = (
-    REGRAS.get("layout", {}).get("arquivo_export")
-    or REGRAS.get("arquivos", {}).get("export_xlsx")
-    or "./data/ETL_OK/VR_MENSAL_EXPORT.xlsx"
-)
+@st.cache_resource(show_spinner="Carregando RESULT...", max_entries=2)
+def _result_frame(result_hash: str):
+    """RESULT tipado (somente leitura) — o mesmo objeto usado pelas ferramentas."""
+    return carregar_result()
+
+@st.cache_resource(show_spinner="Calculando agregados...", max_entries=2)
+def _painel(result_hash: str):
+    """Agregados + índices da grade do dashboard, uma vez por versão do RESULT."""
+    from painel import PainelResult
+    return PainelResult(_result_frame(result_hash))
+
+@st.cache_resource(show_spinner="Indexando matrículas e nomes...", max_entries=2)
+def _indice(result_hash: str):
+    """Índice de prefixo (matrícula/nome) do RESULT, uma vez por versão (sobre o frame DESSA versão)."""
+    from indice_busca import IndicePrefixo
+    return IndicePrefixo(_result_frame(result_hash))
+
+@st.cache_data(show_spinner="Gerando arquivo...", max_entries=16)
+def _export(result_hash: str, regras_hash: str, competencia: str,
+            sindicatos: tuple, ufs: tuple, formato: str) -> tuple[bytes, int]:
+    """Bytes do export por (versão do dataset, competência, filtros, formato)."""
+    filtros = []
+    if sindicatos:
+        filtros.append({"col": "SINDICATO", "op": "in", "value": list(sindicatos)})
+    if ufs:
+        filtros.append({"col": "UF_BASE", "op": "in", "value": list(ufs)})
+    out = montar_export(_result_frame(result_hash), _regras(regras_hash), competencia,
+                        json.dumps(filtros, ensure_ascii=False) if filtros else "")
+    return exportar_bytes(out, formato), len(out)
+
+@st.cache_resource(show_spinner=False)
+def _executor():
+    """Fila única do pipeline (compartilhada entre sessões: um fechamento por vez)."""
+    from jobs import ExecutorPipeline
+    ex = ExecutorPipeline()
+    # Ao concluir, solta as versões antigas da memória; as novas entram pela troca de hash no próximo rerun.
+    ex.ao_concluir(lambda job: (_result_frame.clear(), _painel.clear(), _indice.clear(), _export.clear()))
+    return ex
 
 # ------------- Estilo -------------
 st.markdown("""
@@ -82,86 +122,217 @@ st.markdown(
 )
 st.markdown('<div class="headerline"></div>', unsafe_allow_html=True)
 
-left, right = st.columns(2)
+try:
+    result_hash = hash_arquivo(result_path())
+    df_result = _result_frame(result_hash)
+    st.markdown(
+        f"<div class='hint'>Base: {len(df_result):,} linhas · versão ".replace(",", ".")
+        + f"<code>{versao_dataset(result_path(), REGRAS_YAML_PATH)}</code></div>",
+        unsafe_allow_html=True,
+    )
+except Exception as e:
+    df_result = None
+    st.warning(f"RESULT indisponível ({e}). Execute o ETL (scripts/VR.py).")
 
-# ------------- Coluna Esquerda: Chat -------------
-with left:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown("### 🤖 Chat do Agente")
+aba_agente, aba_painel, aba_pipeline = st.tabs(["🤖 Agente", "📊 Dashboard", "⚙️ Pipeline"])
 
-    c1,c2,c3,c4,c5 = st.columns(5)
-    if c1.button("Custo total"): st.session_state["q"] = "Qual o custo total da empresa?"
-    if c2.button("VR médio"):   st.session_state["q"] = "Mostre o valor médio de VR por colaborador neste mês."
-    if c3.button("Top 5 VR"):   st.session_state["q"] = "Liste os 5 colaboradores com os maiores valores de VR, com matrícula e valor."
-    if c4.button("Zerados"):    st.session_state["q"] = "Quantos colaboradores estão com VR zerado e por quê?"
-    if c5.button("Regra 15"):   st.session_state["q"] = "Como ficou o cálculo para desligados até e após o dia 15?"
+# ================= Aba: Agente =================
+with aba_agente:
+    left, right = st.columns(2)
 
-    pergunta = st.text_input(
-        "Pergunte em linguagem natural",
-        value=st.session_state.get("q",""),
-        placeholder="Ex.: 'Qual o custo total da empresa?' ou 'Qual o VR da matrícula 12345?'"
-    )
+    # ------------- Coluna Esquerda: Chat -------------
+    with left:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("### 🤖 Chat do Agente")
+
+        c1,c2,c3,c4,c5 = st.columns(5)
+        if c1.button("Custo total"): st.session_state["q"] = "Qual o custo total da empresa?"
+        if c2.button("VR médio"):   st.session_state["q"] = "Mostre o valor médio de VR por colaborador neste mês."
+        if c3.button("Top 5 VR"):   st.session_state["q"] = "Liste os 5 colaboradores com os maiores valores de VR, com matrícula e valor."
+        if c4.button("Zerados"):    st.session_state["q"] = "Quantos colaboradores estão com VR zerado e por quê?"
+        if c5.button("Regra 15"):   st.session_state["q"] = "Como ficou o cálculo para desligados até e após o dia 15?"
+
+        pergunta = st.text_input(
+            "Pergunte em linguagem natural",
+            value=st.session_state.get("q",""),
+            placeholder="Ex.: 'Qual o custo total da empresa?' ou 'Qual o VR da matrícula 12345?'"
+        )
 
-    if st.button("Perguntar ao agente", type="primary", use_container_width=True):
-        if not pergunta.strip():
-            st.warning("Digite uma pergunta.")
+        if st.button("Perguntar ao agente", type="primary", use_container_width=True):
+            if not pergunta.strip():
+                st.warning("Digite uma pergunta.")
+            else:
+                with st.spinner("Calculando..."):
+                    import agente  # só no 1º uso; LLM/AgentExecutor são criados sob demanda lá dentro
+                    saida = agente.responder_pergunta(pergunta.strip())
+                st.markdown("##### Resposta")
+                st.markdown(f"<div class='resp'>{saida.replace(chr(10), '<br>')}</div>", unsafe_allow_html=True)
+
+        # 📦 Export montado em memória a partir do RESULT em cache (nada é gravado em disco)
+        st.markdown("#### 📦 Arquivo final (layout da operadora)")
+        if df_result is None:
+            st.markdown("<div class='hint'>RESULT não encontrado. Execute o ETL (scripts/VR.py).</div>", unsafe_allow_html=True)
         else:
-            with st.spinner("Calculando..."):
-                saida = responder_pergunta(pergunta.strip())
-            st.markdown("##### Resposta")
-            st.markdown(f"<div class='resp'>{saida}</div>", unsafe_allow_html=True)
-
-    # 🔽 Se o arquivo final existir, mostra botão de download
-    st.markdown("#### 📦 Arquivo final (layout da operadora)")
-    if os.path.exists(export_path):
-        st.markdown(f"<div class='hint'>Disponível em: <code>{export_path}</code></div>", unsafe_allow_html=True)
-        try:
-            with open(export_path, "rb") as f:
+            painel_exp = _painel(result_hash)
+            e1, e2 = st.columns([2, 1])
+            competencia = e1.text_input("Competência", placeholder="Ex.: 05/2025", key="exp_comp")
+            formato = e2.selectbox("Formato", list(EXPORT_FORMATOS), key="exp_fmt")
+            e3, e4 = st.columns(2)
+            exp_sind = e3.multiselect("Sindicatos (vazio = todos)", painel_exp.opcoes("SINDICATO"), key="exp_sind")
+            exp_uf = e4.multiselect("UF (vazio = todas)", painel_exp.opcoes("UF_BASE"), key="exp_uf")
+            try:
+                dados, linhas = _export(result_hash, hash_arquivo(REGRAS_YAML_PATH), competencia.strip(),
+                                        tuple(exp_sind), tuple(exp_uf), formato)
                 st.download_button(
-                    label="📥 Baixar arquivo final (VR_MENSAL_EXPORT.xlsx)",
-                    data=f,
-                    file_name=os.path.basename(export_path),
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    label=f"📥 Baixar arquivo final (VR_MENSAL_EXPORT.{formato} · {linhas:,} linhas)".replace(",", "."),
+                    data=dados,
+                    file_name=f"VR_MENSAL_EXPORT.{formato}",
+                    mime=EXPORT_FORMATOS[formato],
                     use_container_width=True,
                     key="dl_export"
                 )
-        except Exception as e:
-            st.error(f"Não consegui abrir o arquivo para download: {e}")
-    else:
-        st.markdown("<div class='hint'>Arquivo ainda não encontrado. Gere pelo agente (Q12) ou execute o ETL.</div>", unsafe_allow_html=True)
-
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# ------------- Coluna Direita: Matrícula -------------
-with right:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown("### 🔎 Consulta rápida por matrícula")
-    mat = st.text_input("Matrícula", placeholder="Ex.: 12345")
-    if st.button("Consultar matrícula", use_container_width=True):
-        m = (mat or "").strip()
-        if not m:
-            st.warning("Informe a matrícula.")
+            except Exception as e:
+                st.error(f"Não consegui gerar o arquivo: {e}")
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # ------------- Coluna Direita: Matrícula -------------
+    with right:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("### 🔎 Consulta rápida por matrícula")
+        busca = st.text_input("Matrícula ou nome", placeholder="Ex.: 12345 ou 'maria silva'")
+        m = (busca or "").strip()
+        if df_result is None:
+            st.markdown("<div class='hint'>RESULT não encontrado. Execute o ETL (scripts/VR.py).</div>", unsafe_allow_html=True)
+            sugestoes = []
         else:
-            with st.spinner("Buscando dados..."):
-                try:
-                    raw = vr_por_matricula.run(m)  # ferramenta definida no agente
-                    data = json.loads(raw)
-                except Exception as e:
-                    st.error(f"Erro ao consultar: {e}")
-                    data = {"ok": False}
-
-            if data.get("ok"):
-                st.markdown("##### Resultado")
-                st.markdown(
-                    f"<div class='resp'>"
-                    f"<b>Matrícula:</b> {data.get('matricula')}<br>"
-                    f"<b>Nome:</b> {data.get('nome') or '—'}<br>"
-                    f"<b>Sindicato:</b> {data.get('sindicato') or '—'}<br>"
-                    f"<b>VR (colaborador):</b> {data.get('fmt_vr_colaborador')}<br>"
-                    f"<b>Custo empresa:</b> {data.get('fmt_vr_empresa')}<br>"
-                    f"<b>Desconto profissional:</b> {data.get('fmt_vr_profissional')}"
-                    f"</div>", unsafe_allow_html=True
-                )
+            sugestoes = _indice(result_hash).sugerir(m, limite=10) if m else []
+        if sugestoes:
+            escolha = st.selectbox(
+                f"Sugestões ({len(sugestoes)})", sugestoes,
+                format_func=lambda s: f"{s['matricula']} — {s['nome'] or '—'} ({s['sindicato'] or '—'})",
+            )
+            m = escolha["matricula"]
+        elif m and df_result is not None:
+            st.caption("Nenhuma matrícula ou nome começa com esse texto.")
+        if st.button("Consultar matrícula", use_container_width=True):
+            if not m:
+                st.warning("Informe a matrícula.")
             else:
-                st.error(data.get("erro", "Consulta não retornou resultados."))
-    st.markdown('</div>', unsafe_allow_html=True)
+                with st.spinner("Buscando dados..."):
+                    try:
+                        raw = vr_por_matricula(m)  # ferramenta definida em ferramentas.py
+                        data = json.loads(raw)
+                    except Exception as e:
+                        st.error(f"Erro ao consultar: {e}")
+                        data = {"ok": False}
+
+                if data.get("ok"):
+                    st.markdown("##### Resultado")
+                    st.markdown(
+                        f"<div class='resp'>"
+                        f"<b>Matrícula:</b> {data.get('matricula')}<br>"
+                        f"<b>Nome:</b> {data.get('nome') or '—'}<br>"
+                        f"<b>Sindicato:</b> {data.get('sindicato') or '—'}<br>"
+                        f"<b>VR (colaborador):</b> {data.get('fmt_vr_colaborador')}<br>"
+                        f"<b>Custo empresa:</b> {data.get('fmt_vr_empresa')}<br>"
+                        f"<b>Desconto profissional:</b> {data.get('fmt_vr_profissional')}"
+                        f"</div>", unsafe_allow_html=True
+                    )
+                else:
+                    st.error(data.get("erro", "Consulta não retornou resultados."))
+        st.markdown('</div>', unsafe_allow_html=True)
+
+# ================= Aba: Dashboard =================
+with aba_painel:
+    if df_result is None:
+        st.info("Dashboard indisponível: RESULT não encontrado.")
+    else:
+        painel = _painel(result_hash)
+        k = painel.kpis
+        m1, m2, m3, m4, m5 = st.columns(5)
+        m1.metric("Colaboradores", f"{k['colaboradores']:,}".replace(",", "."))
+        m2.metric("VR total", _fmt(k["vr_total"]))
+        m3.metric("Custo empresa", _fmt(k["custo_empresa"]))
+        m4.metric("VR médio (quem recebe)", _fmt(k["vr_medio"]))
+        m5.metric("VR zerado", f"{k['zerados']:,}".replace(",", "."))
+
+        st.markdown('<div class="headerline"></div>', unsafe_allow_html=True)
+        dims = [d for d in ("EMPRESA", "SINDICATO", "UF_BASE") if d in painel.quebras]
+        if dims:
+            g1, g2 = st.columns([3, 2])
+            with g1:
+                dim = st.radio("Quebra por", dims, horizontal=True, key="painel_dim")
+                quebra = painel.quebras[dim]
+                st.bar_chart(quebra["VR_COLAB"].head(15))
+                st.dataframe(quebra.head(50), use_container_width=True)
+            with g2:
+                st.markdown("##### Distribuição de DIAS_ELEGIVEIS")
+                st.bar_chart(painel.dist_dias)
+
+        # ---- Grade paginada (servidor recorta só a página) ----
+        st.markdown("#### 📋 RESULT")
+        f1, f2, f3, f4 = st.columns(4)
+        filtros = {
+            "EMPRESA": f1.multiselect("Empresa", painel.opcoes("EMPRESA"), key="pf_emp"),
+            "SINDICATO": f2.multiselect("Sindicato", painel.opcoes("SINDICATO"), key="pf_sind"),
+            "UF_BASE": f3.multiselect("UF", painel.opcoes("UF_BASE"), key="pf_uf"),
+            "MATRICULA_PREFIXO": f4.text_input("Matrícula começa com", key="pf_mat"),
+        }
+        o1, o2, o3, o4 = st.columns(4)
+        cols = list(painel.df.columns)
+        ordenar_por = o1.selectbox("Ordenar por", cols, index=cols.index("VR_COLAB") if "VR_COLAB" in cols else 0, key="pg_ord")
+        asc = o2.toggle("Crescente", value=False, key="pg_asc")
+        tamanho = o3.selectbox("Linhas por página", [25, 50, 100, 250], index=1, key="pg_tam")
+        total = painel.contar(filtros)  # a máscara fica memoizada: pagina() abaixo não a refaz
+        n_paginas = max(1, -(-total // tamanho))
+        if st.session_state.get("pg_num", 1) > n_paginas:  # filtro estreitou: volta para a última página
+            st.session_state["pg_num"] = n_paginas
+        pagina = o4.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, key="pg_num")
+        janela, total = painel.pagina(filtros, ordenar_por, asc, pagina, tamanho)
+        st.caption(f"{total:,} linhas após filtros".replace(",", "."))
+        st.dataframe(janela, use_container_width=True, hide_index=True)
+
+# ================= Aba: Pipeline =================
+_fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+@_fragment(run_every=2)
+def _acompanhar_jobs():
+    """Atualiza só este bloco a cada 2s; a UI continua livre enquanto o job roda em segundo plano."""
+    jobs = _executor().jobs(5)
+    if not jobs:
+        st.markdown("<div class='hint'>Nenhum job executado nesta instância.</div>", unsafe_allow_html=True)
+        return
+    for job in jobs:
+        feitas = sum(e["status"] == "ok" for e in job["etapas"])
+        icone = {"na_fila": "⏳", "rodando": "🔄", "ok": "✅", "erro": "❌"}[job["status"]]
+        st.markdown(f"**{icone} Job {job['id']}** — {job['status']}")
+        st.progress(feitas / len(job["etapas"]), text=f"{feitas}/{len(job['etapas'])} etapas")
+        st.dataframe(
+            [{"Etapa": e["nome"], "Status": e["status"], "Tempo (s)": e["duracao_s"], "Código": e["codigo"]}
+             for e in job["etapas"]],
+            use_container_width=True, hide_index=True,
+        )
+        with st.expander("Log", expanded=job["status"] in ("rodando", "erro")):
+            st.code("\n".join(job["log"][-60:]) or "(vazio)")
+
+    # Job novo concluído → rerun completo para a app inteira enxergar o dataset novo (sem reiniciar)
+    ultimo_ok = next((j["id"] for j in jobs if j["status"] == "ok"), None)
+    if ultimo_ok and st.session_state.get("job_visto") != ultimo_ok:
+        primeira_vez = "job_visto" not in st.session_state
+        st.session_state["job_visto"] = ultimo_ok
+        if not primeira_vez:
+            st.rerun(scope="app")
+
+with aba_pipeline:
+    st.markdown("### ⚙️ Fechamento mensal")
+    st.markdown(
+        "<div class='hint'>Roda limpeza → ETL → FORM_OK → VR → export em segundo plano. "
+        "Ao terminar, dashboard, agente e export passam a usar o RESULT novo.</div>",
+        unsafe_allow_html=True,
+    )
+    executor = _executor()
+    if st.button("▶️ Rodar pipeline", disabled=executor.ocupado(), key="run_pipeline"):
+        executor.enfileirar()
+    _acompanhar_jobs()
+
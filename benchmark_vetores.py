@@ -0,0 +1,183 @@
+"""
+Benchmark recall × latência × memória das configurações do armazenamento vetorial.
+
+Usa os documentos reais do RESULT/LAYOUT (mesma serialização da ingestão) e
+replica a base com ruído para simular N competências de histórico. O gabarito
+é o top-k exato (numpy); cada configuração é medida em recall@k, latência
+p50/p95 e memória RAM estimada por vetor.
+
+Configurações:
+  local-bruta, local-hnsw-m16, local-hnsw-m32   (sempre; índice embutido)
+  qdrant-float32, qdrant-scalar, qdrant-binary,
+  qdrant-scalar-ondisk                          (só com QDRANT_URL de um servidor)
+
+Exemplos:
+  python benchmark_vetores.py --fake-embeddings --replicas 12
+  python benchmark_vetores.py --replicas 24 --configs qdrant-float32,qdrant-scalar --csv data/ETL_OK/_reports/bench.csv
+"""
+
+import os
+import time
+import uuid
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+from cache_embeddings import EmbeddingsEmCache
+from ingest_excel_to_qdrant import iter_sources, die
+from modelos_embedding import FakeEmbeddings, criar_embeddings, identificador_modelo
+from store_vetorial import StoreLocal, StoreQdrant
+
+CONFIGS_LOCAIS = {
+    "local-bruta": {"hnsw_min": 10**12},
+    "local-hnsw-m16": {"hnsw_min": 0, "hnsw_m": 16},
+    "local-hnsw-m32": {"hnsw_min": 0, "hnsw_m": 32},
+}
+CONFIGS_QDRANT = {
+    "qdrant-float32": {"quantizacao": "nenhuma", "on_disk": False},
+    "qdrant-scalar": {"quantizacao": "scalar", "on_disk": False},
+    "qdrant-binary": {"quantizacao": "binary", "on_disk": False},
+    "qdrant-scalar-ondisk": {"quantizacao": "scalar", "on_disk": True},
+}
+
+def ram_por_vetor(nome: str, dim: int, m: int = 16) -> int:
+    """Estimativa de bytes em RAM por vetor: vetores residentes + links do HNSW (~2·m ints)."""
+    links = 0 if nome == "local-bruta" else 2 * m * 4
+    if "binary" in nome:
+        return dim // 8 + links
+    if "scalar" in nome:
+        return dim + links  # int8 em RAM; originais em RAM ou disco
+    return dim * 4 + links
+
+def carregar_base(fake: bool) -> tuple[list, np.ndarray]:
+    fontes = [("VR_MENSAL_RESULT", os.getenv("RESULT_XLSX", "./data/ETL_OK/VR_MENSAL_RESULT.xlsx")),
+              ("VR_MENSAL_LAYOUT", os.getenv("LAYOUT_XLSX", "./data/ETL_OK/VR_MENSAL_LAYOUT.xlsx"))]
+    for _, path in fontes:
+        if not os.path.exists(path):
+            die(f"Arquivo não encontrado: {path}")
+    if fake:
+        emb = FakeEmbeddings()
+    else:
+        emb = EmbeddingsEmCache(criar_embeddings(), modelo=identificador_modelo(),
+                                arquivo=os.getenv("EMBEDDINGS_CACHE", "./data/ETL_OK/_cache/embeddings.sqlite"))
+    docs, vetores = [], []
+    for lote in iter_sources(fontes):
+        docs.extend(lote)
+        vetores.extend(emb.embed_documents([d.page_content for d in lote]))
+    return docs, np.asarray(vetores, dtype=np.float32)
+
+def replicar(docs: list, base: np.ndarray, replicas: int, ruido: float, rng) -> tuple[list, np.ndarray]:
+    """Simula competências: cada réplica = base + ruído gaussiano (renormalizada), IDs novos."""
+    todos_docs, blocos = [], []
+    for r in range(replicas):
+        v = base if r == 0 else base + rng.normal(0, ruido, base.shape).astype(np.float32)
+        blocos.append(v / np.linalg.norm(v, axis=1, keepdims=True))
+        for d in docs:
+            meta = {**d.metadata, "point_id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"{d.metadata['point_id']}:{r}"))}
+            todos_docs.append(Document(page_content=d.page_content, metadata=meta))
+    return todos_docs, np.concatenate(blocos)
+
+def medir(store, consultas: np.ndarray, gabarito: list[set], k: int) -> dict:
+    tempos, acertos = [], 0.0
+    for q, certo in zip(consultas, gabarito):
+        t0 = time.perf_counter()
+        hits = store.buscar(q.tolist(), k=k)
+        tempos.append((time.perf_counter() - t0) * 1000)
+        acertos += len({h["id"] for h in hits} & certo) / k
+    return {"recall": round(acertos / len(consultas), 4),
+            "p50_ms": round(float(np.percentile(tempos, 50)), 3),
+            "p95_ms": round(float(np.percentile(tempos, 95)), 3)}
+
+def gravar(store, docs: list, mat: np.ndarray, lote: int = 512) -> float:
+    t0 = time.perf_counter()
+    for i in range(0, len(docs), lote):
+        store.gravar(docs[i:i + lote], mat[i:i + lote].tolist())
+    store.finalizar()
+    return round(time.perf_counter() - t0, 2)
+
+def aguardar_indexacao(store: StoreQdrant, timeout: float = 600) -> None:
+    fim = time.time() + timeout
+    while time.time() < fim:
+        if store.client.get_collection(store.collection).status == "green":
+            return
+        time.sleep(1)
+
+def main():
+    load_dotenv()
+    ap = argparse.ArgumentParser(description="Benchmark recall × latência das configurações vetoriais")
+    ap.add_argument("--fake-embeddings", action="store_true", help="vetores determinísticos (sem API)")
+    ap.add_argument("--replicas", type=int, default=1, help="nº de competências simuladas")
+    ap.add_argument("--ruido", type=float, default=0.05, help="desvio do ruído entre réplicas")
+    ap.add_argument("--consultas", type=int, default=200)
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--configs", default="", help="lista separada por vírgula (padrão: todas as disponíveis)")
+    ap.add_argument("--csv", default="", help="salva a tabela em CSV (';', utf-8-sig)")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(42)
+    docs, base = carregar_base(args.fake_embeddings)
+    docs, mat = replicar(docs, base, max(1, args.replicas), args.ruido, rng)
+    ids = [d.metadata["point_id"] for d in docs]
+    dim = mat.shape[1]
+    print(f"[INFO] Base: {len(docs)} vetores (dim={dim}, {args.replicas} réplica(s))")
+
+    # consultas = vetores da base perturbados; gabarito = top-k exato
+    amostra = rng.choice(len(mat), size=min(args.consultas, len(mat)), replace=False)
+    consultas = mat[amostra] + rng.normal(0, 0.1, (len(amostra), dim)).astype(np.float32)
+    consultas /= np.linalg.norm(consultas, axis=1, keepdims=True)
+    sims = consultas @ mat.T
+    gabarito = [{ids[i] for i in np.argpartition(-s, args.k)[:args.k]} for s in sims]
+
+    url = os.getenv("QDRANT_URL", "").strip()
+    servidor = bool(url) and url != ":memory:"
+    disponiveis = dict(CONFIGS_LOCAIS)
+    if servidor:
+        disponiveis.update(CONFIGS_QDRANT)
+    escolhidas = [c.strip() for c in args.configs.split(",") if c.strip()] or list(disponiveis)
+    for c in escolhidas:
+        if c not in disponiveis:
+            die(f"Configuração indisponível: {c} (disponíveis: {', '.join(disponiveis)})")
+
+    linhas = []
+    for nome in escolhidas:
+        opc = disponiveis[nome]
+        if nome.startswith("local"):
+            with tempfile.TemporaryDirectory() as tmp:
+                store = StoreLocal(tmp, **opc)
+                store.garantir(dim)
+                carga = gravar(store, docs, mat)
+                res = medir(store, consultas, gabarito, args.k)
+        else:
+            from qdrant_client import QdrantClient
+            client = QdrantClient(url=url, api_key=os.getenv("QDRANT_API_KEY", "").strip() or None,
+                                  prefer_grpc=False, timeout=120.0)
+            store = StoreQdrant(client, f"bench_{nome.replace('-', '_')}", **opc)
+            if client.collection_exists(store.collection):
+                client.delete_collection(store.collection)
+            store.garantir(dim)
+            carga = gravar(store, docs, mat)
+            aguardar_indexacao(store)
+            try:
+                res = medir(store, consultas, gabarito, args.k)
+            finally:
+                client.delete_collection(store.collection)
+        linha = {"config": nome, **res, "carga_s": carga,
+                 "ram_bytes_vetor": ram_por_vetor(nome, dim, opc.get("hnsw_m", 16)),
+                 "ram_total_mb": round(ram_por_vetor(nome, dim, opc.get("hnsw_m", 16)) * len(mat) / 2**20, 1)}
+        linhas.append(linha)
+        print(f"[OK] {nome}: recall@{args.k}={res['recall']} p50={res['p50_ms']}ms p95={res['p95_ms']}ms")
+
+    tabela = pd.DataFrame(linhas)
+    print()
+    print(tabela.to_string(index=False))
+    if args.csv:
+        os.makedirs(os.path.dirname(args.csv) or ".", exist_ok=True)
+        tabela.to_csv(args.csv, sep=";", index=False, encoding="utf-8-sig")
+        print(f"[OK] Tabela salva em {args.csv}")
+
+if __name__ == "__main__":
+    main()
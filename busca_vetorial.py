@@ -0,0 +1,126 @@
+# busca_vetorial.py
+# -------------------------------------------
+# Payload tipado da collection VR + filtros empurrados para dentro do Qdrant
+# -------------------------------------------
+# Cada ponto leva, além de page_content, campos tipados em metadata
+# (MATRICULA, SINDICATO, UF_BASE, EMPRESA, VR_COLAB, COMPETENCIA) com índice
+# de payload. Um filtro como SINDICATO = X ou VR_COLAB > 0 vira um Filter do
+# Qdrant e é aplicado durante o kNN (sem buscar a mais e filtrar em Python).
+# O formato dos filtros é o mesmo das ferramentas (ferramentas._apply_filters).
+
+import json
+
+import numpy as np
+import pandas as pd
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
+
+PREFIXO = "metadata."  # langchain_qdrant guarda os metadados sob "metadata"
+
+# campo → (colunas de origem no RESULT/LAYOUT, tipo do índice)
+CAMPOS_PAYLOAD = {
+    "MATRICULA": (["MATRICULA", "Matricula"], rest.PayloadSchemaType.KEYWORD),
+    "SINDICATO": (["SINDICATO", "Sindicato do Colaborador"], rest.PayloadSchemaType.KEYWORD),
+    "UF_BASE": (["UF_BASE"], rest.PayloadSchemaType.KEYWORD),
+    "EMPRESA": (["EMPRESA"], rest.PayloadSchemaType.INTEGER),
+    "VR_COLAB": (["VR_COLAB", "TOTAL"], rest.PayloadSchemaType.FLOAT),
+    "COMPETENCIA": (["COMPETENCIA", "Competência"], rest.PayloadSchemaType.KEYWORD),
+}
+# "source" também é filtrado (sincronização incremental e busca por planilha)
+INDICES_EXTRAS = {"source": rest.PayloadSchemaType.KEYWORD}
+
+# --------- Escrita (ingestão) ---------
+def _coluna(df: pd.DataFrame, nomes: list[str]) -> pd.Series | None:
+    return next((df[c] for c in nomes if c in df.columns), None)
+
+def extrair_payload(df: pd.DataFrame, competencia: str = "") -> list[dict]:
+    """Campos tipados por linha (nulos omitidos), convertidos coluna a coluna.
+
+    competencia: usada quando a planilha não traz a coluna (ou ela está vazia).
+    """
+    colunas: dict[str, np.ndarray] = {}
+    for campo, (nomes, tipo) in CAMPOS_PAYLOAD.items():
+        s = _coluna(df, nomes)
+        if s is None:
+            continue
+        if tipo == rest.PayloadSchemaType.KEYWORD:
+            txt = s.astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+            valores = txt.where(s.notna() & (txt != ""), None).astype(object)
+        elif tipo == rest.PayloadSchemaType.INTEGER:
+            num = pd.to_numeric(s, errors="coerce")
+            valores = num.round().astype("Int64").astype(object).where(num.notna(), None)
+        else:
+            num = pd.to_numeric(s, errors="coerce").astype(float)
+            valores = num.astype(object).where(num.notna(), None)
+        colunas[campo] = valores.to_numpy(dtype=object)
+    if competencia:
+        atual = colunas.get("COMPETENCIA")
+        colunas["COMPETENCIA"] = (np.full(len(df), competencia, dtype=object) if atual is None
+                                  else np.where(pd.isna(atual), competencia, atual))
+    nomes = list(colunas)
+    return [{k: v for k, v in zip(nomes, linha) if v is not None}
+            for linha in zip(*colunas.values())] if nomes else [{} for _ in range(len(df))]
+
+def criar_indices_payload(client: QdrantClient, collection: str) -> None:
+    """Índices de payload dos campos filtráveis (idempotente: pode rodar a cada ingestão)."""
+    campos = {c: t for c, (_, t) in CAMPOS_PAYLOAD.items()} | INDICES_EXTRAS
+    for campo, tipo in campos.items():
+        client.create_payload_index(collection_name=collection, field_name=PREFIXO + campo,
+                                    field_schema=tipo, wait=True)
+
+# --------- Leitura (filtros) ---------
+def _condicao(campo: str, op: str, val) -> tuple[str, rest.FieldCondition] | None:
+    chave = PREFIXO + campo
+    tipo = CAMPOS_PAYLOAD[campo][1] if campo in CAMPOS_PAYLOAD else rest.PayloadSchemaType.KEYWORD
+    numerico = tipo in (rest.PayloadSchemaType.INTEGER, rest.PayloadSchemaType.FLOAT)
+
+    def valor(v):
+        if tipo == rest.PayloadSchemaType.INTEGER:
+            return int(float(v))
+        return float(v) if numerico else str(v)
+
+    lista = val if isinstance(val, list) else [val]
+    if op in (">", ">=", "<", "<="):
+        if not numerico:
+            return None
+        arg = {">": "gt", ">=": "gte", "<": "lt", "<=": "lte"}[op]
+        return "must", rest.FieldCondition(key=chave, range=rest.Range(**{arg: float(val)}))
+    if op in ("==", "!="):
+        if tipo == rest.PayloadSchemaType.FLOAT:  # igualdade em float: faixa degenerada
+            cond = rest.FieldCondition(key=chave, range=rest.Range(gte=float(val), lte=float(val)))
+        else:
+            cond = rest.FieldCondition(key=chave, match=rest.MatchValue(value=valor(val)))
+        return ("must" if op == "==" else "must_not"), cond
+    if op in ("in", "not_in") and tipo != rest.PayloadSchemaType.FLOAT:
+        cond = rest.FieldCondition(key=chave, match=rest.MatchAny(any=[valor(v) for v in lista]))
+        return ("must" if op == "in" else "must_not"), cond
+    return None
+
+def filtro_qdrant(filters: list[dict] | str | None, source: str | None = None) -> rest.Filter | None:
+    """Traduz filtros [{"col","op","value"}] (lista ou JSON) para rest.Filter.
+
+    Colunas fora de CAMPOS_PAYLOAD e operadores sem equivalente são ignorados,
+    como em ferramentas._apply_filters.
+    """
+    if isinstance(filters, str):
+        try:
+            filters = json.loads(filters) if filters.strip() else []
+        except Exception:
+            filters = []
+    if not isinstance(filters, list):
+        filters = []
+    must, must_not = [], []
+    if source:
+        must.append(rest.FieldCondition(key=PREFIXO + "source", match=rest.MatchValue(value=source)))
+    for cond in filters:
+        if not isinstance(cond, dict) or cond.get("col") not in CAMPOS_PAYLOAD:
+            continue
+        try:
+            r = _condicao(cond["col"], cond.get("op"), cond.get("value"))
+        except (TypeError, ValueError):
+            continue
+        if r:
+            (must if r[0] == "must" else must_not).append(r[1])
+    if not must and not must_not:
+        return None
+    return rest.Filter(must=must or None, must_not=must_not or None)
@@ -0,0 +1,118 @@
+# cache_embeddings.py
+# -------------------------------------------
+# Cache persistente de embeddings (SQLite) em volta de qualquer backend
+# -------------------------------------------
+# A chave é o nome do modelo + hash do texto; o vetor fica como blob float32.
+# Texto que não mudou não volta ao provedor: re-ingestões e consultas repetidas
+# do retriever só pagam pelos textos novos. Eviction por LRU (coluna usado_em)
+# quando o número de itens passa de max_itens, em lote (até FOLGA_DESPEJO abaixo
+# do limite) para não despejar a cada put.
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_LOTE_SQL = 500  # limite seguro de parâmetros por IN (...)
+FOLGA_DESPEJO = 0.1  # o despejo desce a 90% de max_itens
+
+class EmbeddingsEmCache(Embeddings):
+    """Embeddings com cache em disco; delega ao backend só o que falta (em lote)."""
+
+    def __init__(self, backend: Embeddings, modelo: str, arquivo: str = "./data/ETL_OK/_cache/embeddings.sqlite",
+                 max_itens: int = 500_000):
+        self.backend = backend
+        self.modelo = modelo
+        self.arquivo = arquivo
+        self.max_itens = max_itens
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if arquivo != ":memory:":
+            os.makedirs(os.path.dirname(arquivo) or ".", exist_ok=True)
+        self._con = sqlite3.connect(arquivo, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " chave TEXT PRIMARY KEY, modelo TEXT NOT NULL, vetor BLOB NOT NULL, usado_em REAL NOT NULL)"
+        )
+        self._con.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_usado_em ON embeddings(usado_em)")
+        self._con.commit()
+        # contagem corrente (limite superior: um REPLACE conta como novo); o COUNT(*) exato
+        # só roda quando ela passa de max_itens
+        self._itens = self._con.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def chave(self, texto: str) -> str:
+        return hashlib.sha256(f"{self.modelo}\0{texto}".encode("utf-8")).hexdigest()
+
+    # --------- Get/put em lote ---------
+    def obter(self, textos: list[str]) -> list[list[float] | None]:
+        """Vetores em cache (None onde não há), na ordem de `textos`."""
+        chaves = [self.chave(t) for t in textos]
+        achados: dict[str, bytes] = {}
+        with self._lock:
+            for i in range(0, len(chaves), _LOTE_SQL):
+                lote = chaves[i:i + _LOTE_SQL]
+                marcas = ",".join("?" * len(lote))
+                achados.update(self._con.execute(
+                    f"SELECT chave, vetor FROM embeddings WHERE chave IN ({marcas})", lote).fetchall())
+            if achados:
+                agora = time.time()
+                self._con.executemany("UPDATE embeddings SET usado_em=? WHERE chave=?",
+                                      [(agora, k) for k in achados])
+                self._con.commit()
+            self.hits += len(achados)
+            self.misses += len(chaves) - len(achados)
+        return [np.frombuffer(achados[k], dtype=np.float32).tolist() if k in achados else None for k in chaves]
+
+    def guardar(self, textos: list[str], vetores: list[list[float]]) -> None:
+        agora = time.time()
+        linhas = [(self.chave(t), self.modelo, np.asarray(v, dtype=np.float32).tobytes(), agora)
+                  for t, v in zip(textos, vetores)]
+        with self._lock:
+            self._con.executemany("INSERT OR REPLACE INTO embeddings VALUES (?,?,?,?)", linhas)
+            self._itens += len(linhas)
+            if self._itens > self.max_itens:
+                self._despejar()
+            self._con.commit()
+
+    def _despejar(self) -> None:
+        """Remove os menos usados recentemente até FOLGA_DESPEJO abaixo de max_itens (chamado sob o lock)."""
+        self._itens = self._con.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if self._itens <= self.max_itens:
+            return
+        alvo = int(self.max_itens * (1 - FOLGA_DESPEJO))
+        self._con.execute(
+            "DELETE FROM embeddings WHERE chave IN "
+            "(SELECT chave FROM embeddings ORDER BY usado_em LIMIT ?)", (self._itens - alvo,))
+        self._itens = alvo
+
+    # --------- Interface Embeddings ---------
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vetores = self.obter(texts)
+        faltam = list(dict.fromkeys(t for t, v in zip(texts, vetores) if v is None))
+        if faltam:
+            novos = dict(zip(faltam, self.backend.embed_documents(faltam)))
+            self.guardar(faltam, [novos[t] for t in faltam])
+            vetores = [v if v is not None else list(novos[t]) for t, v in zip(texts, vetores)]
+        return vetores
+
+    def embed_query(self, text: str) -> list[float]:
+        v = self.obter([text])[0]
+        if v is None:
+            v = self.backend.embed_query(text)
+            self.guardar([text], [v])
+        return list(v)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            itens = self._itens = self._con.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+                    "itens": itens, "max_itens": self.max_itens, "modelo": self.modelo}
@@ -0,0 +1,155 @@
+# cache_respostas.py
+# -------------------------------------------
+# Cache de respostas do agente (LRU + TTL, opcionalmente persistido em disco)
+# -------------------------------------------
+# A chave é a pergunta normalizada + a versão do dataset (hash do RESULT e
+# versão/hash do regras.yml). Quando o VR.py grava um RESULT novo, a versão
+# muda e as respostas antigas deixam de valer (são descartadas na próxima consulta).
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import yaml
+
+# --------- Versão do dataset ---------
+_HASHES: dict[str, tuple[tuple[int, int], str]] = {}
+_HASHES_LOCK = threading.Lock()
+
+def hash_arquivo(path: str) -> str:
+    """SHA-256 do conteúdo do arquivo; só relê quando mtime/tamanho mudam."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "ausente"
+    assinatura = (st.st_mtime_ns, st.st_size)
+    with _HASHES_LOCK:
+        memo = _HASHES.get(path)
+        if memo and memo[0] == assinatura:
+            return memo[1]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    digest = h.hexdigest()
+    with _HASHES_LOCK:
+        _HASHES[path] = (assinatura, digest)
+    return digest
+
+_VERSOES_REGRAS: dict[str, str] = {}
+
+def versao_regras(regras_path: str) -> str:
+    """metadata.versao do regras.yml + hash curto do arquivo (pega edições sem bump de versão)."""
+    digest = hash_arquivo(regras_path)
+    if digest in _VERSOES_REGRAS:
+        return _VERSOES_REGRAS[digest]
+    try:
+        with open(regras_path, "r", encoding="utf-8") as f:
+            versao = (yaml.safe_load(f) or {}).get("metadata", {}).get("versao", "?")
+    except Exception:
+        versao = "?"
+    _VERSOES_REGRAS[digest] = f"{versao}-{digest[:8]}"
+    return _VERSOES_REGRAS[digest]
+
+def versao_dataset(result_path: str, regras_path: str) -> str:
+    """Identificador da versão dos dados: muda sempre que RESULT ou regras.yml mudam."""
+    return f"{hash_arquivo(result_path)[:16]}:{versao_regras(regras_path)}"
+
+# --------- Cache ---------
+class CacheRespostas:
+    """LRU com expiração (TTL) e estatísticas de acerto; thread-safe."""
+
+    def __init__(self, max_itens: int = 256, ttl: float = 6 * 3600, arquivo: str | None = None):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.arquivo = arquivo or None
+        self._itens: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._versao: str | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._carregar()
+
+    @staticmethod
+    def chave(pergunta_normalizada: str, versao: str) -> str:
+        return hashlib.sha1(f"{versao}|{pergunta_normalizada}".encode("utf-8")).hexdigest()
+
+    def _sincronizar_versao(self, versao: str) -> None:
+        """Descarta tudo se a versão do dataset mudou (novo RESULT/regras)."""
+        if self._versao != versao:
+            self._itens.clear()
+            self._versao = versao
+
+    def obter(self, pergunta_normalizada: str, versao: str) -> str | None:
+        with self._lock:
+            self._sincronizar_versao(versao)
+            k = self.chave(pergunta_normalizada, versao)
+            item = self._itens.get(k)
+            if item is None or (self.ttl and time.time() - item[0] > self.ttl):
+                if item is not None:
+                    del self._itens[k]
+                self.misses += 1
+                return None
+            self._itens.move_to_end(k)
+            self.hits += 1
+            return item[1]
+
+    def guardar(self, pergunta_normalizada: str, versao: str, resposta: str) -> None:
+        with self._lock:
+            self._sincronizar_versao(versao)
+            k = self.chave(pergunta_normalizada, versao)
+            self._itens[k] = (time.time(), resposta)
+            self._itens.move_to_end(k)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+            self._salvar()
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._salvar()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "ttl_s": self.ttl,
+                "versao": self._versao,
+            }
+
+    # --------- Persistência (JSON, escrita atômica) ---------
+    def _carregar(self) -> None:
+        if not self.arquivo or not os.path.exists(self.arquivo):
+            return
+        try:
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._versao = data.get("versao")
+            agora = time.time()
+            for k, ts, resp in data.get("itens", []):
+                if not self.ttl or agora - ts <= self.ttl:
+                    self._itens[k] = (ts, resp)
+        except Exception:
+            self._itens.clear()
+
+    def _salvar(self) -> None:
+        if not self.arquivo:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.arquivo) or ".", exist_ok=True)
+            tmp = f"{self.arquivo}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"versao": self._versao,
+                           "itens": [[k, ts, r] for k, (ts, r) in self._itens.items()]},
+                          f, ensure_ascii=False)
+            os.replace(tmp, self.arquivo)
+        except OSError:
+            pass
@@ -0,0 +1,24 @@
+# conftest.py
+# -------------------------------------------
+# Ambiente dos testes (pytest): offline e sem efeitos em disco
+# -------------------------------------------
+# Definido antes de qualquer import do projeto (os módulos leem o env ao importar;
+# load_dotenv não sobrescreve o que já está aqui).
+
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(RAIZ, "scripts"))  # scripts/ se importam entre si pelo nome (datas, esquemas...)
+
+os.environ["OPENAI_API_KEY"] = ""             # nada de LLM/embeddings reais
+os.environ["CACHE_RESPOSTAS_ARQUIVO"] = ""    # cache de respostas só em memória
+os.environ["REGRAS_YAML"] = os.path.join(RAIZ, "regras.yml")
+os.environ["DATAS_CACHE"] = os.devnull        # formatos de data: nada do cache real do pipeline
+
+@pytest.fixture(autouse=True)
+def _na_raiz(monkeypatch):
+    """regras.yml usa caminhos relativos (./data/...): roda cada teste a partir da raiz."""
+    monkeypatch.chdir(RAIZ)
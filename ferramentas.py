@@ -0,0 +1,509 @@
+# ferramentas.py
+# -------------------------------------------
+# Ferramentas pandas do agente de VR + roteador determinístico.
+# Módulo leve (sem LangChain): importável pelo app, pelo ETL e por scripts
+# sem custo de inicialização do LLM. O agente.py embrulha estas funções como tools.
+# -------------------------------------------
+
+import os
+import re
+import json
+import threading
+import unicodedata
+import yaml
+import pandas as pd
+from dotenv import load_dotenv
+
+from cache_respostas import hash_arquivo
+from indice_busca import IndicePrefixo
+
+# --------- Config ---------
+# .env antes de qualquer os.getenv: este módulo é importado (por agente/app/recuperacao)
+# antes do load_dotenv() deles, e REGRAS_YAML do .env seria ignorado.
+load_dotenv()
+REGRAS_YAML_PATH = os.getenv("REGRAS_YAML", "./regras.yml")
+
+_REGRAS_MEMO: dict = {"hash": None, "regras": None}
+
+def carregar_regras() -> dict:
+    """regras.yml em memória; relido só quando o arquivo muda."""
+    if not os.path.exists(REGRAS_YAML_PATH):
+        raise FileNotFoundError(f"Arquivo de regras não encontrado: {REGRAS_YAML_PATH}")
+    h = hash_arquivo(REGRAS_YAML_PATH)
+    if _REGRAS_MEMO["hash"] != h:
+        with open(REGRAS_YAML_PATH, "r", encoding="utf-8") as f:
+            _REGRAS_MEMO["regras"] = yaml.safe_load(f) or {}
+        _REGRAS_MEMO["hash"] = h
+    return _REGRAS_MEMO["regras"]
+
+def result_path() -> str:
+    """Caminho do RESULT conforme regras.yml (arquivos.result_xlsx)."""
+    return carregar_regras()["arquivos"]["result_xlsx"]
+
+# --------- Utils ---------
+_RESULT_MEMO: dict = {"hash": None, "df": None}
+_RESULT_LOCK = threading.Lock()
+
+def carregar_result() -> pd.DataFrame:
+    """RESULT tipado, compartilhado em memória; relê só quando o arquivo muda.
+    As tools NÃO devem alterar o frame devolvido (filtros/agrupamentos geram cópias)."""
+    h = hash_arquivo(result_path())
+    with _RESULT_LOCK:
+        if _RESULT_MEMO["hash"] != h or _RESULT_MEMO["df"] is None:
+            _RESULT_MEMO["df"] = _ler_result()
+            _RESULT_MEMO["hash"] = h
+        return _RESULT_MEMO["df"]
+
+_INDICE_MEMO: dict = {"df_id": None, "indice": None}
+
+def indice_result(df: pd.DataFrame | None = None) -> IndicePrefixo:
+    """Índice de prefixo (MATRICULA/NOME) do frame `df` (padrão: RESULT atual); reconstruído só
+    quando o frame muda. Quem já tem o frame passa-o: as posições do índice valem para ELE."""
+    if df is None:
+        df = carregar_result()
+    with _RESULT_LOCK:
+        if _INDICE_MEMO["df_id"] != id(df) or _INDICE_MEMO["indice"] is None:
+            _INDICE_MEMO["indice"] = IndicePrefixo(df)
+            _INDICE_MEMO["df_id"] = id(df)
+        return _INDICE_MEMO["indice"]
+
+def _ler_result() -> pd.DataFrame:
+    """Lê o RESULT do disco e normaliza colunas numéricas/chave."""
+    df = pd.read_excel(result_path(), engine="openpyxl")
+    for col in ["VR_COLAB", "VR_EMPRESA", "VR_PROFISSIONAL", "VALOR_UNITARIO", "DIAS_ELEGIVEIS", "DIAS"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+    if "MATRICULA" in df.columns:
+        df["MATRICULA"] = df["MATRICULA"].astype(str).str.strip()
+    return df
+
+def _fmt(v: float) -> str:
+    """Formata moeda pt-BR."""
+    return f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def _safe_str(x):
+    return "—" if x is None or (isinstance(x, float) and pd.isna(x)) else str(x)
+
+def _apply_filters(df: pd.DataFrame, filters_json: str) -> pd.DataFrame:
+    """
+    Aplica filtros no formato JSON, ex.:
+    [
+      {"col":"VR_COLAB","op":">","value":0},
+      {"col":"SINDICATO","op":"in","value":["SINDPD RJ","SINDPD SP"]}
+    ]
+    Ops suportados: ==, !=, >, >=, <, <=, in, not_in
+    """
+    if not filters_json:
+        return df
+    try:
+        flt = json.loads(filters_json)
+    except Exception:
+        return df
+    if not isinstance(flt, list):
+        return df
+
+    out = df.copy()
+    for cond in flt:
+        col, op, val = cond.get("col"), cond.get("op"), cond.get("value")
+        if col not in out.columns:  # ignora filtros inválidos
+            continue
+        series = out[col]
+        if op == "==":
+            out = out[series == val]
+        elif op == "!=":
+            out = out[series != val]
+        elif op == ">":
+            out = out[pd.to_numeric(series, errors="coerce") > float(val)]
+        elif op == ">=":
+            out = out[pd.to_numeric(series, errors="coerce") >= float(val)]
+        elif op == "<":
+            out = out[pd.to_numeric(series, errors="coerce") < float(val)]
+        elif op == "<=":
+            out = out[pd.to_numeric(series, errors="coerce") <= float(val)]
+        elif op == "in":
+            out = out[series.astype(str).isin([str(x) for x in (val if isinstance(val, list) else [val])])]
+        elif op == "not_in":
+            out = out[~series.astype(str).isin([str(x) for x in (val if isinstance(val, list) else [val])])]
+    return out
+
+# --------- Ferramentas genéricas ---------
+def schema_info(_: str = "") -> str:
+    """Retorna o esquema disponível (colunas) e sinônimos úteis.
+    JSON: {"ok":true,"colunas":[...],"sugestoes":{"destinatarios":"SINDICATO","funcionario":"MATRICULA"}}"""
+    df = carregar_result()
+    sugestoes = {
+        "destinatarios": "SINDICATO",
+        "sindicatos": "SINDICATO",
+        "colaborador": "MATRICULA",
+        "funcionario": "MATRICULA",
+        "valor unitario": "VALOR_UNITARIO",
+        "valor diario": "VALOR_UNITARIO",
+        "total colaborador": "VR_COLAB",
+        "custo empresa": "VR_EMPRESA",
+        "desconto profissional": "VR_PROFISSIONAL",
+    }
+    return json.dumps({"ok": True, "colunas": list(df.columns), "sugestoes": sugestoes}, ensure_ascii=False)
+
+def aggregate(op: str, column: str, filters_json: str = "", positive_only: bool = False) -> str:
+    """Agrega uma coluna (sum|mean|min|max|count) com filtros opcionais.
+    Args:
+      op: 'sum'|'mean'|'min'|'max'|'count'
+      column: alvo da agregação (para count pode ser qualquer coluna existente)
+      filters_json: ver _apply_filters docstring
+      positive_only: se True, ignora valores <= 0 (útil para média de quem recebeu VR)
+    Retorna JSON: {"ok":true,"op":"sum","column":"VR_COLAB","valor":<float>,"fmt":"R$ ...","denominador":<int>}
+    """
+    df = _apply_filters(carregar_result(), filters_json)
+    if column not in df.columns:
+        return json.dumps({"ok": False, "erro": f"Coluna {column} ausente."}, ensure_ascii=False)
+
+    s = pd.to_numeric(df[column], errors="coerce")
+    if positive_only:
+        s = s[s > 0]
+
+    if op == "sum":
+        val = float(s.sum())
+        return json.dumps({"ok": True, "op": op, "column": column, "valor": val, "fmt": _fmt(val)}, ensure_ascii=False)
+    if op == "mean":
+        denom = int(s.count())
+        media = float(s.mean()) if denom > 0 else 0.0
+        return json.dumps({"ok": True, "op": op, "column": column, "valor": media, "fmt": _fmt(media), "denominador": denom}, ensure_ascii=False)
+    if op == "min":
+        v = float(s.min()) if len(s) else 0.0
+        return json.dumps({"ok": True, "op": op, "column": column, "valor": v, "fmt": _fmt(v)}, ensure_ascii=False)
+    if op == "max":
+        v = float(s.max()) if len(s) else 0.0
+        return json.dumps({"ok": True, "op": op, "column": column, "valor": v, "fmt": _fmt(v)}, ensure_ascii=False)
+    if op == "count":
+        return json.dumps({"ok": True, "op": op, "column": column, "valor": int(s.count())}, ensure_ascii=False)
+    return json.dumps({"ok": False, "erro": f"Operação {op} inválida."}, ensure_ascii=False)
+
+# --------- Exportação (layout da operadora) ---------
+EXPORT_NUM_COLS = ["Dias", "VALOR DIÁRIO VR", "TOTAL", "Custo empresa", "Desconto profissional"]
+EXPORT_ID_COLS = ["Matricula"]  # número no export (como no layout original), se todas forem numéricas
+EXPORT_FORMATOS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def montar_export(df: pd.DataFrame, regras: dict, competencia: str = "", filters_json: str = "") -> pd.DataFrame:
+    """Monta o layout final (regras.yml → layout.export_columns/mapping) a partir do RESULT.
+    competencia: preenche a coluna 'Competência' (senão usa o default do mapping).
+    filters_json: mesmo formato de _apply_filters, aplicado sobre as colunas do RESULT."""
+    layout = regras.get("layout", {})
+    mapping = layout.get("mapping", {})
+    base = _apply_filters(df, filters_json)
+    out = pd.DataFrame(index=base.index)
+    for col in layout.get("export_columns", []):
+        src = mapping.get(col, {})
+        if "from" in src and src["from"] in base.columns:
+            out[col] = base[src["from"]]
+        else:
+            out[col] = src.get("default", "")
+    if competencia and "Competência" in out.columns:
+        out["Competência"] = competencia
+    for c in EXPORT_NUM_COLS:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce")
+    for c in EXPORT_ID_COLS:
+        if c in out.columns:
+            # o RESULT em memória guarda MATRICULA como texto (chave de busca); a operadora recebe número.
+            # Se alguma não for numérica, mantém texto em vez de perder o valor.
+            num = pd.to_numeric(out[c], errors="coerce")
+            if not (num.isna() & out[c].notna() & (out[c].astype(str).str.strip() != "")).any():
+                out[c] = num.astype("Int64") if (num.dropna() % 1 == 0).all() else num
+    return out.reset_index(drop=True)
+
+def exportar_bytes(out: pd.DataFrame, formato: str = "xlsx") -> bytes:
+    """Serializa o export em memória (sem tocar o disco): xlsx, csv (';', utf-8-sig) ou parquet."""
+    import io
+    formato = formato.lower()
+    buf = io.BytesIO()
+    if formato == "xlsx":
+        with pd.ExcelWriter(buf, engine="openpyxl") as wr:
+            out.to_excel(wr, index=False)
+    elif formato == "csv":
+        buf.write(out.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig"))
+    elif formato == "parquet":
+        try:
+            out.to_parquet(buf, index=False)
+        except ImportError as e:
+            raise RuntimeError("Parquet requer pyarrow (pip install pyarrow).") from e
+    else:
+        raise ValueError(f"Formato {formato} inválido (use: {', '.join(EXPORT_FORMATOS)}).")
+    return buf.getvalue()
+
+def gerar_arquivo_layout(_: str = "") -> str:
+    """Gera o XLSX final conforme regras.yml/layout e devolve o caminho salvo."""
+    try:
+        cfg = carregar_regras()
+        out_path = cfg["layout"].get("arquivo_export", "./data/ETL_OK/VR_MENSAL_EXPORT.xlsx")
+        out = montar_export(carregar_result(), cfg)
+
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with open(out_path, "wb") as f:
+            f.write(exportar_bytes(out, "xlsx"))
+
+        return json.dumps(
+            {"ok": True, "path": out_path, "linhas": int(len(out)), "colunas": list(out.columns)},
+            ensure_ascii=False
+        )
+    except Exception as e:
+        return json.dumps({"ok": False, "erro": str(e)}, ensure_ascii=False)
+
+
+def group_aggregate(op: str, target: str, group_by: str, k: int = 5, order: str = "desc", filters_json: str = "") -> str:
+    """Agrega por grupo e devolve TOP-K (ou todos se k<=0).
+    Args:
+      op: 'sum'|'mean'|'min'|'max'
+      target: coluna a agregar (ex.: 'VR_COLAB')
+      group_by: coluna de agrupamento (ex.: 'MATRICULA' ou 'SINDICATO')
+      k: quantidade de itens (1 para “quem foi o maior”)
+      order: 'desc' ou 'asc'
+      filters_json: filtros opcionais
+    Retorna JSON: {"ok":true,"itens":[{"grupo":"...", "valor":<float>, "fmt":"R$ ...", "matricula":"...", "nome":"..."}]}
+    """
+    df = _apply_filters(carregar_result(), filters_json)
+    for c in [target, group_by]:
+        if c not in df.columns:
+            return json.dumps({"ok": False, "erro": f"Coluna {c} ausente."}, ensure_ascii=False)
+
+    s = pd.to_numeric(df[target], errors="coerce").fillna(0.0)
+    grp = df.copy()
+    grp[target] = s
+    if op == "sum":
+        agg = grp.groupby(group_by, as_index=False)[target].sum()
+    elif op == "mean":
+        agg = grp.groupby(group_by, as_index=False)[target].mean()
+    elif op == "min":
+        agg = grp.groupby(group_by, as_index=False)[target].min()
+    elif op == "max":
+        agg = grp.groupby(group_by, as_index=False)[target].max()
+    else:
+        return json.dumps({"ok": False, "erro": f"Operação {op} inválida."}, ensure_ascii=False)
+
+    agg = agg.sort_values(target, ascending=(order == "asc"))
+    if k and k > 0:
+        agg = agg.head(int(k))
+
+    itens = []
+    for _, r in agg.iterrows():
+        item = {"grupo": _safe_str(r[group_by]), "valor": float(r[target]), "fmt": _fmt(float(r[target]))}
+        # enriquecimento para matrícula/nome
+        if group_by.upper() == "MATRICULA":
+            mat = str(r[group_by])
+            item["matricula"] = mat
+            if "NOME" in df.columns:
+                n = df[df["MATRICULA"] == mat]["NOME"].dropna()
+                if not n.empty:
+                    item["nome"] = str(n.iloc[0])
+        itens.append(item)
+
+    return json.dumps({"ok": True, "itens": itens}, ensure_ascii=False)
+
+def vr_por_matricula(matricula: str) -> str:
+    """Consulta detalhada por matrícula; soma valores se houver múltiplas linhas.
+    JSON: {ok, matricula, nome?, sindicato?, fmt_vr_colaborador, fmt_vr_empresa, fmt_vr_profissional}"""
+    df = carregar_result()
+    if "MATRICULA" not in df.columns:
+        return json.dumps({"ok": False, "erro": "MATRICULA ausente."}, ensure_ascii=False)
+
+    mat = str(matricula).strip()
+    dfm = df.iloc[indice_result(df).linhas(mat)]  # busca binária em vez de varrer a coluna
+    if dfm.empty:
+        return json.dumps({"ok": False, "erro": f"Matrícula {mat} não encontrada."}, ensure_ascii=False)
+
+    vr_colab = float(dfm.get("VR_COLAB", 0).sum())
+    vr_emp   = float(dfm.get("VR_EMPRESA", 0).sum())
+    vr_prof  = float(dfm.get("VR_PROFISSIONAL", 0).sum())
+
+    nome = None
+    if "NOME" in dfm.columns:
+        nn = dfm["NOME"].dropna()
+        if not nn.empty: nome = str(nn.iloc[0])
+    sindicato = None
+    if "SINDICATO" in dfm.columns and not dfm["SINDICATO"].isna().all():
+        sindicato = str(dfm["SINDICATO"].iloc[0])
+
+    return json.dumps({
+        "ok": True,
+        "matricula": mat,
+        "nome": nome,
+        "sindicato": sindicato,
+        "vr_colaborador": vr_colab, "fmt_vr_colaborador": _fmt(vr_colab),
+        "vr_empresa": vr_emp,       "fmt_vr_empresa": _fmt(vr_emp),
+        "vr_profissional": vr_prof, "fmt_vr_profissional": _fmt(vr_prof),
+    }, ensure_ascii=False)
+
+def analise_zerados(_: str = "") -> str:
+    """Conta VR zerado e aponta possíveis causas (heurísticas).
+    JSON: {"ok": true, "qtd_zerados": <int>, "causas": [{"causa":"...", "qtd": <int>}]}"""
+    df = carregar_result()
+    if "VR_COLAB" not in df.columns:
+        return json.dumps({"ok": False, "erro": "VR_COLAB ausente."}, ensure_ascii=False)
+    base = df[df["VR_COLAB"] == 0]
+    qtd = int(len(base))
+    causas = []
+    if "DIAS_ELEGIVEIS" in base.columns:
+        causas.append({"causa": "Dias elegíveis = 0", "qtd": int((base["DIAS_ELEGIVEIS"] == 0).sum())})
+    if "VALOR_UNITARIO" in base.columns:
+        causas.append({"causa": "Valor unitário = 0", "qtd": int((base["VALOR_UNITARIO"] == 0).sum())})
+    return json.dumps({"ok": True, "qtd_zerados": qtd, "causas": causas}, ensure_ascii=False)
+
+def regras_resumo(_: str = "") -> str:
+    """Resumo das regras do YAML (split 80/20 e desligamento).
+    JSON: {"ok":true,"empresa_pct":0.8,"prof_pct":0.2,"texto":"..."}"""
+    try:
+        with open(REGRAS_YAML_PATH, "r", encoding="utf-8") as f:
+            R = yaml.safe_load(f)
+        P = R.get("parametros", {})
+        split = P.get("split_percentual", {"empresa": 0.80, "profissional": 0.20})
+        reg  = P.get("regra_desligamento", {"ate_dia_15_paga": False, "acima_dia_15_proporcional": True})
+        texto = []
+        texto.append("Desligamento no mês:")
+        texto.append("- Até o dia 15: não paga VR." if not reg.get("ate_dia_15_paga", False) else "- Até o dia 15: paga.")
+        texto.append("- Após o dia 15: proporcional." if reg.get("acima_dia_15_proporcional", True) else "- Após o dia 15: integral.")
+        return json.dumps({"ok": True, "empresa_pct": float(split.get("empresa", 0.8)),
+                           "prof_pct": float(split.get("profissional", 0.2)), "texto": " ".join(texto)}, ensure_ascii=False)
+    except Exception as e:
+        return json.dumps({"ok": False, "erro": f"Falha ao ler regras.yml: {e}"}, ensure_ascii=False)
+
+# --------- Roteador determinístico (atalho sem LLM) ---------
+def _normalizar_pergunta(texto: str) -> str:
+    """Minúsculas, sem acentos/pontuação e com espaços colapsados."""
+    t = unicodedata.normalize("NFD", str(texto).lower())
+    t = "".join(ch for ch in t if unicodedata.category(ch) != "Mn")
+    return " ".join(re.sub(r"[^\w\s]", " ", t).split())
+
+# Perguntas que pedem recortes/combinações ficam com o LLM.
+_RE_COMPLEXA = re.compile(
+    r"\bpor (sindicato|uf|estado|empresa|mes)\b|\bcompar|\bfiltr|\bexceto\b|\bentre\b"
+    r"|\bacima\b|\babaixo\b|\bmaior(es)? que\b|\bmenor(es)? que\b|\bpercentual de\b"
+)
+_RE_MATRICULA = re.compile(r"\bmatricula\D{0,12}?(\d+)\b")
+_RE_NUMERO = re.compile(r"\b(\d{1,3})\b")
+
+def _json(raw: str) -> dict:
+    try:
+        return json.loads(raw)
+    except Exception:
+        return {"ok": False, "erro": str(raw)}
+
+def _rota_soma(coluna: str, rotulo: str):
+    def _exec(_q: str):
+        r = _json(aggregate("sum", coluna))
+        if not r.get("ok"):
+            return r
+        return {"ok": True, "texto": f"{rotulo}: {r['fmt']}."}
+    return _exec
+
+def _rota_media(q: str):
+    pos = bool(re.search(r"\breceber(am)?\b|\brecebe(m)?\b", q))
+    r = _json(aggregate("mean", "VR_COLAB", positive_only=pos))
+    if not r.get("ok"):
+        return r
+    base = "colaboradores que receberam VR" if pos else "colaboradores"
+    return {"ok": True, "texto": f"Valor médio de VR por colaborador: {r['fmt']} (base: {r.get('denominador', 0)} {base})."}
+
+def _rota_top(group_by: str):
+    def _exec(q: str):
+        asc = bool(re.search(r"\bmenor(es)?\b", q))
+        m = _RE_NUMERO.search(q)
+        if m:
+            k = int(m.group(1))
+        elif group_by == "MATRICULA" and re.search(r"\b(maior|menor)\b", q):
+            k = 1
+        else:
+            k = 5
+        r = _json(group_aggregate("sum", "VR_COLAB", group_by, k=k, order="asc" if asc else "desc"))
+        if not r.get("ok"):
+            return r
+        linhas = []
+        for it in r.get("itens", []):
+            if group_by == "MATRICULA":
+                nome = f" – {it['nome']}" if it.get("nome") else ""
+                linhas.append(f"{it['grupo']}{nome}: {it['fmt']}")
+            else:
+                linhas.append(f"{it['grupo']}: {it['fmt']}")
+        if not linhas:
+            return {"ok": True, "texto": "Nenhum registro encontrado."}
+        return {"ok": True, "texto": "\n".join(linhas)}
+    return _exec
+
+def _rota_zerados(_q: str):
+    r = _json(analise_zerados())
+    if not r.get("ok"):
+        return r
+    causas = "; ".join(f"{c['causa']} ({c['qtd']})" for c in r.get("causas", []))
+    texto = f"{r['qtd_zerados']} colaboradores estão com VR zerado."
+    if causas:
+        texto += f" Possíveis causas: {causas}."
+    return {"ok": True, "texto": texto}
+
+def _rota_regras(_q: str):
+    r = _json(regras_resumo())
+    if not r.get("ok"):
+        return r
+    return {"ok": True, "texto": f"{r['texto']} Rateio: empresa {r['empresa_pct']:.0%} / profissional {r['prof_pct']:.0%}."}
+
+def _rota_matricula(q: str):
+    mat = _RE_MATRICULA.search(q).group(1)
+    r = _json(vr_por_matricula(mat))
+    if not r.get("ok"):
+        return r
+    return {"ok": True, "texto": (
+        f"Matrícula {r['matricula']} – {r.get('nome') or '—'} (sindicato: {r.get('sindicato') or '—'}): "
+        f"VR do colaborador {r['fmt_vr_colaborador']}, custo empresa {r['fmt_vr_empresa']}, "
+        f"desconto profissional {r['fmt_vr_profissional']}."
+    )}
+
+# (intenção, ferramenta, casamento, execução) — espelha o ROTEAMENTO DE INTENÇÃO do SYSTEM_PROMPT.
+# Os casamentos são mutuamente exclusivos: se mais de um casar, a pergunta é composta e vai ao LLM.
+ROTAS = [
+    ("vr_matricula", "vr_por_matricula",
+     lambda q: bool(_RE_MATRICULA.search(q)), _rota_matricula),
+    ("zerados", "analise_zerados",
+     lambda q: "zerad" in q, _rota_zerados),
+    ("regras", "regras_resumo",
+     lambda q: bool(re.search(r"\bdia 15\b|\bdesligad|\bproporcional\b|\bregras?\b|\bpercentuais\b", q)),
+     _rota_regras),
+    ("top_sindicatos", "group_aggregate",
+     lambda q: bool(re.search(r"\b(sindicatos?|destinatarios?)\b", q))
+               and bool(re.search(r"\b(top|principais|maiores)\b", q)),
+     _rota_top("SINDICATO")),
+    ("top_colaboradores", "group_aggregate",
+     lambda q: not re.search(r"\b(sindicatos?|destinatarios?)\b", q)
+               and bool(re.search(r"\b(top|maior(es)?|menor(es)?)\b", q))
+               and bool(re.search(r"\b(colaborador(es)?|funcionarios?|vr|valor(es)?)\b", q)),
+     _rota_top("MATRICULA")),
+    ("vr_medio", "aggregate",
+     lambda q: bool(re.search(r"\bmedi[oa]\b", q)), _rota_media),
+    ("custo_empresa", "aggregate",
+     lambda q: "custo" in q, _rota_soma("VR_EMPRESA", "Custo total da empresa")),
+    ("desconto_profissional", "aggregate",
+     lambda q: bool(re.search(r"\bdesconto\b|\bprofissionais pagaram\b", q)),
+     _rota_soma("VR_PROFISSIONAL", "Total descontado dos profissionais")),
+    ("vr_total", "aggregate",
+     lambda q: bool(re.search(r"\b(total|soma)\b", q)) and "custo" not in q and "desconto" not in q
+               and bool(re.search(r"\b(vr|pago|vale)\b", q)),
+     _rota_soma("VR_COLAB", "Total de VR pago aos colaboradores")),
+]
+
+def rotear_pergunta(pergunta: str) -> dict | None:
+    """Resolve perguntas de intenção fixa direto nas tools, sem chamar o LLM.
+    Retorna {"intencao","ferramentas","resposta","ok"} ou None quando a pergunta não é roteável
+    (ok=False: a tool respondeu com erro/"não encontrado" — o texto é exibido, mas não vai ao cache)."""
+    q = _normalizar_pergunta(pergunta)
+    if not q or _RE_COMPLEXA.search(q):
+        return None
+    casadas = [r for r in ROTAS if r[2](q)]
+    if len(casadas) != 1:
+        return None
+    intencao, ferramenta, _, executar = casadas[0]
+    try:
+        r = executar(q)
+    except Exception:
+        return None
+    texto = r["texto"] if r.get("ok") else r.get("erro", "Consulta não retornou resultados.")
+    return {"intencao": intencao, "ferramentas": [ferramenta], "resposta": texto, "ok": bool(r.get("ok"))}
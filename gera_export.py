@@ -1,27 +1,14 @@
 # gera_export.py
-import yaml, pandas as pd
+import sys
+from ferramentas import carregar_regras, carregar_result, montar_export, exportar_bytes
 
-REGRAS = yaml.safe_load(open("regras.yml", "r", encoding="utf-8"))
-result_path  = REGRAS["arquivos"]["result_xlsx"]
+REGRAS = carregar_regras()
 export_path  = REGRAS["layout"]["arquivo_export"]
-mapping      = REGRAS["layout"]["mapping"]
-export_cols  = REGRAS["layout"]["export_columns"]
+competencia  = sys.argv[1] if len(sys.argv) > 1 else ""   # ex.: python gera_export.py 05/2025
 
-df = pd.read_excel(result_path)
-
-out = pd.DataFrame()
-for col in export_cols:
-    src = mapping.get(col, {})
-    if "from" in src and src["from"] in df.columns:
-        out[col] = df[src["from"]]
-    else:
-        out[col] = src.get("default", "")
-
-# garantia de tipos básicos (opcional)
-num_cols = ["Dias", "VALOR DIÁRIO VR", "TOTAL", "Custo empresa", "Desconto profissional"]
-for c in num_cols:
-    if c in out.columns: out[c] = pd.to_numeric(out[c], errors="coerce")
+out = montar_export(carregar_result(), REGRAS, competencia=competencia)
 
 # grava
-out.to_excel(export_path, index=False)
+with open(export_path, "wb") as f:
+    f.write(exportar_bytes(out, "xlsx"))
 print(f"[OK] Exportado: {export_path}  ({len(out):,} linhas)")
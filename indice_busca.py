@@ -0,0 +1,116 @@
+# indice_busca.py
+# -------------------------------------------
+# Índice de prefixo (arrays ordenados + busca binária) sobre MATRICULA e NOME.
+# Construído uma vez por versão do RESULT; cada consulta é O(log n + k):
+# duas buscas binárias (numpy.searchsorted) delimitam a faixa de chaves com o prefixo.
+# -------------------------------------------
+
+import unicodedata
+import numpy as np
+import pandas as pd
+
+_FIM = "\U0010ffff"  # maior code point: prefixo + _FIM limita a faixa [prefixo, prefixo~)
+
+def _normalizar(s: pd.Series) -> pd.Series:
+    """Maiúsculas, sem acentos e com espaços colapsados (vetorizado)."""
+    return (s.fillna("").astype(str)
+             .str.normalize("NFKD").str.encode("ascii", errors="ignore").str.decode("ascii")
+             .str.upper().str.replace(r"\s+", " ", regex=True).str.strip())
+
+def _normalizar_texto(texto: str) -> str:
+    """Mesma normalização de _normalizar, para um único texto (consulta)."""
+    t = unicodedata.normalize("NFKD", texto).encode("ascii", errors="ignore").decode("ascii")
+    return " ".join(t.upper().split())
+
+def _cabe(chaves: np.ndarray, texto: str) -> bool:
+    """Texto maior que o itemsize do array nunca casa — e passá-lo ao searchsorted
+    faria o numpy converter o array inteiro para um dtype maior (O(n))."""
+    return len(texto) <= chaves.dtype.itemsize // 4
+
+def _faixa(chaves: np.ndarray, prefixo: str) -> tuple[int, int]:
+    if not len(chaves) or not _cabe(chaves, prefixo):
+        return 0, 0
+    lo = int(np.searchsorted(chaves, prefixo, side="left"))
+    if _cabe(chaves, prefixo + _FIM):
+        hi = int(np.searchsorted(chaves, prefixo + _FIM, side="left"))
+    else:  # prefixo já tem o tamanho máximo: só a própria chave casa
+        hi = int(np.searchsorted(chaves, prefixo, side="right"))
+    return lo, hi
+
+class IndicePrefixo:
+    """Sugestões por prefixo de matrícula ou de qualquer palavra do nome.
+
+    - matrículas: array ordenado de chaves + posição da linha no frame.
+    - nomes: cada palavra do nome normalizado vira uma chave (palavra → linha);
+      consultas com várias palavras usam a mais longa no índice e filtram o resto.
+    """
+
+    def __init__(self, df: pd.DataFrame, col_matricula: str = "MATRICULA", col_nome: str = "NOME"):
+        self.df = df
+        mats = (df[col_matricula].astype(str).str.strip() if col_matricula in df.columns
+                else pd.Series([], dtype=str))
+        ordem = np.argsort(mats.to_numpy().astype(str), kind="stable")
+        self._mat_chaves = mats.to_numpy().astype(str)[ordem]
+        self._mat_linhas = ordem
+
+        self.col_nome = col_nome if col_nome in df.columns else None
+        if self.col_nome:
+            self._nomes = _normalizar(df[self.col_nome]).to_numpy().astype(str)
+            palavras = pd.Series(self._nomes).str.split(" ").explode()
+            palavras = palavras[palavras.fillna("") != ""]
+            chaves = palavras.to_numpy().astype(str)
+            linhas = palavras.index.to_numpy()
+            ordem = np.argsort(chaves, kind="stable")
+            self._nome_chaves, self._nome_linhas = chaves[ordem], linhas[ordem]
+        else:
+            self._nomes = None
+
+    def __len__(self) -> int:
+        return len(self._mat_chaves)
+
+    def linhas(self, matricula: str) -> np.ndarray:
+        """Posições (iloc) com a matrícula exata."""
+        chave = str(matricula).strip()
+        if not len(self._mat_chaves) or not _cabe(self._mat_chaves, chave):
+            return self._mat_linhas[:0]
+        lo = int(np.searchsorted(self._mat_chaves, chave, side="left"))
+        hi = int(np.searchsorted(self._mat_chaves, chave, side="right"))
+        return self._mat_linhas[lo:hi]
+
+    def buscar(self, texto: str, limite: int = 10) -> np.ndarray:
+        """Posições (iloc) das linhas cuja matrícula ou nome começam com `texto`."""
+        texto = (texto or "").strip()
+        if not texto:
+            return np.empty(0, dtype=np.int64)
+        lo, hi = _faixa(self._mat_chaves, texto)
+        achados = list(self._mat_linhas[lo:min(hi, lo + limite)])
+        if self._nomes is not None and len(achados) < limite:
+            termos = _normalizar_texto(texto).split(" ")
+            guia = max(termos, key=len)
+            outros = [t for t in termos if t != guia]
+            lo, hi = _faixa(self._nome_chaves, guia)
+            vistos = set(achados)
+            for i in self._nome_linhas[lo:hi]:  # para assim que juntar `limite` sugestões
+                if outros and not all(any(p.startswith(t) for p in self._nomes[i].split(" ")) for t in outros):
+                    continue
+                if i not in vistos:
+                    vistos.add(i)
+                    achados.append(i)
+                    if len(achados) >= limite:
+                        break
+        return np.asarray(achados, dtype=np.int64)
+
+    def sugerir(self, texto: str, limite: int = 10) -> list[dict]:
+        """Sugestões prontas para a UI: [{"matricula","nome","sindicato"}]."""
+        pos = self.buscar(texto, limite)
+        if not len(pos):
+            return []
+        linhas = self.df.iloc[pos]
+        out = []
+        for _, r in linhas.iterrows():
+            out.append({
+                "matricula": str(r.get("MATRICULA", "")).strip(),
+                "nome": (str(r[self.col_nome]) if self.col_nome and pd.notna(r[self.col_nome]) else None),
+                "sindicato": (str(r["SINDICATO"]) if "SINDICATO" in r and pd.notna(r["SINDICATO"]) else None),
+            })
+        return out
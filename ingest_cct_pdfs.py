@@ -0,0 +1,288 @@
+"""
+Ingere as convenções coletivas (CCTs, em PDF) na mesma collection do RESULT/LAYOUT.
+
+Lê os PDFs de CCT_DIR (padrão ./data/raw/CCT), extrai o texto página a página
+num pool de processos (faixas de páginas de todos os PDFs alteradas em paralelo),
+fatia em trechos com sobreposição e envia pelo mesmo pipeline de
+embeddings/upsert da ingestão das planilhas (ingest_excel_to_qdrant.upsert_pipeline).
+
+Cada trecho vai com source="CCT", o nome do arquivo, a página inicial e os campos
+SINDICATO/UF_BASE (filtráveis na busca, como nos registros do RESULT):
+  - UF: sigla no nome do arquivo (ex.: "CCT_SINDPD_SP_2025.pdf");
+  - SINDICATO: o sindicato do RESULT cuja sigla aparece no nome do arquivo
+    (ou o único sindicato daquela UF).
+
+PDF inalterado não é reextraído: o hash do arquivo (junto com --tamanho e
+--sobreposicao) entra no content_hash de cada trecho e os IDs são determinísticos
+(arquivo + nº do trecho); se todos os trechos já gravados trazem o hash atual, o
+arquivo é pulado — mudar o fatiamento refaz os trechos. Trechos de PDFs removidos ou
+encurtados são apagados.
+
+Teste local sem custo: VECTOR_STORE=local python ingest_cct_pdfs.py --fake-embeddings
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from langchain_core.documents import Document
+
+from cache_embeddings import EmbeddingsEmCache
+from cache_respostas import hash_arquivo
+from ingest_excel_to_qdrant import (
+    BATCH_EMBED, EMBED_CONCORRENTES, UPSERT_CONCORRENTES,
+    content_hash, die, point_id, upsert_pipeline, with_retries,
+)
+from modelos_embedding import FakeEmbeddings, criar_embeddings, identificador_modelo
+from store_vetorial import abrir_store
+
+SOURCE_CCT = "CCT"
+CCT_DIR = os.getenv("CCT_DIR", "./data/raw/CCT")
+PAGINAS_POR_TAREFA = 8          # faixa de páginas extraída por tarefa do pool
+TRECHO_CARACTERES = 1200        # tamanho alvo de cada trecho
+TRECHO_SOBREPOSICAO = 150       # caracteres repetidos do trecho anterior (contexto)
+UFS = {"AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA", "PB", "PE",
+       "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO"}
+
+# --------- Extração (processos) ---------
+def _extrair_paginas(path: str, ini: int, fim: int) -> tuple[str, int, list[str]]:
+    """Texto das páginas [ini, fim) de um PDF (roda em processo filho)."""
+    from pypdf import PdfReader
+    leitor = PdfReader(path)
+    return path, ini, [(leitor.pages[i].extract_text() or "") for i in range(ini, fim)]
+
+def _contar_paginas(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+def extrair_pdfs(paths: list[str], processos: int, paginas_por_tarefa: int = PAGINAS_POR_TAREFA
+                 ) -> dict[str, list[str]]:
+    """{path: [texto de cada página]}; as faixas de páginas de todos os PDFs dividem o mesmo pool."""
+    tarefas = []
+    for path in paths:
+        n = _contar_paginas(path)
+        tarefas += [(path, i, min(n, i + paginas_por_tarefa)) for i in range(0, n, paginas_por_tarefa)]
+    faixas: dict[str, dict[int, list[str]]] = {p: {} for p in paths}
+    if processos <= 1 or len(tarefas) <= 1:
+        resultados = (_extrair_paginas(*t) for t in tarefas)
+        for path, ini, textos in resultados:
+            faixas[path][ini] = textos
+    else:
+        with ProcessPoolExecutor(processos) as pool:
+            for path, ini, textos in pool.map(_extrair_paginas, *zip(*tarefas)):
+                faixas[path][ini] = textos
+    return {p: [t for ini in sorted(f) for t in f[ini]] for p, f in faixas.items()}
+
+# --------- Trechos ---------
+def fatiar(paginas: list[str], tamanho: int = TRECHO_CARACTERES,
+           sobreposicao: int = TRECHO_SOBREPOSICAO) -> list[tuple[int, str]]:
+    """[(página inicial, texto)]: junta parágrafos até `tamanho` e repete o fim do trecho anterior.
+
+    Parágrafo maior que `tamanho` é cortado em pedaços; a página é 1-based.
+    """
+    if tamanho < 1 or not 0 <= sobreposicao < tamanho:
+        raise ValueError(f"sobreposicao ({sobreposicao}) precisa ficar entre 0 e tamanho ({tamanho}) - 1")
+    trechos: list[tuple[int, str]] = []
+    atual, pagina_atual = "", 1
+    for num, texto in enumerate(paginas, start=1):
+        paragrafos = [re.sub(r"\s+", " ", p).strip() for p in re.split(r"\n\s*\n|(?<=[.;:])\n", texto)]
+        for par in filter(None, paragrafos):
+            while par:
+                if not atual:
+                    pagina_atual = num
+                espaco = tamanho - len(atual) - (1 if atual else 0)
+                if len(par) <= espaco:
+                    atual = f"{atual} {par}" if atual else par
+                    par = ""
+                    continue
+                if atual:  # fecha o trecho e recomeça com a sobreposição
+                    trechos.append((pagina_atual, atual))
+                    # a sobreposição deixa espaço para o separador + 1 caractere novo
+                    limite = min(sobreposicao, tamanho - 2)
+                    atual = atual[-limite:].split(" ", 1)[-1] if limite > 0 else ""
+                    pagina_atual = num
+                    if len(atual) + 1 + len(par) <= tamanho:
+                        continue
+                corte = max(1, tamanho - len(atual) - (1 if atual else 0))
+                corte = par.rfind(" ", 0, corte + 1) if " " in par[1:corte + 1] else corte  # não parte palavras
+                atual = f"{atual} {par[:corte]}" if atual else par[:corte]
+                par = par[corte:].lstrip()
+    if atual:
+        trechos.append((pagina_atual, atual))
+    return trechos
+
+# --------- Sindicato/UF ---------
+def sindicatos_conhecidos(path: str) -> pd.DataFrame:
+    """SINDICATO/UF_BASE distintos do RESULT (vazio se a planilha não existir)."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["SINDICATO", "UF_BASE"])
+    df = pd.read_excel(path, engine="openpyxl", usecols=lambda c: c in ("SINDICATO", "UF_BASE"))
+    if not {"SINDICATO", "UF_BASE"} <= set(df.columns):
+        return pd.DataFrame(columns=["SINDICATO", "UF_BASE"])
+    return df.dropna().astype(str).drop_duplicates().reset_index(drop=True)
+
+def identificar_sindicato(arquivo: str, conhecidos: pd.DataFrame) -> dict:
+    """Campos SINDICATO/UF_BASE inferidos do nome do arquivo (omitidos quando não há certeza)."""
+    tokens = set(re.split(r"[^A-Z0-9]+", os.path.splitext(arquivo)[0].upper()))
+    campos: dict = {}
+    ufs = tokens & UFS
+    if len(ufs) == 1:
+        campos["UF_BASE"] = ufs.pop()
+    candidatos = conhecidos
+    if "UF_BASE" in campos:
+        candidatos = candidatos[candidatos["UF_BASE"] == campos["UF_BASE"]]
+    siglas = candidatos["SINDICATO"].str.split().str[0].str.upper()
+    por_sigla = candidatos[siglas.isin(tokens)]
+    escolhido = candidatos if len(por_sigla) != 1 and "UF_BASE" in campos else por_sigla
+    if len(escolhido) == 1:
+        campos["SINDICATO"] = escolhido.iloc[0]["SINDICATO"]
+        campos.setdefault("UF_BASE", escolhido.iloc[0]["UF_BASE"])
+    return campos
+
+# --------- Sincronização ---------
+def versao_pdf(hash_pdf: str, tamanho: int, sobreposicao: int) -> str:
+    """Hash do PDF + parâmetros do fatiamento (o mesmo PDF fatiado de outro jeito conta como alterado)."""
+    return content_hash(hash_pdf, {"tamanho": tamanho, "sobreposicao": sobreposicao})
+
+def _hash_trecho(hash_pdf: str, texto: str, campos: dict) -> str:
+    # prefixo = hash do PDF: permite decidir "inalterado" sem reextrair o texto
+    return hash_pdf[:16] + content_hash(texto, campos)[:16]
+
+def ids_gravados(arquivo: str, hash_pdf: str, atuais: dict[str, str]) -> tuple[list[str], bool]:
+    """IDs já gravados do arquivo (trechos 0, 1, ... consecutivos) e se todos trazem o hash atual."""
+    ids, i = [], 0
+    while (pid := point_id(SOURCE_CCT, f"{arquivo}#{i}")) in atuais:
+        ids.append(pid)
+        i += 1
+    return ids, bool(ids) and all((atuais[p] or "").startswith(hash_pdf[:16]) for p in ids)
+
+def documentos_pdf(arquivo: str, hash_pdf: str, paginas: list[str], campos: dict,
+                   tamanho: int, sobreposicao: int) -> list[Document]:
+    docs = []
+    for i, (pagina, texto) in enumerate(fatiar(paginas, tamanho, sobreposicao)):
+        meta = {
+            "source": SOURCE_CCT,
+            "arquivo": arquivo,
+            "pagina": pagina,
+            "row_key": f"{arquivo}#{i}",
+            "point_id": point_id(SOURCE_CCT, f"{arquivo}#{i}"),
+            "content_hash": _hash_trecho(hash_pdf, texto, campos),
+            **campos,
+        }
+        docs.append(Document(page_content=texto, metadata=meta))
+    return docs
+
+def sync_pdfs(store, embeddings, paths: list[str], conhecidos: pd.DataFrame, *, processos: int,
+              tamanho: int = TRECHO_CARACTERES, sobreposicao: int = TRECHO_SOBREPOSICAO,
+              forcar: bool = False, **pipeline) -> dict:
+    """Reextrai/embeda só os PDFs novos ou alterados e apaga trechos que deixaram de existir."""
+    t0 = time.perf_counter()
+    atuais = store.hashes([SOURCE_CCT])
+    vigentes: set[str] = set()
+    pendentes: list[tuple[str, str, str]] = []  # (path, arquivo, hash)
+    cont = {"pdfs": len(paths), "pulados": 0, "processados": 0, "trechos": 0}
+    for path in paths:
+        arquivo = os.path.basename(path)
+        hash_pdf = versao_pdf(hash_arquivo(path), tamanho, sobreposicao)
+        ids, inalterado = ids_gravados(arquivo, hash_pdf, atuais)
+        if inalterado and not forcar:
+            vigentes.update(ids)
+            cont["pulados"] += 1
+        else:
+            pendentes.append((path, arquivo, hash_pdf))
+
+    textos = extrair_pdfs([p for p, _, _ in pendentes], processos) if pendentes else {}
+    cont["extracao_s"] = round(time.perf_counter() - t0, 2)
+
+    def lotes():
+        buffer: list[Document] = []
+        for path, arquivo, hash_pdf in pendentes:
+            campos = identificar_sindicato(arquivo, conhecidos)
+            docs = documentos_pdf(arquivo, hash_pdf, textos[path], campos, tamanho, sobreposicao)
+            if not docs:
+                print(f"[AVISO] {arquivo}: nenhum texto extraído (PDF digitalizado sem OCR?)", file=sys.stderr)
+            etiqueta = " / ".join(str(campos[c]) for c in ("SINDICATO", "UF_BASE") if c in campos) or "sem sindicato"
+            print(f"[INFO] {arquivo}: {len(textos[path])} páginas, {len(docs)} trechos ({etiqueta})")
+            cont["processados"] += 1
+            cont["trechos"] += len(docs)
+            for d in docs:
+                vigentes.add(d.metadata["point_id"])
+            buffer.extend(docs)
+            while len(buffer) >= BATCH_EMBED:
+                yield buffer[:BATCH_EMBED]
+                buffer = buffer[BATCH_EMBED:]
+        if buffer:
+            yield buffer
+
+    cont["gravados"] = upsert_pipeline(store, embeddings, lotes(), **pipeline)
+    removidos = [pid for pid in atuais if pid not in vigentes]
+    if removidos:
+        with_retries(store.remover, removidos, descricao="delete")
+    store.finalizar()
+    cont["removidos"] = len(removidos)
+    cont["segundos"] = round(time.perf_counter() - t0, 2)
+    return cont
+
+def main():
+    load_dotenv()
+
+    ap = argparse.ArgumentParser(description="Ingestão incremental das CCTs (PDF) no Qdrant (ou índice local)")
+    ap.add_argument("--dir", default=CCT_DIR, help="pasta com os PDFs (padrão: env CCT_DIR)")
+    ap.add_argument("--fake-embeddings", action="store_true",
+                    help="usa embeddings falsos (sem API, sem cache) — para testes")
+    ap.add_argument("--latencia-fake", type=float, default=0.0)
+    ap.add_argument("--processos", type=int, default=os.cpu_count() or 1,
+                    help="processos da extração de texto (1 = sem pool)")
+    ap.add_argument("--tamanho", type=int, default=TRECHO_CARACTERES, help="caracteres por trecho")
+    ap.add_argument("--sobreposicao", type=int, default=TRECHO_SOBREPOSICAO,
+                    help="caracteres repetidos do trecho anterior (menor que --tamanho)")
+    ap.add_argument("--forcar", action="store_true", help="reprocessa mesmo os PDFs inalterados")
+    ap.add_argument("--embed-workers", type=int, default=EMBED_CONCORRENTES)
+    ap.add_argument("--upsert-workers", type=int, default=UPSERT_CONCORRENTES)
+    args = ap.parse_args()
+    if args.tamanho < 1 or not 0 <= args.sobreposicao < args.tamanho:
+        ap.error("use --tamanho >= 1 e 0 <= --sobreposicao < --tamanho "
+                 "(senão os trechos passam do tamanho pedido)")
+
+    if not os.path.isdir(args.dir):
+        die(f"Pasta de CCTs não encontrada: {args.dir}")
+    paths = sorted(os.path.join(args.dir, f) for f in os.listdir(args.dir) if f.lower().endswith(".pdf"))
+    print(f"[INFO] {len(paths)} PDF(s) em {args.dir}")
+
+    collection = os.getenv("QDRANT_COLLECTION", "desafio4_vr").strip()
+    try:
+        store = abrir_store(collection)
+    except ValueError as e:
+        die(str(e))
+
+    if args.fake_embeddings:
+        embeddings = FakeEmbeddings(latencia=args.latencia_fake)
+    else:
+        embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+        embeddings = EmbeddingsEmCache(
+            criar_embeddings(embedding_model), modelo=identificador_modelo(embedding_model),
+            arquivo=os.getenv("EMBEDDINGS_CACHE", "./data/ETL_OK/_cache/embeddings.sqlite"),
+        )
+    store.garantir(len(embeddings.embed_query("dimensão de teste")))
+
+    conhecidos = sindicatos_conhecidos(os.getenv("RESULT_XLSX", "./data/ETL_OK/VR_MENSAL_RESULT.xlsx"))
+    delta = sync_pdfs(store, embeddings, paths, conhecidos, processos=args.processos,
+                      tamanho=args.tamanho, sobreposicao=args.sobreposicao, forcar=args.forcar,
+                      embed_workers=args.embed_workers, upsert_workers=args.upsert_workers)
+    print(f"[OK] CCTs em '{collection}': {delta['processados']} processado(s), {delta['pulados']} inalterado(s), "
+          f"{delta['trechos']} trechos, {delta['removidos']} removidos.")
+    print(f"[INFO] Extração {delta['extracao_s']}s; total {delta['segundos']}s")
+
+    if isinstance(embeddings, EmbeddingsEmCache):
+        print(f"[INFO] Cache de embeddings: {embeddings.estatisticas()}")
+        if hasattr(embeddings.backend, "fechar"):
+            embeddings.backend.fechar()
+
+if __name__ == "__main__":
+    main()
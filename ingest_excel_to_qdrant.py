@@ -5,72 +5,260 @@ Concatena as linhas como “registro textual” (coluna: valor) e guarda metadad
 
 Cria a collection no Qdrant Cloud se não existir e upserteia os vetores.
 
-Usa OpenAI Embeddings text-embedding-3-small.
+Ingestão incremental: cada linha tem ID determinístico (uuid5 de fonte + matrícula)
+e o hash do texto no payload. Só linhas novas/alteradas são embedadas e enviadas;
+linhas que sumiram da planilha são apagadas da collection.
+
+Envio em pipeline: embeddings e upserts rodam em pools separados (o lote N+1 é
+embedado enquanto o N é gravado), com limite de lotes em voo e retentativas com
+backoff exponencial. Cada upsert confirmado (wait=True) já grava o hash do
+conteúdo; se a execução cair, a próxima pula o que já foi gravado e continua
+de onde parou. No índice local (VECTOR_STORE=local) "gravado" = consolidado em
+disco, o que acontece a cada VECTOR_CHECKPOINT_LOTES lotes (padrão 20).
+
+Teste local sem custo: QDRANT_URL=:memory: python ingest_excel_to_qdrant.py --fake-embeddings
+Sem servidor Qdrant: VECTOR_STORE=local grava um índice embutido em data/ETL_OK/_vetores
+(ver store_vetorial.py).
+
+Embeddings: EMBEDDING_MODEL escolhe o backend (padrão OpenAI text-embedding-3-small;
+"local:<modelo>" roda sentence-transformers em CPU, sem rede) — ver modelos_embedding.py.
 """
 
 import os
 import sys
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
-from qdrant_client import QdrantClient
-from qdrant_client.http import models as rest
-
-from langchain_openai import OpenAIEmbeddings
-from langchain_qdrant import Qdrant  # <-- pacote novo
 from langchain_core.documents import Document
 
+from busca_vetorial import extrair_payload
+from cache_embeddings import EmbeddingsEmCache
+from modelos_embedding import FakeEmbeddings, criar_embeddings, identificador_modelo
+from store_vetorial import abrir_store
+
+# Namespace fixo dos IDs: mesma fonte + mesma chave => mesmo ponto em todas as execuções.
+NAMESPACE_PONTOS = uuid.uuid5(uuid.NAMESPACE_URL, "desafio4_vr/pontos")
+COLUNAS_CHAVE = ["MATRICULA", "Matricula"]
+PAYLOAD_VERSAO = "2"  # entra no hash: mudar o formato do payload força a regravação dos pontos
+BATCH_EMBED = 128
+EMBED_CONCORRENTES = int(os.getenv("INGEST_EMBED_CONCORRENTES", "4"))
+UPSERT_CONCORRENTES = int(os.getenv("INGEST_UPSERT_CONCORRENTES", "2"))
+TENTATIVAS = int(os.getenv("INGEST_TENTATIVAS", "5"))
+
 def die(msg: str, code: int = 1):
     print(f"[ERRO] {msg}", file=sys.stderr)
     sys.exit(code)
 
-def serialize_row(row: pd.Series) -> str:
-    parts = []
-    for k, v in row.items():
-        if pd.isna(v):
-            continue
-        parts.append(f"{k}: {v}")
-    return "\n".join(parts)
-
-def load_frames(result_path: str, layout_path: str):
-    if not os.path.exists(result_path):
-        die(f"Arquivo não encontrado: {result_path}")
-    if not os.path.exists(layout_path):
-        die(f"Arquivo não encontrado: {layout_path}")
-
-    df_res = pd.read_excel(result_path, engine="openpyxl")
-    df_lay = pd.read_excel(layout_path, engine="openpyxl")
-
-    return df_res, df_lay
-
-def build_documents(df: pd.DataFrame, source_name: str) -> list:
-    docs = []
-    for idx, row in df.iterrows():
-        text = serialize_row(row)
-        meta = {"source": source_name, "row_index": int(idx)}
-        docs.append(Document(page_content=text, metadata=meta))
-    return docs
-
-def ensure_collection(client: QdrantClient, collection: str, vector_size: int):
-    existing = [c.name for c in client.get_collections().collections]
-    if collection in existing:
-        print(f"[INFO] Collection '{collection}' já existe. Usando existente.")
-        return
-
-    print(f"[INFO] Criando collection '{collection}' (dim={vector_size}, métrica=Cosine)")
-    client.create_collection(
-        collection_name=collection,
-        vectors_config=rest.VectorParams(
-            size=vector_size,
-            distance=rest.Distance.COSINE,
-        ),
-    )
+def serialize_frame(df: pd.DataFrame) -> np.ndarray:
+    """Registro textual ("coluna: valor" por linha, nulos omitidos), montado coluna a coluna.
+
+    Equivale a juntar f"{k}: {v}" de cada célula não nula com "\\n", mas com uma
+    operação vetorizada por coluna em vez de um loop Python por célula.
+    """
+    texto = np.full(len(df), "", dtype=object)
+    for col in df.columns:
+        s = df[col]
+        valores = (s.astype(object) if pd.api.types.is_datetime64_any_dtype(s) else s).astype(str)
+        parte = np.where(s.notna().to_numpy(), (f"{col}: " + valores).to_numpy(dtype=object), "")
+        sep = np.where((texto != "") & (parte != ""), "\n", "")
+        texto = texto + sep + parte
+    return texto
+
+def load_frame(path: str) -> pd.DataFrame:
+    if not os.path.exists(path):
+        die(f"Arquivo não encontrado: {path}")
+    return pd.read_excel(path, engine="openpyxl")
+
+def row_keys(df: pd.DataFrame) -> pd.Series:
+    """Chave estável por linha: matrícula (+ nº da ocorrência, se repetida); sem matrícula, o índice."""
+    col = next((c for c in COLUNAS_CHAVE if c in df.columns), None)
+    if col is None:
+        return pd.Series([str(i) for i in df.index], index=df.index)
+    mat = df[col].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    ocorrencia = mat.groupby(mat).cumcount()
+    return mat.where(ocorrencia == 0, mat + "#" + ocorrencia.astype(str))
+
+def point_id(source_name: str, key: str) -> str:
+    return str(uuid.uuid5(NAMESPACE_PONTOS, f"{source_name}:{key}"))
+
+def content_hash(text: str, payload: dict | None = None) -> str:
+    base = f"{text}\0{PAYLOAD_VERSAO}\0{json.dumps(payload or {}, sort_keys=True, ensure_ascii=False)}"
+    return hashlib.sha256(base.encode("utf-8")).hexdigest()[:32]
+
+def iter_documents(df: pd.DataFrame, source_name: str, batch_size: int = BATCH_EMBED,
+                   bloco_serializacao: int = 8192, competencia: str = "") -> Iterator[list]:
+    """Gera lotes de `batch_size` Documents; só um bloco de linhas fica materializado.
+
+    A serialização vetorizada roda por blocos maiores (amortiza o custo fixo por coluna)
+    e cada bloco é fatiado nos lotes de envio. Os metadados levam os campos tipados
+    de busca_vetorial.CAMPOS_PAYLOAD (filtráveis dentro do Qdrant).
+    """
+    keys = row_keys(df).to_numpy()
+    for ini_bloco in range(0, len(df), bloco_serializacao):
+        bloco = df.iloc[ini_bloco:ini_bloco + bloco_serializacao]
+        textos = serialize_frame(bloco)
+        payloads = extrair_payload(bloco, competencia)
+        indices = bloco.index.to_numpy()
+        chaves = keys[ini_bloco:ini_bloco + bloco_serializacao]
+        for ini in range(0, len(bloco), batch_size):
+            lote = []
+            for idx, key, text, campos in zip(indices[ini:ini + batch_size], chaves[ini:ini + batch_size],
+                                              textos[ini:ini + batch_size], payloads[ini:ini + batch_size]):
+                meta = {
+                    "source": source_name,
+                    "row_index": int(idx),
+                    "row_key": key,
+                    "point_id": point_id(source_name, key),
+                    "content_hash": content_hash(text, campos),
+                    **campos,
+                }
+                lote.append(Document(page_content=text, metadata=meta))
+            yield lote
+
+def iter_sources(fontes: list[tuple[str, str]], batch_size: int = BATCH_EMBED,
+                 competencia: str = "") -> Iterator[list]:
+    """Lê uma planilha por vez e encadeia seus lotes (a anterior é liberada antes da próxima)."""
+    for source_name, path in fontes:
+        df = load_frame(path)
+        print(f"[INFO] {source_name}: {len(df)} linhas")
+        yield from iter_documents(df, source_name, batch_size, competencia=competencia)
+        del df
+
+def with_retries(fn, *args, tentativas: int = TENTATIVAS, base: float = 1.0, teto: float = 30.0,
+                 descricao: str = "chamada"):
+    """Chama fn(*args); em erro, espera base·2^i (com jitter, até `teto`) e tenta de novo."""
+    for i in range(tentativas):
+        try:
+            return fn(*args)
+        except Exception as e:
+            if i == tentativas - 1:
+                raise
+            espera = min(teto, base * 2 ** i) * random.uniform(0.5, 1.0)
+            print(f"[AVISO] {descricao} falhou ({e}); nova tentativa em {espera:.1f}s "
+                  f"({i + 2}/{tentativas})", file=sys.stderr)
+            time.sleep(espera)
+
+def upsert_pipeline(store, embeddings, lotes: Iterable[list], *,
+                    embed_workers: int = EMBED_CONCORRENTES, upsert_workers: int = UPSERT_CONCORRENTES,
+                    tentativas: int = TENTATIVAS) -> int:
+    """Embeda e grava os lotes com sobreposição; devolve quantos vetores foram gravados.
+
+    No máximo 2×embed_workers lotes ficam em voo (memória limitada); o primeiro erro
+    que esgotar as retentativas interrompe a leitura de novos lotes e é relançado.
+    """
+    if not store.escrita_concorrente:
+        upsert_workers = 1
+    vagas = threading.BoundedSemaphore(2 * embed_workers)
+    erros: list[BaseException] = []
+    gravados = [0]
+    trava = threading.Lock()
+
+    def gravar(lote: list, vetores: list) -> None:
+        with_retries(store.gravar, lote, vetores, tentativas=tentativas, descricao="upsert")
+        with trava:
+            gravados[0] += len(lote)
+            total = gravados[0]
+        print(f"[INFO] Upsert de {len(lote)} vetores ({total} no total)")
+
+    with ThreadPoolExecutor(upsert_workers, thread_name_prefix="upsert") as pool_upsert:
+        def embedar(lote: list) -> None:
+            try:
+                vetores = with_retries(embeddings.embed_documents, [d.page_content for d in lote],
+                                       tentativas=tentativas, descricao="embedding")
+                pool_upsert.submit(gravar, lote, vetores).add_done_callback(concluir)
+            except BaseException as e:
+                erros.append(e)
+                vagas.release()
+
+        def concluir(fut) -> None:
+            if fut.exception() is not None:
+                erros.append(fut.exception())
+            vagas.release()
+
+        with ThreadPoolExecutor(embed_workers, thread_name_prefix="embed") as pool_embed:
+            for lote in lotes:
+                vagas.acquire()
+                if erros:
+                    vagas.release()
+                    break
+                pool_embed.submit(embedar, lote)
+    if erros:
+        raise erros[0]
+    return gravados[0]
+
+def sync_documents(store, embeddings, batches: Iterable[list], sources: list[str], **pipeline) -> dict:
+    """Aplica o delta em streaming: embeda/upserteia só o que é novo ou mudou e apaga o que sumiu.
+
+    `store` é um StoreQdrant ou StoreLocal (store_vetorial.py). No Qdrant o payload segue
+    o formato do langchain_qdrant (page_content + metadata), legível pelo retriever do LangChain.
+    """
+    t0 = time.perf_counter()
+    atuais = store.hashes(sources)
+    vigentes: set[str] = set()
+    cont = {"novos": 0, "alterados": 0, "removidos": 0, "inalterados": 0}
+
+    def alterados():
+        pendentes: list = []
+        for batch in batches:
+            for d in batch:
+                pid = d.metadata["point_id"]
+                vigentes.add(pid)
+                if pid not in atuais:
+                    cont["novos"] += 1
+                elif atuais[pid] != d.metadata["content_hash"]:
+                    cont["alterados"] += 1
+                else:
+                    cont["inalterados"] += 1
+                    continue
+                pendentes.append(d)
+            while len(pendentes) >= BATCH_EMBED:
+                yield pendentes[:BATCH_EMBED]
+                pendentes = pendentes[BATCH_EMBED:]
+        if pendentes:
+            yield pendentes
+
+    cont["gravados"] = upsert_pipeline(store, embeddings, alterados(), **pipeline)
+
+    removidos = [pid for pid in atuais if pid not in vigentes]
+    if removidos:
+        with_retries(store.remover, removidos, descricao="delete")
+    store.finalizar()
+    cont["removidos"] = len(removidos)
+    cont["segundos"] = round(time.perf_counter() - t0, 2)
+    cont["vetores_por_s"] = round(cont["gravados"] / cont["segundos"], 1) if cont["segundos"] else 0.0
+    return cont
 
 def main():
     load_dotenv()
 
-    url = os.getenv("QDRANT_URL", "").strip()
-    api_key = os.getenv("QDRANT_API_KEY", "").strip()
+    ap = argparse.ArgumentParser(description="Ingestão incremental do RESULT/LAYOUT no Qdrant (ou índice local)")
+    ap.add_argument("--fake-embeddings", action="store_true",
+                    help="usa embeddings falsos (sem API, sem cache) — para medir vazão")
+    ap.add_argument("--latencia-fake", type=float, default=0.2,
+                    help="latência simulada por lote dos embeddings falsos (s)")
+    ap.add_argument("--competencia", default=os.getenv("COMPETENCIA", ""),
+                    help="competência gravada no payload (ex.: 05/2025) quando a planilha não traz")
+    ap.add_argument("--quantizacao", choices=["nenhuma", "scalar", "binary"], default=None,
+                    help="quantização da collection no Qdrant (padrão: env VECTOR_QUANTIZACAO)")
+    ap.add_argument("--on-disk", action=argparse.BooleanOptionalAction, default=None,
+                    help="vetores originais e payload em disco no Qdrant (padrão: env VECTOR_ON_DISK)")
+    ap.add_argument("--hnsw-m", type=int, default=None)
+    ap.add_argument("--hnsw-ef-construct", type=int, default=None)
+    ap.add_argument("--embed-workers", type=int, default=EMBED_CONCORRENTES)
+    ap.add_argument("--upsert-workers", type=int, default=UPSERT_CONCORRENTES)
+    args = ap.parse_args()
+
     collection = os.getenv("QDRANT_COLLECTION", "desafio4_vr").strip()
 
     result_xlsx = os.getenv("RESULT_XLSX", "./data/ETL_OK/VR_MENSAL_RESULT.xlsx")
@@ -78,26 +266,42 @@ def main():
 
     embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 
-    if not url or not api_key:
-        die("Defina QDRANT_URL e QDRANT_API_KEY no .env")
-
-    df_res, df_lay = load_frames(result_xlsx, layout_xlsx)
-    docs = build_documents(df_res, "VR_MENSAL_RESULT") + build_documents(df_lay, "VR_MENSAL_LAYOUT")
-    print(f"[INFO] Total de documentos a inserir: {len(docs)}")
+    fontes = [("VR_MENSAL_RESULT", result_xlsx), ("VR_MENSAL_LAYOUT", layout_xlsx)]
+    for _, path in fontes:
+        if not os.path.exists(path):
+            die(f"Arquivo não encontrado: {path}")
 
-    client = QdrantClient(url=url, api_key=api_key, prefer_grpc=False, timeout=120.0)
+    try:
+        store = abrir_store(collection, quantizacao=args.quantizacao, on_disk=args.on_disk,
+                            hnsw_m=args.hnsw_m, hnsw_ef_construct=args.hnsw_ef_construct)
+    except ValueError as e:
+        die(str(e))
 
-    embeddings = OpenAIEmbeddings(model=embedding_model)
+    if args.fake_embeddings:
+        embeddings = FakeEmbeddings(latencia=args.latencia_fake)
+    else:
+        # Cache em disco: texto inalterado (e a sonda de dimensão) não volta à API.
+        embeddings = EmbeddingsEmCache(
+            criar_embeddings(embedding_model), modelo=identificador_modelo(embedding_model),
+            arquivo=os.getenv("EMBEDDINGS_CACHE", "./data/ETL_OK/_cache/embeddings.sqlite"),
+        )
 
     dim = len(embeddings.embed_query("dimensão de teste"))
-    ensure_collection(client, collection, dim)
+    store.garantir(dim)
+
+    delta = sync_documents(store, embeddings, iter_sources(fontes, competencia=args.competencia),
+                           [n for n, _ in fontes],
+                           embed_workers=args.embed_workers, upsert_workers=args.upsert_workers)
+    print(f"[OK] Delta em '{collection}': {delta['novos']} novos, {delta['alterados']} alterados, "
+          f"{delta['removidos']} removidos, {delta['inalterados']} inalterados.")
+    print(f"[INFO] {delta['gravados']} vetores em {delta['segundos']}s ({delta['vetores_por_s']} vetores/s)")
 
-    vs = Qdrant(client=client, collection_name=collection, embeddings=embeddings)
-    ids = vs.add_documents(docs, batch_size=128)
-    print(f"[OK] Inseridos/atualizados {len(ids)} vetores em '{collection}'.")
+    if isinstance(embeddings, EmbeddingsEmCache):
+        print(f"[INFO] Cache de embeddings: {embeddings.estatisticas()}")
+        if hasattr(embeddings.backend, "fechar"):
+            embeddings.backend.fechar()
 
-    count = client.count(collection, count_filter=None, exact=True).count
-    print(f"[OK] Total na collection '{collection}': {count}")
+    print(f"[OK] Total na collection '{collection}': {store.contar()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,145 @@
+# jobs.py
+# -------------------------------------------
+# Executor do pipeline mensal em segundo plano (fila de jobs).
+# Cada etapa roda num processo Python separado (subprocess); uma thread
+# trabalhadora consome a fila, registra progresso/tempos/log por etapa e
+# nunca bloqueia a thread da UI. Jobs rodam um por vez (fila FIFO).
+# -------------------------------------------
+
+import os
+import sys
+import time
+import queue
+import uuid
+import threading
+import subprocess
+from collections import deque
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent
+
+# (nome da etapa, script relativo à raiz) — mesma ordem do fechamento manual
+ETAPAS_PADRAO = [
+    ("Padronizar cabeçalhos (raw → clean)", "scripts/limpeza.py"),
+    ("ETL clean → FORM", "scripts/etl_clean_to_form.py"),
+    ("Limpeza FORM → FORM_OK", "scripts/limpar_form_ok.py"),
+    ("Cálculo do VR (RESULT/LAYOUT)", "scripts/VR.py"),
+    ("Validação dos dados (regras.yml)", "validacao.py"),
+    ("Export do layout", "gera_export.py"),
+]
+
+class ExecutorPipeline:
+    """Fila de jobs do pipeline com uma thread trabalhadora (criada sob demanda).
+
+    Estado de cada job (dict): id, status ('na_fila'|'rodando'|'ok'|'erro'), criado_em,
+    inicio, fim, etapas [{nome, script, status, inicio, duracao_s, codigo}], log (últimas linhas).
+    """
+
+    def __init__(self, etapas: list[tuple[str, str]] | None = None, max_log: int = 400):
+        self.etapas = etapas or ETAPAS_PADRAO
+        self.max_log = max_log
+        self._fila: queue.Queue = queue.Queue()
+        self._jobs: dict[str, dict] = {}
+        self._ordem: list[str] = []
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._ao_concluir: list = []
+
+    # --------- API ---------
+    def ao_concluir(self, callback) -> None:
+        """Registra callback(job) chamado quando um job termina com sucesso (ex.: limpar caches)."""
+        self._ao_concluir.append(callback)
+
+    def enfileirar(self) -> str:
+        """Coloca um job na fila e devolve seu id."""
+        job_id = uuid.uuid4().hex[:8]
+        job = {
+            "id": job_id,
+            "status": "na_fila",
+            "criado_em": time.time(),
+            "inicio": None,
+            "fim": None,
+            "etapas": [{"nome": n, "script": s, "status": "pendente", "inicio": None,
+                        "duracao_s": None, "codigo": None} for n, s in self.etapas],
+            "log": deque(maxlen=self.max_log),
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._ordem.append(job_id)
+        self._fila.put(job_id)
+        self._garantir_worker()
+        return job_id
+
+    def estado(self, job_id: str) -> dict | None:
+        """Cópia (segura para a UI) do estado de um job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {**job, "etapas": [dict(e) for e in job["etapas"]], "log": list(job["log"])}
+
+    def jobs(self, limite: int = 10) -> list[dict]:
+        """Jobs mais recentes primeiro."""
+        with self._lock:
+            ids = list(reversed(self._ordem[-limite:]))
+        return [self.estado(i) for i in ids]
+
+    def ocupado(self) -> bool:
+        with self._lock:
+            return any(j["status"] in ("na_fila", "rodando") for j in self._jobs.values())
+
+    # --------- Execução ---------
+    def _garantir_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._loop, name="pipeline-worker", daemon=True)
+                self._worker.start()
+
+    def _loop(self) -> None:
+        while True:
+            job_id = self._fila.get()
+            try:
+                self._executar(job_id)
+            finally:
+                self._fila.task_done()
+
+    def _atualizar(self, job: dict, **campos) -> None:
+        with self._lock:
+            job.update(campos)
+
+    def _executar(self, job_id: str) -> None:
+        job = self._jobs[job_id]
+        self._atualizar(job, status="rodando", inicio=time.time())
+        env = {**os.environ, "PYTHONIOENCODING": "utf-8", "PYTHONUNBUFFERED": "1"}
+        for etapa in job["etapas"]:
+            with self._lock:
+                etapa.update(status="rodando", inicio=time.time())
+                job["log"].append(f"▶ {etapa['nome']} ({etapa['script']})")
+            t0 = time.perf_counter()
+            try:
+                proc = subprocess.Popen(
+                    [sys.executable, etapa["script"]], cwd=RAIZ, env=env, stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                    text=True, encoding="utf-8", errors="replace",
+                )
+                for linha in proc.stdout:
+                    with self._lock:
+                        job["log"].append(linha.rstrip())
+                codigo = proc.wait()
+            except Exception as e:
+                codigo = -1
+                with self._lock:
+                    job["log"].append(f"❌ falha ao iniciar etapa: {e}")
+            with self._lock:
+                etapa.update(status="ok" if codigo == 0 else "erro", codigo=codigo,
+                             duracao_s=round(time.perf_counter() - t0, 2))
+            if codigo != 0:
+                self._atualizar(job, status="erro", fim=time.time())
+                return
+        self._atualizar(job, status="ok", fim=time.time())
+        for cb in self._ao_concluir:
+            try:
+                cb(self.estado(job_id))
+            except Exception as e:
+                with self._lock:
+                    job["log"].append(f"⚠️ callback pós-job falhou: {e}")
@@ -0,0 +1,101 @@
+# modelos_embedding.py
+# -------------------------------------------
+# Backends de embeddings escolhidos por EMBEDDING_MODEL
+# -------------------------------------------
+#   text-embedding-3-small (ou openai:<modelo>)  → OpenAI (rede + custo por token)
+#   local:<modelo ou caminho>                     → sentence-transformers em CPU (offline)
+#   fake[:dim]                                    → vetores determinísticos (testes/benchmark)
+#
+# Imports pesados (langchain_openai, sentence_transformers/torch) só acontecem
+# quando o backend é escolhido: o servidor sem internet não precisa do pacote da OpenAI.
+
+import os
+import time
+import hashlib
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_BATCH = int(os.getenv("EMBEDDING_BATCH", "64"))        # lote do encode em CPU
+EMBEDDING_PROCESSOS = int(os.getenv("EMBEDDING_PROCESSOS", "0"))  # >1 liga o pool multiprocesso
+
+class FakeEmbeddings(Embeddings):
+    """Embeddings determinísticos (hash do texto) com latência simulada — para medir vazão sem API."""
+
+    def __init__(self, dim: int = 256, latencia: float = 0.0):
+        self.dim = dim
+        self.latencia = latencia
+
+    def _vetor(self, text: str) -> list[float]:
+        semente = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        v = np.random.default_rng(semente).standard_normal(self.dim, dtype=np.float32)
+        return (v / np.linalg.norm(v)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latencia:
+            time.sleep(self.latencia)
+        return [self._vetor(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vetor(text)
+
+class EmbeddingsLocais(Embeddings):
+    """sentence-transformers em CPU: lotes ajustáveis e pool multiprocesso opcional
+    (vetores float32 normalizados, prontos para COSINE). Cache e stores guardam float32:
+    para economizar memória, use a quantização do store (VECTOR_QUANTIZACAO=scalar)."""
+
+    def __init__(self, modelo: str, batch_size: int = EMBEDDING_BATCH, processos: int = EMBEDDING_PROCESSOS,
+                 device: str = "cpu"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError("Backend local requer 'sentence-transformers' (pip install sentence-transformers).") from e
+        self.modelo = modelo
+        self.batch_size = batch_size
+        self.processos = processos
+        self._st = SentenceTransformer(modelo, device=device)
+        self._pool = None
+        self._pool_lock = threading.Lock()  # a ingestão chama embed_documents de várias threads
+
+    def _codificar(self, textos: list[str]) -> np.ndarray:
+        kwargs = {"batch_size": self.batch_size, "normalize_embeddings": True}
+        # o pool multiprocesso só compensa em volumes grandes (ingestão), não em consultas
+        if self.processos > 1 and len(textos) >= self.batch_size * self.processos:
+            # um pool só (criado uma vez) e um lote por vez nele: as filas de entrada/saída do pool
+            # são compartilhadas, lotes de threads diferentes trocariam resultados entre si
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = self._st.start_multi_process_pool(target_devices=["cpu"] * self.processos)
+                vetores = self._st.encode_multi_process(textos, self._pool, **kwargs)
+        else:
+            vetores = self._st.encode(textos, convert_to_numpy=True, show_progress_bar=False, **kwargs)
+        return vetores.astype(np.float32, copy=False)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._codificar(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._codificar([text])[0].tolist()
+
+    def fechar(self) -> None:
+        """Encerra o pool multiprocesso (se foi criado)."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._st.stop_multi_process_pool(self._pool)
+                self._pool = None
+
+def identificador_modelo(modelo: str | None = None) -> str:
+    """Nome estável do backend+modelo (chave do cache de embeddings)."""
+    return (modelo or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")).strip()
+
+def criar_embeddings(modelo: str | None = None) -> Embeddings:
+    """Instancia o backend indicado por `modelo` (padrão: env EMBEDDING_MODEL)."""
+    modelo = (modelo or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")).strip()
+    if modelo.startswith("local:"):
+        return EmbeddingsLocais(modelo.split(":", 1)[1])
+    if modelo == "fake" or modelo.startswith("fake:"):
+        dim = int(modelo.split(":", 1)[1]) if ":" in modelo else 256
+        return FakeEmbeddings(dim=dim)
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(model=modelo.split(":", 1)[1] if modelo.startswith("openai:") else modelo)
@@ -0,0 +1,145 @@
+# painel.py
+# -------------------------------------------
+# Dashboard gerencial: agregados pré-calculados + grade paginada do RESULT.
+# Pandas/numpy puro (sem Streamlit) — o app.py guarda um PainelResult por
+# versão do dataset em cache e só desenha o que a interação pediu.
+# -------------------------------------------
+
+import json
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES = ["EMPRESA", "SINDICATO", "UF_BASE"]
+METRICAS = ["VR_COLAB", "VR_EMPRESA", "VR_PROFISSIONAL"]
+
+def calcular_kpis(df: pd.DataFrame) -> dict:
+    """Indicadores de topo (uma passada por coluna)."""
+    vr = pd.to_numeric(df.get("VR_COLAB", pd.Series(dtype=float)), errors="coerce").fillna(0.0)
+    pos = vr[vr > 0]
+    return {
+        "linhas": int(len(df)),
+        "colaboradores": int(df["MATRICULA"].nunique()) if "MATRICULA" in df.columns else int(len(df)),
+        "vr_total": float(vr.sum()),
+        "custo_empresa": float(pd.to_numeric(df.get("VR_EMPRESA", 0), errors="coerce").sum()),
+        "desconto_profissional": float(pd.to_numeric(df.get("VR_PROFISSIONAL", 0), errors="coerce").sum()),
+        "vr_medio": float(pos.mean()) if len(pos) else 0.0,
+        "zerados": int((vr == 0).sum()),
+    }
+
+def calcular_quebras(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Totais por EMPRESA/SINDICATO/UF_BASE: colaboradores, soma das métricas e VR médio."""
+    metricas = [m for m in METRICAS if m in df.columns]
+    out = {}
+    for dim in DIMENSOES:
+        if dim not in df.columns or not metricas:
+            continue
+        g = df.groupby(df[dim].fillna("—").astype(str), sort=False)
+        agg = g[metricas].sum()
+        agg.insert(0, "COLABORADORES", g.size())
+        agg["VR_MEDIO"] = (agg["VR_COLAB"] / agg["COLABORADORES"]).round(2) if "VR_COLAB" in agg else 0.0
+        out[dim] = agg.sort_values(metricas[0], ascending=False)
+    return out
+
+def distribuicao_dias(df: pd.DataFrame) -> pd.Series:
+    """Quantidade de colaboradores por DIAS_ELEGIVEIS (histograma discreto)."""
+    if "DIAS_ELEGIVEIS" not in df.columns:
+        return pd.Series(dtype="int64")
+    dias = pd.to_numeric(df["DIAS_ELEGIVEIS"], errors="coerce").fillna(0).astype("int64")
+    return dias.value_counts().sort_index().rename("COLABORADORES")
+
+class PainelResult:
+    """Agregados + índices auxiliares da grade, calculados uma vez por versão do RESULT.
+
+    A grade nunca devolve o frame inteiro: `pagina()` aplica filtros com máscaras numpy,
+    reaproveita a ordenação pré-calculada (argsort por coluna, sob demanda) e recorta
+    só a janela pedida.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self.kpis = calcular_kpis(self.df)
+        self.quebras = calcular_quebras(self.df)
+        self.dist_dias = distribuicao_dias(self.df)
+        # códigos categóricos das dimensões: filtro por igualdade vira comparação de inteiros
+        self._codigos: dict[str, tuple[np.ndarray, pd.Index]] = {}
+        for dim in DIMENSOES:
+            if dim in self.df.columns:
+                codes, uniques = pd.factorize(self.df[dim].fillna("—").astype(str), sort=True)
+                self._codigos[dim] = (codes, uniques)
+        self._matriculas = (self.df["MATRICULA"].astype(str).to_numpy().astype(str)
+                            if "MATRICULA" in self.df.columns else None)
+        self._vr = (pd.to_numeric(self.df["VR_COLAB"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+                    if "VR_COLAB" in self.df.columns else None)
+        self._ordens: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._ultima_mascara: tuple[str, np.ndarray] | None = None  # contar() e pagina() do mesmo rerun
+
+    def opcoes(self, dim: str) -> list[str]:
+        """Valores distintos de uma dimensão (para os filtros da UI)."""
+        return list(self._codigos[dim][1]) if dim in self._codigos else []
+
+    def _ordem(self, coluna: str, asc: bool = True) -> np.ndarray:
+        """Permutação estável que ordena a coluna, vazios (NaN/NaT/None) sempre no fim; memoizada."""
+        if coluna not in self._ordens:
+            s = self.df[coluna]
+            if coluna in self._codigos:
+                chave = self._codigos[coluna][0]          # uniques já vêm ordenados
+            elif pd.api.types.is_numeric_dtype(s) or pd.api.types.is_datetime64_any_dtype(s):
+                chave = s.to_numpy()
+            else:
+                chave = s.astype(str).to_numpy()
+            nulos = s.isna().to_numpy()
+            validos = np.flatnonzero(~nulos)
+            # só o bloco preenchido é invertido no desc (na_position="last" nos dois sentidos)
+            self._ordens[coluna] = (validos[np.argsort(chave[validos], kind="stable")], np.flatnonzero(nulos))
+        validos, nulos = self._ordens[coluna]
+        return np.concatenate([validos if asc else validos[::-1], nulos])
+
+    def mascara(self, filtros: dict | None) -> np.ndarray | None:
+        """filtros: {"EMPRESA":[...], "SINDICATO":[...], "UF_BASE":[...],
+                     "MATRICULA_PREFIXO":"12", "VR_MIN":0.0, "VR_MAX":None}
+        A última máscara fica memoizada (somente leitura): os mesmos filtros não a recalculam."""
+        if not filtros:
+            return None
+        chave = json.dumps(filtros, sort_keys=True, default=str)
+        memo = self._ultima_mascara
+        if memo is not None and memo[0] == chave:
+            return memo[1]
+        m = np.ones(len(self.df), dtype=bool)
+        for dim, (codes, uniques) in self._codigos.items():
+            vals = filtros.get(dim)
+            if vals:
+                alvo = uniques.get_indexer(pd.Index([str(v) for v in vals]))
+                m &= np.isin(codes, alvo[alvo >= 0])
+        pref = (filtros.get("MATRICULA_PREFIXO") or "").strip()
+        if pref and self._matriculas is not None:
+            m &= np.char.startswith(self._matriculas, pref)
+        if self._vr is not None:
+            if filtros.get("VR_MIN") is not None:
+                m &= self._vr >= float(filtros["VR_MIN"])
+            if filtros.get("VR_MAX") is not None:
+                m &= self._vr <= float(filtros["VR_MAX"])
+        self._ultima_mascara = (chave, m)
+        return m
+
+    def contar(self, filtros: dict | None = None) -> int:
+        """Total de linhas após os filtros (para o controle de paginação)."""
+        m = self.mascara(filtros)
+        return len(self.df) if m is None else int(m.sum())
+
+    def pagina(self, filtros: dict | None = None, ordenar_por: str | None = None, asc: bool = True,
+               pagina: int = 1, tamanho: int = 50) -> tuple[pd.DataFrame, int]:
+        """Janela [pagina] da grade filtrada/ordenada. Retorna (linhas da página, total filtrado)."""
+        m = self.mascara(filtros)
+        if ordenar_por and ordenar_por in self.df.columns:
+            idx = self._ordem(ordenar_por, asc)
+            if m is not None:
+                idx = idx[m[idx]]
+        else:
+            idx = np.flatnonzero(m) if m is not None else None
+        total = len(self.df) if idx is None else len(idx)
+        tamanho = max(1, int(tamanho))
+        ini = (max(1, int(pagina)) - 1) * tamanho
+        if idx is None:
+            return self.df.iloc[ini:ini + tamanho], total
+        return self.df.iloc[idx[ini:ini + tamanho]], total
@@ -0,0 +1,140 @@
+# recuperacao.py
+# -------------------------------------------
+# Busca semântica (top-k) na collection VR, exposta ao agente como tool
+# -------------------------------------------
+# - Store/embeddings criados no primeiro uso (Qdrant ou índice local — store_vetorial.py).
+# - Embedding da consulta: LRU em memória + cache SQLite (cache_embeddings.py).
+# - Resultado: cache LRU/TTL por consulta normalizada + versão do dataset
+#   (o mesmo esquema do cache de respostas do agente) + versão da collection
+#   (pontos + marca da última ingestão), para reingestões (CCTs, Excel) invalidarem.
+# - Saída compacta e limitada (k, tamanho do trecho e do JSON) para gastar poucos tokens.
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from cache_respostas import CacheRespostas, versao_dataset
+from ferramentas import REGRAS_YAML_PATH, result_path, _fmt, _normalizar_pergunta
+
+# --------- Config ---------
+RETRIEVAL_K_MAX = int(os.getenv("RETRIEVAL_K_MAX", "10"))
+RETRIEVAL_TRECHO_MAX = int(os.getenv("RETRIEVAL_TRECHO_MAX", "240"))   # caracteres por trecho
+RETRIEVAL_MAX_CHARS = int(os.getenv("RETRIEVAL_MAX_CHARS", "2500"))    # teto do JSON devolvido ao LLM
+RETRIEVAL_CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", str(6 * 3600)))
+RETRIEVAL_VERSAO_TTL = float(os.getenv("RETRIEVAL_VERSAO_TTL", "30"))  # segundos entre consultas da versão da collection
+FONTES = {"RESULT": "VR_MENSAL_RESULT", "LAYOUT": "VR_MENSAL_LAYOUT", "CCT": "CCT"}
+
+_INIT_LOCK = threading.Lock()
+cache_buscas = CacheRespostas(max_itens=512, ttl=RETRIEVAL_CACHE_TTL)
+
+# --------- Construção preguiçosa ---------
+@lru_cache(maxsize=1)
+def _store():
+    from store_vetorial import abrir_store
+    return abrir_store()
+
+@lru_cache(maxsize=1)
+def _embeddings():
+    from cache_embeddings import EmbeddingsEmCache
+    from modelos_embedding import criar_embeddings, identificador_modelo
+    return EmbeddingsEmCache(
+        criar_embeddings(), modelo=identificador_modelo(),
+        arquivo=os.getenv("EMBEDDINGS_CACHE", "./data/ETL_OK/_cache/embeddings.sqlite"),
+    )
+
+_VETORES: OrderedDict[str, list[float]] = OrderedDict()
+_VETORES_MAX = 1024
+
+def vetor_consulta(texto: str) -> list[float]:
+    """Embedding da consulta: memória → SQLite → backend."""
+    with _INIT_LOCK:
+        v = _VETORES.get(texto)
+        if v is not None:
+            _VETORES.move_to_end(texto)
+            return v
+        emb = _embeddings()
+    v = emb.embed_query(texto)
+    with _INIT_LOCK:
+        _VETORES[texto] = v
+        while len(_VETORES) > _VETORES_MAX:
+            _VETORES.popitem(last=False)
+    return v
+
+_VERSAO_STORE: dict = {"em": 0.0, "valor": "?"}
+
+def versao_store() -> str:
+    """Versão da collection (store.versao()), consultada no máximo a cada RETRIEVAL_VERSAO_TTL s."""
+    agora = time.monotonic()
+    with _INIT_LOCK:
+        if agora - _VERSAO_STORE["em"] < RETRIEVAL_VERSAO_TTL:
+            return _VERSAO_STORE["valor"]
+    try:
+        valor = _store().versao()
+    except Exception:
+        valor = "?"
+    with _INIT_LOCK:
+        _VERSAO_STORE.update(em=agora, valor=valor)
+    return valor
+
+# --------- Tool ---------
+def _compactar(hit: dict) -> dict:
+    meta = hit.get("metadata") or {}
+    item = {"score": round(hit["score"], 3), "fonte": str(meta.get("source", "")).replace("VR_MENSAL_", "")}
+    for chave, campo in [("matricula", "MATRICULA"), ("sindicato", "SINDICATO"), ("uf", "UF_BASE"),
+                         ("empresa", "EMPRESA"), ("competencia", "COMPETENCIA"),
+                         ("arquivo", "arquivo"), ("pagina", "pagina")]:
+        if meta.get(campo) is not None:
+            item[chave] = meta[campo]
+    if meta.get("VR_COLAB") is not None:
+        item["vr_colab"] = float(meta["VR_COLAB"])
+        item["fmt_vr_colab"] = _fmt(float(meta["VR_COLAB"]))
+    trecho = " | ".join((hit.get("page_content") or "").splitlines())
+    item["trecho"] = trecho if len(trecho) <= RETRIEVAL_TRECHO_MAX else trecho[:RETRIEVAL_TRECHO_MAX - 1] + "…"
+    return item
+
+def busca_semantica(consulta: str, k: int = 5, filters_json: str = "", fonte: str = "") -> str:
+    """Busca semântica (top-k) nos registros vetorizados do RESULT/LAYOUT e nas CCTs (PDF).
+    Use para perguntas abertas/descritivas (ex.: "colaboradores do sindicato de Curitiba com
+    poucos dias") ou sobre cláusulas das convenções (fonte='CCT'); para números exatos
+    prefira aggregate/group_aggregate.
+    Args:
+      consulta: texto livre
+      k: quantidade de registros (máx. 10)
+      filters_json: filtros opcionais aplicados dentro da busca, campos MATRICULA, SINDICATO,
+        UF_BASE, EMPRESA, VR_COLAB, COMPETENCIA (ex.: [{"col":"UF_BASE","op":"==","value":"RS"}])
+      fonte: 'RESULT', 'LAYOUT' ou 'CCT' (vazio = todas)
+    Retorna JSON: {"ok":true,"hits":[{"score":0.83,"fonte":"RESULT","matricula":"...","sindicato":"...",
+      "uf":"..","vr_colab":<float>,"fmt_vr_colab":"R$ ...","trecho":"COL: valor | ..."}]}
+      (hits de CCT trazem "arquivo" e "pagina" no lugar dos campos do colaborador)
+    """
+    consulta = (consulta or "").strip()
+    if not consulta:
+        return json.dumps({"ok": False, "erro": "Consulta vazia."}, ensure_ascii=False)
+    k = max(1, min(int(k or 5), RETRIEVAL_K_MAX))
+    source = FONTES.get((fonte or "").strip().upper()) or ((fonte or "").strip() or None)
+
+    try:
+        versao = versao_dataset(result_path(), REGRAS_YAML_PATH)
+    except Exception:
+        versao = "?"
+    versao = f"{versao}|{versao_store()}"
+    chave = f"{_normalizar_pergunta(consulta)}|{k}|{(filters_json or '').strip()}|{source or ''}"
+    em_cache = cache_buscas.obter(chave, versao)
+    if em_cache is not None:
+        return em_cache
+
+    try:
+        hits = _store().buscar(vetor_consulta(consulta), k=k, filtros=filters_json or None, source=source)
+    except Exception as e:
+        return json.dumps({"ok": False, "erro": f"Busca semântica indisponível: {e}"}, ensure_ascii=False)
+
+    itens = [_compactar(h) for h in hits]
+    saida = json.dumps({"ok": True, "hits": itens}, ensure_ascii=False)
+    while len(saida) > RETRIEVAL_MAX_CHARS and len(itens) > 1:  # corta os menos relevantes
+        itens.pop()
+        saida = json.dumps({"ok": True, "hits": itens, "truncado": True}, ensure_ascii=False)
+    cache_buscas.guardar(chave, versao, saida)
+    return saida
@@ -14,9 +14,14 @@ Incrementos:
 
 from pathlib import Path
 import pandas as pd
-import unicodedata, re
+import re
 from datetime import date
 
+from datas import parse_datas  # formato inferido/cacheado; coluna já datetime não é reconvertida
+from normalizacao import normalizar_texto  # espaços/caixa/acentos numa passada por coluna
+from esquemas import ler_planilha  # tipos/renomes do esquemas.yml aplicados na leitura
+from ufs import UF_SET, NOME2UF, strip_accents, nome_estado_para_uf  # tabela de UFs compartilhada com validacao.py
+
 # ===========================
 #   CONFIGURAÇÕES DA REGRA
 # ===========================
@@ -35,7 +40,7 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 # ------------------------------------------------
 def read_xlsx(p: Path, tag: str) -> pd.DataFrame:
     print(f"📥 Lendo: {tag} -> {p}")
-    df = pd.read_excel(p, engine="openpyxl")
+    df = ler_planilha(p)  # MATRICULA texto, VALOR/DIAS numéricos, datas convertidas
     print(f"   linhas={len(df)}, colunas={len(df.columns)}")
     return df
 
@@ -51,21 +56,6 @@ def safe_to_excel(df: pd.DataFrame, path: Path, *, label: str) -> None:
 def to_num(s):
     return pd.to_numeric(s, errors="coerce")
 
-def strip_accents(s: str) -> str:
-    return "".join(ch for ch in unicodedata.normalize("NFD", s) if unicodedata.category(ch) != "Mn")
-
-UF_SET = {
-    "AC","AL","AM","AP","BA","CE","DF","ES","GO","MA","MG","MS","MT",
-    "PA","PB","PE","PI","PR","RJ","RN","RO","RR","RS","SC","SE","SP","TO"
-}
-NOME2UF = {
-    "ACRE":"AC","ALAGOAS":"AL","AMAPA":"AP","AMAZONAS":"AM","BAHIA":"BA","CEARA":"CE",
-    "DISTRITOFEDERAL":"DF","ESPIRITOSANTO":"ES","GOIAS":"GO","MARANHAO":"MA","MINASGERAIS":"MG",
-    "MATOGROSSO":"MT","MATOGROSSODOSUL":"MS","PARA":"PA","PARAIBA":"PB","PERNAMBUCO":"PE","PIAUI":"PI",
-    "PARANA":"PR","RIODEJANEIRO":"RJ","RIOGRANDEDONORTE":"RN","RONDONIA":"RO","RORAIMA":"RR",
-    "RIOGRANDEDOSUL":"RS","SANTACATARINA":"SC","SERGIPE":"SE","SAOPAULO":"SP","TOCANTINS":"TO"
-}
-
 def uf_from_sindicato(txt: str) -> str | None:
     """Extrai a UF do texto do sindicato (sigla, sufixo ou nome por extenso)."""
     if not isinstance(txt, str):
@@ -88,12 +78,6 @@ def uf_from_sindicato(txt: str) -> str | None:
             return uf
     return None
 
-def nome_estado_para_uf(nome: str) -> str | None:
-    if not isinstance(nome, str):
-        return None
-    t = strip_accents(nome.strip().upper()).replace(" ", "")
-    return NOME2UF.get(t)
-
 def last_day_of_month(ano: int, mes: int) -> date:
     import calendar as _cal
     return date(ano, mes, _cal.monthrange(ano, mes)[1])
@@ -177,8 +161,7 @@ for patt in padroes:
             print(f"   (ADMISS) Não encontrei coluna de admissão em {fp}.")
             continue
         adm = adm.rename(columns={col_adm: "ADMISSAO"})
-        adm["MATRICULA"] = adm["MATRICULA"].astype("string")
-        adm["ADMISSAO"]  = pd.to_datetime(adm["ADMISSAO"], errors="coerce")
+        adm["ADMISSAO"]  = parse_datas(adm["ADMISSAO"], _Path(fp).name, "ADMISSAO")
         adm = adm.dropna(subset=["MATRICULA"])
         admiss_list.append(adm[["MATRICULA","ADMISSAO"]])
 
@@ -193,17 +176,10 @@ else:
 # =======================
 # 2) Normalizações básicas
 # =======================
-for df in (ativos, aprendiz, estagio, exterior, afast, ferias, deslig, admissao):
-    if not df.empty and "MATRICULA" in df.columns:
-        df["MATRICULA"] = df["MATRICULA"].astype("string")
-
 for col in ("SINDICATO", "ESTADO"):
-    if col in ativos.columns:    ativos[col]    = ativos[col].astype(str).str.upper().str.strip()
-    if col in sindvalor.columns: sindvalor[col] = sindvalor[col].astype(str).str.upper().str.strip()
-    if col in diasuteis.columns: diasuteis[col] = diasuteis[col].astype(str).str.upper().str.strip()
-
-if "VALOR" in sindvalor.columns:
-    sindvalor["VALOR"] = to_num(sindvalor["VALOR"])
+    if col in ativos.columns:    ativos[col]    = normalizar_texto(ativos[col].astype(str), maiusculas=True, vazio_na=False)
+    if col in sindvalor.columns: sindvalor[col] = normalizar_texto(sindvalor[col].astype(str), maiusculas=True, vazio_na=False)
+    if col in diasuteis.columns: diasuteis[col] = normalizar_texto(diasuteis[col].astype(str), maiusculas=True, vazio_na=False)
 
 # Mapeia ESTADO (por extenso) -> UF_REF para casar com UF_BASE
 if "ESTADO" in sindvalor.columns:
@@ -234,7 +210,7 @@ base = exclui(base, exterior, "EXTERIOR")
 
 if not afast.empty and "NA_COMPRA" in afast.columns:
     af2 = afast.copy()
-    af2["NA_COMPRA"] = af2["NA_COMPRA"].astype(str).str.upper().str.strip()
+    af2["NA_COMPRA"] = normalizar_texto(af2["NA_COMPRA"].astype(str), maiusculas=True, vazio_na=False)
     lista_nao = af2.loc[af2["NA_COMPRA"].isin(["NAO","NÃO","FALSE","0"]), "MATRICULA"]
     antes = len(base)
     base = base[~base["MATRICULA"].isin(lista_nao)]
@@ -318,16 +294,15 @@ if not deslig.empty and "MATRICULA" in deslig.columns:
     # Normalização tolerante do comunicado (OK/SIM/TRUE/1)
     if "COMUNICADO_DE_DESLIGAMENTO" in D.columns:
         D["COMUNICADO_DE_DESLIGAMENTO"] = (
-            D["COMUNICADO_DE_DESLIGAMENTO"]
-              .astype(str).str.upper().str.strip()
-              .str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('ascii')
+            normalizar_texto(D["COMUNICADO_DE_DESLIGAMENTO"].astype(str), maiusculas=True,
+                             sem_acentos=True, vazio_na=False)
         )
     else:
         D["COMUNICADO_DE_DESLIGAMENTO"] = ""
 
     # Data de desligamento (DATA_DEMISSAO -> DATA_DESLIGAMENTO)
     if "DATA_DEMISSAO" in D.columns:
-        D["DATA_DESLIGAMENTO"] = pd.to_datetime(D["DATA_DEMISSAO"], errors="coerce")
+        D["DATA_DESLIGAMENTO"] = parse_datas(D["DATA_DEMISSAO"], "DESLIGADOS_FORM_OK.xlsx")
     else:
         D["DATA_DESLIGAMENTO"] = pd.to_datetime(D.get("DATA_DESLIGAMENTO"), errors="coerce")
 
@@ -401,7 +376,7 @@ if not admissao.empty:
 if base["ADMISSAO"].isna().all():
     for cand in ["ADMISSAO","ADMISSÃO","DATA_ADMISSAO","DATA ADMISSAO","DT_ADMISSAO"]:
         if cand in ativos.columns:
-            base["ADMISSAO"] = pd.to_datetime(ativos[cand], errors="coerce")
+            base["ADMISSAO"] = parse_datas(ativos[cand], "ATIVOS_FORM_OK.xlsx")
             print(f"ℹ️ ADMISSAO fallback a partir de ATIVOS: coluna '{cand}'")
             break
 
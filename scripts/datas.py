@@ -0,0 +1,157 @@
+# scripts/datas.py
+# -*- coding: utf-8 -*-
+"""
+Conversão rápida de colunas de data (usada pelas etapas de limpeza/cálculo).
+
+• Infere o formato por uma amostra da coluna: serial do Excel, dd/mm/aaaa,
+  dd/mm/aa, ISO (aaaa-mm-dd, com ou sem hora) e variações com '-' ou '.'.
+• Converte a coluna inteira pelo caminho vetorizado de formato fixo do pandas
+  (sem o parse elemento a elemento de pd.to_datetime sem format).
+• Guarda o formato inferido por fonte/coluna (memória + JSON em data/ETL_OK/_cache).
+  Na próxima execução o formato guardado só é usado se ainda converter a amostra;
+  senão (mesmo nome de arquivo, conteúdo novo) é inferido de novo.
+• Coluna que já é datetime volta como está: a mesma coluna não é convertida
+  duas vezes (heurística + schema na ETL, de novo no VR.py).
+"""
+
+import os
+import json
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+CACHE_FORMATOS = Path(os.getenv("DATAS_CACHE", RAIZ / "data" / "ETL_OK" / "_cache" / "formatos_datas.json"))
+AMOSTRA = 200
+
+EXCEL = "excel"  # serial do Excel (dias desde 1899-12-30)
+FORMATOS = [     # ordem importa: padrão brasileiro (dia primeiro) antes do ISO
+    "%d/%m/%Y", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%y",
+    "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y/%m/%d",
+    "%d-%m-%Y", "%d.%m.%Y",
+]
+SERIAL_MIN, SERIAL_MAX = 1, 2958465  # 1900-01-01 .. 9999-12-31
+_RE_ISO = r"\d{4}[-/]"  # começa pelo ano: nunca é lido com o dia primeiro
+
+_formatos: dict[str, str] = {}
+_carregado = False
+
+# --------- Cache de formatos ---------
+def _chave(fonte: str, coluna: str) -> str:
+    return f"{fonte}|{coluna}"
+
+def _carregar_cache() -> None:
+    global _carregado
+    if _carregado:
+        return
+    _carregado = True
+    try:
+        _formatos.update(json.loads(CACHE_FORMATOS.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        pass
+
+def salvar_cache_formatos() -> None:
+    """Persiste os formatos inferidos (chamado no fim da etapa)."""
+    if not _formatos:
+        return
+    CACHE_FORMATOS.parent.mkdir(parents=True, exist_ok=True)
+    CACHE_FORMATOS.write_text(json.dumps(_formatos, ensure_ascii=False, indent=1, sort_keys=True),
+                              encoding="utf-8")
+
+# --------- Inferência ---------
+def inferir_formato(amostra: pd.Series) -> str | None:
+    """Formato que converte TODOS os valores não nulos da amostra (None se nenhum serve)."""
+    valores = amostra.dropna()
+    if valores.empty:
+        return None
+    if pd.api.types.is_numeric_dtype(valores):
+        ok = valores.between(SERIAL_MIN, SERIAL_MAX).all()
+        return EXCEL if ok else None
+    textos = valores.astype(str).str.strip()
+    textos = textos[textos != ""]
+    if textos.empty:
+        return None
+    if textos.str.fullmatch(r"\d+(\.0+)?").all():  # serial salvo como texto
+        return EXCEL if pd.to_numeric(textos).between(SERIAL_MIN, SERIAL_MAX).all() else None
+    for fmt in FORMATOS:
+        if pd.to_datetime(textos, format=fmt, errors="coerce").notna().all():
+            return fmt
+    return None
+
+def _converter(s: pd.Series, fmt: str) -> pd.Series:
+    if fmt == EXCEL:
+        num = pd.to_numeric(s, errors="coerce")
+        num = num.where(num.between(SERIAL_MIN, SERIAL_MAX))
+        return pd.to_datetime(num, unit="D", origin="1899-12-30")
+    return pd.to_datetime(s, format=fmt, errors="coerce")  # fora do formato (ex.: espaços) → fallback
+
+def _por_valor(s: pd.Series) -> pd.Series:
+    """Conversão valor a valor das sobras (ou de colunas sem formato único): serial do Excel,
+    depois FORMATOS — os que começam pelo ano só para valores com cara de ISO, os demais
+    para o resto — e, por último, o parse tolerante (dayfirst só fora do ISO)."""
+    valores = s.reset_index(drop=True)
+    out = pd.Series(pd.NaT, index=valores.index, dtype="datetime64[ns]")
+    num = pd.to_numeric(valores, errors="coerce")
+    serial = num.between(SERIAL_MIN, SERIAL_MAX)
+    if serial.any():
+        out[serial] = _converter(num[serial], EXCEL)
+    textos = valores[~serial & valores.notna()].astype(str).str.strip()
+    iso = textos.str.match(_RE_ISO)
+    for e_iso in (True, False):
+        pendentes = textos[iso == e_iso]
+        for fmt in (f for f in FORMATOS if f.startswith("%Y") == e_iso):
+            if pendentes.empty:
+                break
+            conv = pd.to_datetime(pendentes, format=fmt, errors="coerce")
+            out[conv.index[conv.notna()]] = conv.dropna()
+            pendentes = pendentes[conv.isna()]
+        if not pendentes.empty:
+            conv = pd.to_datetime(pendentes, errors="coerce", dayfirst=not e_iso, format="mixed")
+            out[conv.index] = conv
+    out.index = s.index
+    return out
+
+def _cobre(amostra: pd.Series, fmt: str) -> bool:
+    """O formato (ex.: o do cache) ainda converte todos os valores não vazios da amostra?"""
+    valores = amostra.dropna()
+    if not pd.api.types.is_numeric_dtype(valores):
+        valores = valores.astype(str).str.strip()
+        valores = valores[valores != ""]
+    return valores.empty or bool(_converter(valores, fmt).notna().all())
+
+# --------- API ---------
+def parse_datas(s: pd.Series, fonte: str = "", coluna: str | None = None,
+                somente_se_data: bool = False) -> pd.Series:
+    """Converte a série para datetime com o formato inferido (ou o já conhecido para fonte/coluna,
+    conferido contra a amostra).
+
+    - Já datetime: devolve sem mexer.
+    - Valores que o formato não cobre são convertidos um a um (_por_valor), sem trocar
+      dia e mês de datas ISO; o que continuar inválido vira NaT (como errors="coerce").
+    - somente_se_data=True: se a amostra não tem cara de data, devolve a série intacta
+      (uso na heurística por nome de coluna, para não apagar colunas de texto).
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    coluna = str(coluna if coluna is not None else s.name)
+    _carregar_cache()
+    chave = _chave(fonte, coluna)
+    amostra = s.dropna().head(AMOSTRA)
+    fmt = _formatos.get(chave)
+    if fmt is not None and not _cobre(amostra, fmt):
+        fmt = None  # arquivo do mês seguinte com o mesmo nome e outro formato: infere de novo
+    if fmt is None:
+        if not amostra.empty and amostra.map(lambda v: isinstance(v, date)).all():
+            return pd.to_datetime(s, errors="coerce")  # objetos datetime vindos do Excel
+        fmt = inferir_formato(amostra)
+        if fmt is None:
+            if somente_se_data:
+                return s
+            return _por_valor(s)
+        _formatos[chave] = fmt
+    out = _converter(s, fmt)
+    resto = out.isna() & s.notna()
+    if resto.any():  # fora do formato (ex.: linhas digitadas à mão)
+        out[resto] = _por_valor(s[resto])
+    return out
@@ -0,0 +1,124 @@
+# scripts/esquemas.py
+# -*- coding: utf-8 -*-
+"""
+Leitura tipada das planilhas a partir do registro esquemas.yml (raiz do projeto).
+
+• esquema_para(nome)  -> esquema do dataset cujo trecho "arquivo" aparece no nome.
+• ler_planilha(path)  -> read_excel já com dtype de texto e usecols (sem UNNAMED),
+  seguido de renomes, reformatação por posição e conversões numéricas/de data.
+
+Todas as etapas (etl_clean_to_form, limpar_form_ok, VR.py) leem por aqui, então
+cada planilha sai da leitura no formato final e nenhuma etapa repete conversões.
+Números e datas são convertidos por coluna depois do read_excel (vetorizado), e
+não por `converters=` (uma chamada Python por célula).
+"""
+
+import os
+import unicodedata
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import yaml
+
+from datas import parse_datas
+
+RAIZ = Path(__file__).resolve().parents[1]
+ESQUEMAS_YAML = Path(os.getenv("ESQUEMAS_YAML", RAIZ / "esquemas.yml"))
+TIPOS = ("texto", "numero", "data")
+
+_memo: dict = {"mtime": None, "dados": None}
+
+# --------- Registro ---------
+def _sem_acentos(texto: str) -> str:
+    nfkd = unicodedata.normalize("NFD", texto)
+    return "".join(ch for ch in nfkd if unicodedata.category(ch) != "Mn")
+
+def carregar_esquemas() -> dict:
+    """esquemas.yml em memória (relido só se o arquivo mudar); valida os tipos."""
+    mtime = ESQUEMAS_YAML.stat().st_mtime_ns
+    if _memo["mtime"] != mtime:
+        dados = yaml.safe_load(ESQUEMAS_YAML.read_text(encoding="utf-8")) or {}
+        for nome, esq in (dados.get("datasets") or {}).items():
+            for col, tipo in (esq.get("tipos") or {}).items():
+                if tipo not in TIPOS:
+                    raise ValueError(f"esquemas.yml: tipo inválido '{tipo}' em {nome}.{col} (use {', '.join(TIPOS)})")
+        _memo.update(mtime=mtime, dados=dados)
+    return _memo["dados"]
+
+def esquema_para(nome_arquivo: str) -> dict:
+    """Esquema (com os padrões aplicados) do 1º dataset que casar com o nome; {} se nenhum."""
+    dados = carregar_esquemas()
+    up = _sem_acentos(nome_arquivo).upper()
+    for nome, esq in (dados.get("datasets") or {}).items():
+        if _sem_acentos(str(esq.get("arquivo", nome))).upper() in up:
+            return {**(dados.get("padrao") or {}), **esq, "nome": nome}
+    return {}
+
+# --------- Aplicação ---------
+def _unnamed(nome) -> bool:
+    return str(nome).upper().startswith("UNNAMED")
+
+def aplicar_esquema(df: pd.DataFrame, esquema: dict, fonte: str = "") -> pd.DataFrame:
+    """Renomes, reformatação por posição, tipos e obrigatórias (idempotente: reaplicar não muda nada)."""
+    if not esquema:
+        return df
+    posicoes = esquema.get("posicoes") or []
+    if posicoes and list(df.columns[:len(posicoes)]) != posicoes:
+        if df.shape[1] < len(posicoes):
+            print(f"⚠️ Estrutura inesperada em '{fonte}' (esperava {len(posicoes)} colunas). Mantendo como está.")
+        else:
+            df = df.iloc[int(esquema.get("pular_linhas") or 0):, :len(posicoes)]
+            df.columns = posicoes
+    elif esquema.get("renomear"):
+        df = df.rename(columns=esquema["renomear"])
+
+    for col, tipo in (esquema.get("tipos") or {}).items():
+        if col not in df.columns:
+            continue
+        if tipo == "texto":
+            if not isinstance(df[col].dtype, pd.StringDtype) or df[col].dtype.na_value is not pd.NA:
+                s = df[col]
+                if pd.api.types.is_float_dtype(s) and (s.dropna() % 1 == 0).all():
+                    s = s.astype("Int64")  # inteiro que virou float por causa de vazios: "123", não "123.0"
+                df[col] = s.astype("string")
+        elif tipo == "numero":
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        else:
+            df[col] = parse_datas(df[col], fonte, col)
+
+    obrigatorias = [c for c in esquema.get("obrigatorias") or [] if c in df.columns]
+    if obrigatorias:
+        df = df.dropna(subset=obrigatorias)
+    return df
+
+def ler_planilha(path: Path, esquema: dict | None = None, mapa: dict | None = None,
+                 padronizar: Callable | None = None) -> pd.DataFrame:
+    """read_excel tipado pelo esquema (padrão: o do nome do arquivo).
+
+    mapa: {nome no arquivo: nome final} (sidecar da limpeza.py); padronizar: função
+    aplicada à lista de colunas logo após a leitura (ex.: limpeza.padronizar_colunas).
+    """
+    path = Path(path)
+    esquema = esquema_para(path.name) if esquema is None else esquema
+    mapa = mapa or {}
+    kwargs: dict = {}
+    if esquema and not esquema.get("posicoes"):
+        # nome final -> nome no arquivo (desfaz o mapa do sidecar e os renomes do esquema)
+        inverso_ren = {novo: antigo for antigo, novo in (esquema.get("renomear") or {}).items()}
+        inverso_mapa = {novo: antigo for antigo, novo in mapa.items()}
+        textos = [c for c, t in (esquema.get("tipos") or {}).items() if t == "texto"]
+        dtype = {}
+        for col in textos:
+            for nome in {col, inverso_ren.get(col, col)}:
+                dtype[inverso_mapa.get(nome, nome)] = "string"
+        kwargs["dtype"] = dtype
+        if esquema.get("descartar_unnamed"):
+            kwargs["usecols"] = lambda c: not _unnamed(mapa.get(str(c), c))
+    df = pd.read_excel(path, engine="openpyxl", **kwargs)
+    if mapa:
+        df.columns = [mapa.get(str(c), c) for c in df.columns]
+    if padronizar is not None:
+        df.columns = padronizar(df.columns)
+    return aplicar_esquema(df, esquema, path.name)
@@ -4,10 +4,13 @@
 OBJETIVO
 --------
 1) Ler TODAS as planilhas .xlsx que terminam com _clean.xlsx dentro de data/clean/
+   (e os sidecars _clean.colunas.json do modo "sidecar" da limpeza.py, que apontam
+   para a planilha original e trazem o mapa de colunas — ver limpeza.ler_clean)
 2) Fazer uma limpeza mínima e segura:
    - padronizar textos (tirar espaços extras, NBSP)
    - tentar converter colunas que PARECEM datas (heurística simples)
-   - aplicar regras específicas por arquivo (se configuradas no dict SCHEMAS)
+   - regras específicas por arquivo (renomes, tipos) vêm do esquemas.yml, aplicadas
+     já na leitura (scripts/esquemas.py)
 3) Salvar cada arquivo transformado em data/ETL_OK/ com sufixo _FORM.xlsx
    (ex.: ADMISSAO_ABRIL_clean.xlsx -> ADMISSAO_ABRIL_FORM.xlsx)
 4) Gerar um relatório simples das colunas encontradas por arquivo:
@@ -16,7 +19,7 @@ OBJETIVO
 POR QUE ASSIM?
 --------------
 - Você NÃO precisa criar um script para cada planilha.
-- Quando precisar tratar uma planilha de forma específica, basta ajustar o dict SCHEMAS.
+- Quando precisar tratar uma planilha de forma específica, basta ajustar o esquemas.yml.
 - Mantemos o fluxo simples e claro, usando só pandas + openpyxl.
 
 COMO RODAR
@@ -31,6 +34,10 @@ PRÉ-REQUISITOS
 from pathlib import Path  # para manipular caminhos de forma segura e legível
 import pandas as pd       # biblioteca principal para tabelas (dataframes)
 
+from limpeza import SUFIXO_SIDECAR, ler_clean  # leitura de data/clean (xlsx ou sidecar)
+from datas import parse_datas, salvar_cache_formatos  # datas com formato inferido e cacheado
+from normalizacao import normalizar_texto  # NBSP/espaços/vazio numa passada por coluna
+
 # ---------------------------------------------------------------------
 # PASTAS DO PROJETO
 # ---------------------------------------------------------------------
@@ -40,59 +47,6 @@ OUT_DIR = RAIZ / "data" / "ETL_OK"                  # saída: arquivos *_FORM.xl
 REPORTS_DIR = OUT_DIR / "_reports"                  # onde salvamos o relatório de colunas
 
 
-# ---------------------------------------------------------------------
-# REGRAS ESPECÍFICAS POR ARQUIVO (OPCIONAL)
-# - A CHAVE é um trecho do nome do arquivo (case-insensitive).
-# - O script procura esse trecho no nome e aplica as regras definidas.
-# - Se nada casar, aplica só a limpeza mínima e segue.
-#
-# CAMPOS POSSÍVEIS:
-#   rename    -> renomear colunas (dict {"ANTIGO": "NOVO"})
-#   force_str -> garantir tipo string nessas colunas (ex.: "MATRICULA")
-#   force_date-> converter para datetime (dayfirst=True) nessas colunas
-# ---------------------------------------------------------------------
-SCHEMAS = {
-    "ATIVOS": {
-        "force_str": ["MATRICULA"],
-        # "rename": {"TITULO_DO_CARGO": "CARGO"},  # exemplo de renome
-    },
-    "ADMISS": {  # cobre "ADMISSÃO ABRIL"
-        "force_str": ["MATRICULA"],
-        "force_date": ["DATA_ADMISSAO", "DT_ADMISSAO"],
-    },
-    "DESLIG": {
-        "force_str": ["MATRICULA"],
-        "force_date": ["DATA_DESLIGAMENTO", "DT_DESLIGAMENTO"],
-    },
-    "FERIAS": {
-        "force_str": ["MATRICULA"],
-        "force_date": ["DT_INICIO_FERIAS", "DT_FIM_FERIAS", "INICIO", "FIM"],
-    },
-    "AFAST": {
-        "force_str": ["MATRICULA"],
-        "force_date": ["DATA_INICIO", "DATA_FIM", "DT_INICIO", "DT_FIM"],
-    },
-    "APRENDIZ": {"force_str": ["MATRICULA"]},
-    "ESTAGIO": {"force_str": ["MATRICULA"]},
-    "EXTERIOR": {"force_str": ["MATRICULA"]},
-    "BASE SINDICATO": {"force_str": []},
-    "BASE DIAS UTEIS": {"force_str": ["MATRICULA"], "force_date": []},
-    "VR MENSAL": {"force_str": ["MATRICULA"]},
-}
-
-
-def _match_schema(fname: str) -> dict:
-    """
-    Decide qual regra (schema) aplicar com base no nome do arquivo.
-    Se nenhum padrão casar, retorna {} (sem regra específica).
-    """
-    up = fname.upper()
-    for key, spec in SCHEMAS.items():
-        if key.upper() in up:
-            return spec
-    return {}
-
-
 def _clean_strings(df: pd.DataFrame) -> pd.DataFrame:
     """
     Limpeza mínima e segura de TEXTOS:
@@ -101,68 +55,41 @@ def _clean_strings(df: pd.DataFrame) -> pd.DataFrame:
     - tira espaços das pontas
     - colapsa múltiplos espaços internos em 1
     - troca string vazia por NaN (pd.NA)
+    Tudo numa passada por coluna (scripts/normalizacao.py).
     """
     for c in df.select_dtypes(include=["object", "string"]).columns:
-        df[c] = (
-            df[c].astype("string")
-                 .str.replace("\u00a0", " ", regex=False)   # NBSP -> espaço normal
-                 .str.strip()                               # tira espaços das pontas
-                 .str.replace(r"\s+", " ", regex=True)      # colapsa espaços internos
-                 .replace({"": pd.NA})                      # vazio -> NA
-        )
+        df[c] = normalizar_texto(df[c])
     return df
 
 
-def _coerce_dates_smart(df: pd.DataFrame) -> pd.DataFrame:
+def _coerce_dates_smart(df: pd.DataFrame, fonte: str = "") -> pd.DataFrame:
     """
     Heurística simples para datas:
-    - Se o nome da coluna contém 'DATA', 'DT', 'INICIO' ou 'FIM', tentamos converter para datetime.
-    - dayfirst=True, pois usamos padrão brasileiro (DD/MM/AAAA).
-    - errors='coerce' -> valores inválidos viram NaT (data nula), sem travar o pipeline.
+    - Se o nome da coluna contém 'DATA', 'DT', 'INICIO', 'FIM' ou 'ADMISS', tentamos converter para datetime.
+    - O formato (serial do Excel, DD/MM/AAAA, ISO...) é inferido por amostra e guardado
+      por arquivo/coluna (scripts/datas.py); a conversão usa o caminho de formato fixo.
+    - Coluna cuja amostra não parece data fica como está (não vira NaT inteira).
+    - Valores inválidos numa coluna de datas viram NaT (data nula), sem travar o pipeline.
     """
     for c in df.columns:
         u = str(c).upper()
-        if any(tok in u for tok in ("DATA", "DT", "INICIO", "FIM")):
+        if any(tok in u for tok in ("DATA", "DT", "INICIO", "FIM", "ADMISS")):
             try:
-                df[c] = pd.to_datetime(df[c], errors="coerce", dayfirst=True)
+                df[c] = parse_datas(df[c], fonte, c, somente_se_data=True)
             except Exception:
                 # Se não der, ignora e segue (não interrompe o processo)
                 pass
     return df
 
 
-def _apply_schema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
-    """
-    Aplica as regras específicas definidas em SCHEMAS:
-    - renome de colunas
-    - forçar string
-    - forçar datetime
-    """
-    df = df.copy()
-
-    # 1) Renomear colunas, se solicitado
-    if "rename" in schema and schema["rename"]:
-        df = df.rename(columns=schema["rename"])
-
-    # 2) Forçar string
-    for col in schema.get("force_str", []) or []:
-        if col in df.columns:
-            df[col] = df[col].astype("string")
-
-    # 3) Forçar datetime
-    for col in schema.get("force_date", []) or []:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True)
-
-    return df
-
-
 def _form_name(path: Path) -> str:
     """
     Gera o nome de saída com sufixo _FORM.
     - Se o nome contém _clean, troca por _FORM.
     - Caso contrário, apenas acrescenta _FORM no final do nome (antes da extensão).
     """
+    if path.name.endswith(SUFIXO_SIDECAR):  # X_clean.colunas.json -> X_clean.xlsx
+        path = path.with_name(path.name[: -len(SUFIXO_SIDECAR)] + ".xlsx")
     stem = path.stem
     out_stem = stem.replace("_clean", "_FORM")
     if out_stem == stem:  # não tinha _clean
@@ -195,7 +122,7 @@ def main() -> None:
     """
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    files = sorted(CLEAN_DIR.glob("*.xlsx"))
+    files = sorted([*CLEAN_DIR.glob("*.xlsx"), *CLEAN_DIR.glob(f"*{SUFIXO_SIDECAR}")])
     files = [f for f in files if not f.name.startswith("~$")]
 
     if not files:
@@ -210,8 +137,8 @@ def main() -> None:
           continue
         
         try:
-            # 1) Leitura
-            df = pd.read_excel(f, engine="openpyxl")
+            # 1) Leitura tipada pelo esquemas.yml (sidecar: planilha original + mapa de colunas)
+            df = ler_clean(f)
 
             # 2) Registrar inventário básico (para relatório)
             inventory.append({
@@ -225,23 +152,18 @@ def main() -> None:
             df = _clean_strings(df)
 
             # 4) Tentativa heurística de datas
-            df = _coerce_dates_smart(df)
-
-            # 5) Aplicar regras específicas, se houver match no nome do arquivo
-            schema = _match_schema(f.name)
-            if schema:
-                df = _apply_schema(df, schema)
+            df = _coerce_dates_smart(df, f.name)
 
-            # 6) Definir nome de saída (_FORM.xlsx)
+            # 5) Definir nome de saída (_FORM.xlsx)
             out_name = _form_name(f)
             out_path = OUT_DIR / out_name
 
-            # 7) Se já existir, não sobrescreve (evita perda acidental)
+            # 6) Se já existir, não sobrescreve (evita perda acidental)
             if out_path.exists():
                 print(f"🔁 Ignorado (já existe): {out_path.name}")
                 continue
 
-            # 8) Gravar
+            # 7) Gravar
             with pd.ExcelWriter(out_path, engine="openpyxl") as wr:
                 df.to_excel(wr, index=False)
 
@@ -251,8 +173,9 @@ def main() -> None:
             # Qualquer erro em uma planilha NÃO paralisa as demais
             print(f"❌ {f.name}  ->  {e}")
 
-    # 9) Ao final, gravar o relatório de colunas
+    # 8) Ao final, gravar o relatório de colunas (e os formatos de data inferidos)
     _inventory_columns(inventory)
+    salvar_cache_formatos()
 
 
 # Ponto de entrada quando você roda: python scripts/etl_clean_to_form.py
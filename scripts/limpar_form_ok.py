@@ -3,11 +3,12 @@
 #limpar_form_ok.py
 """
 Limpeza das planilhas *_FORM.xlsx (varredura controlada).
-- Remove colunas 'UNNAMED:*' (sobras do Excel).
-- Aplica regras específicas quando necessário.
+- Lê pelo registro esquemas.yml (scripts/esquemas.py): colunas 'UNNAMED:*' (sobras
+  do Excel) nem são lidas, e renomes/tipos por arquivo já saem da leitura.
 - Salva em data/FORM_OK/<NOME>_FORM_OK.xlsx, sem sobrescrever o original.
 
-Cobertura:
+Cobertura (regras no esquemas.yml):
+  ✔ ADMISSÃO ABRIL_FORM.xlsx
   ✔ AFASTAMENTOS_FORM.xlsx
   ✔ APRENDIZ_FORM.xlsx
   ✔ ATIVOS_FORM.xlsx
@@ -15,8 +16,8 @@ Cobertura:
   ✔ EXTERIOR_FORM.xlsx  (renomeia CADASTRO->MATRICULA; VALOR numérico)
   ✔ FÉRIAS/FÉRIAS_FORM.xlsx  (DIAS_DE_FERIAS numérico)
   ✔ ESTÁGIO/ESTAGIO_FORM.xlsx  (sem regra extra, só UNNAMED)
-  ✔ Base dias uteis_FORM.xlsx  (coluna de dias útil -> numérica)
-  ✔ Base sindicato x valor_FORM.xlsx  (VALOR numérico; ESTADO strip)
+  ✔ Base dias uteis_FORM.xlsx  (SINDICATO / DIAS_UTEIS numérico)
+  ✔ Base sindicato x valor_FORM.xlsx  (VALOR numérico; ESTADO texto)
 
 Obs.: O arquivo "VR MENSAL 05.2025_FORM.xlsx" é layout de saída -> não passar aqui.
 """
@@ -24,17 +25,7 @@ Obs.: O arquivo "VR MENSAL 05.2025_FORM.xlsx" é layout de saída -> não passar
 from pathlib import Path
 import pandas as pd
 
-def _extrair_dias_uteis_de_excel(path: Path) -> int | None:
-    """Acha um número de dias úteis mesmo se estiver como cabeçalho ou célula solta."""
-    df = pd.read_excel(path, engine="openpyxl")
-    col = next((c for c in df.columns if "DIAS" in str(c).upper()), None)
-    if col:
-        serie = pd.to_numeric(df[col], errors="coerce").dropna()
-        if not serie.empty:
-            return int(serie.iloc[0])
-    df2 = pd.read_excel(path, engine="openpyxl", header=None)
-    vals = pd.to_numeric(df2.stack(), errors="coerce").dropna()
-    return int(vals.iloc[0]) if not vals.empty else None
+from esquemas import ler_planilha  # leitura tipada (esquemas.yml)
 
 # --- Pastas do projeto ---
 RAIZ = Path(__file__).resolve().parents[1]   # raiz do projeto (Desafio4_VR)
@@ -42,20 +33,10 @@ ETL_OK = RAIZ / "data" / "ETL_OK"            # entrada (_FORM.xlsx)
 FORM_OK = RAIZ / "data" / "FORM_OK"          # saída (_FORM_OK.xlsx)
 FORM_OK.mkdir(parents=True, exist_ok=True)   # cria pasta caso não exista
 
-def remove_unnamed(df: pd.DataFrame) -> pd.DataFrame:
-    """Remove colunas cujo nome começa com 'UNNAMED' (sobras do Excel)."""
-    keep = [c for c in df.columns if not str(c).upper().startswith("UNNAMED")]
-    return df.loc[:, keep].copy()
-
-def to_num(s):
-    """Conversão numérica tolerante: erros viram NaN (coerce)."""
-    return pd.to_numeric(s, errors="coerce")
-
 def limpar_generico(nome_arquivo: str) -> None:
     """
     Limpa UM arquivo _FORM.xlsx.
-    - Remove UNNAMED
-    - Aplica regras específicas por tipo
+    - Lê sem UNNAMED e com as regras do esquemas.yml (renomes, tipos)
     - Salva como _FORM_OK.xlsx (sem sobrescrever)
     """
     # Ignora locks do Excel (~$arquivo.xlsx)
@@ -68,62 +49,7 @@ def limpar_generico(nome_arquivo: str) -> None:
         print(f"⚠️ Arquivo não encontrado: {nome_arquivo}")
         return
 
-    df = pd.read_excel(in_path, engine="openpyxl")
-    df = remove_unnamed(df)
-
-    # Normalização simples do nome para checagens (com ou sem acento)
-    name_up = nome_arquivo.upper()
-
-    # ---------------- Regras específicas ----------------
-    # EXTERIOR: CADASTRO -> MATRICULA; VALOR numérico
-    if "EXTERIOR" in name_up:
-        if "CADASTRO" in df.columns:
-            df = df.rename(columns={"CADASTRO": "MATRICULA"})
-        if "VALOR" in df.columns:
-            df["VALOR"] = to_num(df["VALOR"])
-
-    # FÉRIAS: forçar DIAS_DE_FERIAS como numérico
-    if "FÉRIAS" in name_up or "FERIAS" in name_up:
-        if "DIAS_DE_FERIAS" in df.columns:
-            df["DIAS_DE_FERIAS"] = to_num(df["DIAS_DE_FERIAS"])
-
-    # ESTÁGIO: nada específico além de UNNAMED (nome pode vir sem acento)
-    if "ESTÁGIO" in name_up or "ESTAGIO" in name_up:
-        pass  # já removemos UNNAMED acima
-
-        # Base dias uteis: transformar em mapeamento SINDICATO -> DIAS_UTEIS
-    if "BASE DIAS UTEIS" in name_up or "BASE DIAS ÚTEIS" in name_up:
-        # Releitura "crua" do arquivo para manipular linhas
-        df0 = pd.read_excel(in_path, engine="openpyxl")
-
-        if df0.shape[1] < 2:
-            print("⚠️ Estrutura inesperada em 'Base dias uteis'. Mantendo como está.")
-        else:
-            col_sind = df0.columns[0]   # ex: BASE_DIAS_UTEIS_DE_15_04_A_15_05
-            col_dias = df0.columns[1]   # ex: UNNAMED_1
-
-            # A 1ª linha do arquivo contém os rótulos (“SINDICADO” / “DIAS UTEIS”).
-            # Os dados começam na linha 2.
-            sind = df0[col_sind].iloc[1:].astype(str).str.strip()
-            dias = pd.to_numeric(df0[col_dias].iloc[1:], errors="coerce")
-
-            # Normaliza nomes/colunas finais
-            df = pd.DataFrame({
-                "SINDICATO": sind,
-                "DIAS_UTEIS": dias
-            }).dropna(subset=["SINDICATO", "DIAS_UTEIS"])
-
-            # Se quiser, padronize “SINDICADO” -> “SINDICATO” (feito acima)
-
-
-    # Base sindicato x valor: VALOR numérico; ESTADO limpo
-    if "BASE SINDICATO X VALOR" in name_up:
-        if "VALOR" in df.columns:
-            df["VALOR"] = to_num(df["VALOR"])
-        if "ESTADO" in df.columns:
-            df["ESTADO"] = df["ESTADO"].astype(str).str.strip()
-
-    # ----------------------------------------------------
+    df = ler_planilha(in_path)
 
     out_path = FORM_OK / nome_arquivo.replace("_FORM.xlsx", "_FORM_OK.xlsx")
     if out_path.exists():
@@ -141,6 +67,7 @@ def main():
     Você pode comentar/descomentar para rodar um a um, se preferir.
     """
     arquivos = [
+        "ADMISSÃO ABRIL_FORM.xlsx",
         "AFASTAMENTOS_FORM.xlsx",
         "APRENDIZ_FORM.xlsx",
         "ATIVOS_FORM.xlsx",
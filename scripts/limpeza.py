@@ -7,17 +7,46 @@ Padroniza APENAS o cabeçalho dos .xlsx:
 • Mantém dados intactos.
 • Salva com sufixo _clean (ex.: ATIVOS_clean.xlsx).
 • Se já existir em data/clean, IGNORA.
+
+Modos (--modo ou env LIMPEZA_MODO):
+  cabecalho (padrão) -> reescreve só a 1ª linha da 1ª aba no XML do .xlsx; as demais
+                        linhas e partes do arquivo são copiadas como estão (sem parse).
+  sidecar            -> não copia a planilha: grava X_clean.colunas.json com a origem e o
+                        mapa de colunas, aplicado na leitura (ler_clean).
+  completo           -> fluxo antigo: lê tudo no pandas e regrava cada célula.
+Planilhas que o modo cabecalho não sabe editar (tabelas do Excel, XML fora do padrão)
+caem no modo completo.
 """
 
+import os
+import re
+import json
+import shutil
+import argparse
+import zipfile
 from pathlib import Path
 import unicodedata
+import xml.etree.ElementTree as ET
 import pandas as pd
 
+from esquemas import esquema_para, ler_planilha  # leitura tipada (esquemas.yml)
+
 # Pastas
 RAIZ = Path(__file__).resolve().parents[1]
 INPUT_DIR = RAIZ / "data" / "raw" / "Originais"
 OUTPUT_DIR = RAIZ / "data" / "clean"
 
+MODOS = ("cabecalho", "sidecar", "completo")
+SUFIXO_SIDECAR = ".colunas.json"
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+LIMITE_CABECALHO = 4 << 20  # bytes lidos procurando a 1ª linha antes de desistir
+_RE_LINHA = re.compile(rb"<row\b[^>]*?(?:/>|>.*?</row>)", re.S)
+_RE_CELULA = re.compile(rb"<c\b[^>]*?(?:/>|>.*?</c>)", re.S)
+_RE_FIM_DADOS = re.compile(rb"<sheetData\s*/>|</sheetData>")
+_RE_ATRIB_PREFIXADO = re.compile(rb'\s[A-Za-z_][\w.-]*:[\w.-]+="[^"]*"')  # ex.: x14ac:dyDescent
+
 def garantir_pastas() -> None:
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -62,7 +91,177 @@ def ler_excel_sem_mudar_dados(caminho: Path) -> pd.DataFrame:
         df.columns = novas
     return df
 
-def processar_arquivo(caminho: Path) -> str:
+# --------- Cabeçalho direto no XML ---------
+class CabecalhoNaoSuportado(Exception):
+    """Estrutura do .xlsx fora do que o modo cabecalho edita com segurança."""
+
+def _primeira_aba(zf: zipfile.ZipFile) -> str:
+    """Caminho (no zip) do XML da 1ª aba — a mesma que o pandas lê com sheet_name=0."""
+    wb = ET.fromstring(zf.read("xl/workbook.xml"))
+    aba = wb.find(f"{NS_MAIN}sheets/{NS_MAIN}sheet")
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    if aba is None:
+        raise CabecalhoNaoSuportado("workbook sem abas")
+    rid = aba.get(f"{NS_REL}id")
+    for rel in rels.iter(f"{NS_PKG_REL}Relationship"):
+        if rel.get("Id") == rid:
+            alvo = rel.get("Target", "")
+            return alvo.lstrip("/") if alvo.startswith("/") else f"xl/{alvo}"
+    raise CabecalhoNaoSuportado("aba sem relacionamento")
+
+def _ler_inicio(fluxo) -> tuple[bytes, re.Match | None]:
+    """Lê o XML da aba até o fim da 1ª <row> (ou de <sheetData>); devolve os bytes lidos."""
+    buf = b""
+    while len(buf) < LIMITE_CABECALHO:
+        bloco = fluxo.read(1 << 16)
+        buf += bloco
+        ini = buf.find(b"<sheetData")
+        if ini >= 0:
+            m = _RE_LINHA.search(buf, ini)
+            if m or _RE_FIM_DADOS.search(buf, ini):
+                return buf, m
+        if not bloco:
+            break
+    raise CabecalhoNaoSuportado("1ª linha não encontrada no XML da aba")
+
+def _col_indice(ref: str | None) -> int:
+    # r é opcional no OOXML (posição implícita): sem ele não dá para casar a coluna com segurança
+    m = re.match(r"[A-Z]+", ref or "")
+    if m is None:
+        raise CabecalhoNaoSuportado(f"célula do cabeçalho sem referência (r={ref!r})")
+    n = 0
+    for ch in m.group():
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+def _textos_compartilhados(zf: zipfile.ZipFile, indices: set[int]) -> dict[int, str]:
+    """Só as strings compartilhadas pedidas (parse em streaming, para no maior índice)."""
+    if not indices or "xl/sharedStrings.xml" not in zf.namelist():
+        return {}
+    out, i, ultimo = {}, 0, max(indices)
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, el in ET.iterparse(f):
+            if el.tag != f"{NS_MAIN}si":
+                continue
+            if i in indices:
+                out[i] = "".join(t.text or "" for t in el.iter(f"{NS_MAIN}t"))
+            el.clear()
+            if i >= ultimo:
+                break
+            i += 1
+    return out
+
+def _valor_celula(cel: ET.Element, compartilhadas: dict[int, str]):
+    """Valor como o pandas/openpyxl veria (texto, int, float ou bool); None se vazio."""
+    tipo, v = cel.get("t", "n"), cel.find("v")
+    if tipo == "inlineStr":
+        return "".join(t.text or "" for t in cel.iter("t"))
+    if v is None or v.text is None:
+        return None
+    if tipo == "s":
+        return compartilhadas.get(int(v.text))
+    if tipo == "b":
+        return v.text == "1"
+    if tipo == "n":
+        return int(v.text) if re.fullmatch(r"-?\d+", v.text) else float(v.text)
+    return v.text
+
+def _nomes_pandas(celulas: list[tuple[int, object]]) -> list[str]:
+    """Nomes das colunas do cabeçalho como o read_excel devolveria (vazios → Unnamed: i;
+    repetidos → X.1, X.2)."""
+    nomes, vistos = [], {}
+    for idx, val in celulas:
+        nome = str(val) if val is not None and str(val).strip() != "" else f"Unnamed: {idx}"
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome] - 1}"
+        else:
+            vistos[nome] = 1
+        nomes.append(nome)
+    return nomes
+
+def ler_cabecalho(caminho: Path) -> tuple[str, list[tuple[int, str, str]]]:
+    """(aba, [(índice da coluna, nome lido, nome padronizado)]) lendo só a 1ª linha."""
+    with zipfile.ZipFile(caminho) as zf:
+        if any(n.startswith("xl/tables/") for n in zf.namelist()):
+            raise CabecalhoNaoSuportado("aba com tabela do Excel (cabeçalho amarrado à tabela)")
+        aba = _primeira_aba(zf)
+        with zf.open(aba) as f:
+            _, m = _ler_inicio(f)
+        if m is None:
+            return aba, []
+        # atributos com prefixo não declarado no fragmento não interessam ao cabeçalho
+        linha = ET.fromstring(_RE_ATRIB_PREFIXADO.sub(b"", m.group()))
+        if linha.get("r", "1") != "1":
+            raise CabecalhoNaoSuportado("a planilha não começa na linha 1")
+        celulas = [c for c in linha if c.tag == "c"]
+        indices = {int(c.find("v").text) for c in celulas if c.get("t") == "s" and c.find("v") is not None}
+        compartilhadas = _textos_compartilhados(zf, indices)
+    valores = [(_col_indice(c.get("r")), _valor_celula(c, compartilhadas)) for c in celulas]
+    valores = [(i, v) for i, v in valores if v is not None and str(v).strip() != ""]
+    nomes = _nomes_pandas(valores)
+    return aba, list(zip([i for i, _ in valores], nomes, padronizar_colunas(nomes)))
+
+def _linha_reescrita(linha_xml: bytes, novos: dict[int, str]) -> bytes:
+    """Troca o conteúdo das células do cabeçalho por inlineStr (estilo da célula preservado)."""
+    def trocar(m: re.Match) -> bytes:
+        cel = m.group()
+        ref = re.search(rb'\br="([A-Z]+)\d*"', cel)
+        idx = _col_indice(ref.group(1).decode()) if ref else None
+        if idx not in novos:
+            return cel
+        estilo = re.search(rb'\bs="(\d+)"', cel)
+        s_attr = b' s="' + estilo.group(1) + b'"' if estilo else b""
+        return (b'<c r="' + ref.group(1) + b'1"' + s_attr + b' t="inlineStr"><is><t>'
+                + novos[idx].encode("utf-8") + b"</t></is></c>")
+    return _RE_CELULA.sub(trocar, linha_xml)
+
+def reescrever_cabecalho(origem: Path, destino: Path) -> list[tuple[int, str, str]]:
+    """Copia o .xlsx trocando só a 1ª linha da 1ª aba; o resto do XML segue byte a byte."""
+    aba, colunas = ler_cabecalho(origem)
+    novos = {idx: novo for idx, _, novo in colunas}
+    tmp = destino.with_name(destino.name + ".tmp")
+    with zipfile.ZipFile(origem) as zin, zipfile.ZipFile(tmp, "w") as zout:
+        for info in zin.infolist():
+            novo_info = zipfile.ZipInfo(info.filename, info.date_time)
+            novo_info.compress_type = info.compress_type
+            novo_info.external_attr = info.external_attr
+            with zin.open(info) as src, zout.open(novo_info, "w") as dst:
+                if info.filename == aba and novos:
+                    buf, m = _ler_inicio(src)
+                    dst.write(buf[:m.start()] + _linha_reescrita(m.group(), novos) + buf[m.end():])
+                shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(tmp, destino)
+    return colunas
+
+# --------- Sidecar (mapa aplicado na leitura) ---------
+def gravar_sidecar(origem: Path, destino: Path) -> list[tuple[int, str, str]]:
+    aba, colunas = ler_cabecalho(origem)
+    try:
+        ref = origem.resolve().relative_to(RAIZ).as_posix()
+    except ValueError:
+        ref = str(origem.resolve())
+    dados = {"origem": ref, "aba": aba, "colunas": {lido: novo for _, lido, novo in colunas}}
+    destino.write_text(json.dumps(dados, ensure_ascii=False, indent=2), encoding="utf-8")
+    return colunas
+
+def ler_clean(caminho: Path) -> pd.DataFrame:
+    """Lê um arquivo de data/clean (.xlsx ou sidecar .colunas.json) já com as colunas padronizadas
+    e tipado pelo esquemas.yml (scripts/esquemas.py).
+
+    Colunas sem cabeçalho (Unnamed: i, só visíveis com os dados) são padronizadas aqui;
+    em arquivos já padronizados a operação não muda nada.
+    """
+    caminho = Path(caminho)
+    if caminho.name.endswith(SUFIXO_SIDECAR):
+        dados = json.loads(caminho.read_text(encoding="utf-8"))
+        origem = Path(dados["origem"])
+        origem = origem if origem.is_absolute() else RAIZ / origem
+        return ler_planilha(origem, esquema_para(caminho.name), mapa=dados.get("colunas", {}),
+                            padronizar=padronizar_colunas)
+    return ler_planilha(caminho, padronizar=padronizar_colunas)
+
+def processar_arquivo(caminho: Path, modo: str = "cabecalho") -> str:
     # Define nome de saída com sufixo _clean (evita duplicar se já tiver)
     stem = caminho.stem
     if not stem.lower().endswith("_clean"):
@@ -70,10 +269,22 @@ def processar_arquivo(caminho: Path) -> str:
     else:
         stem_out = stem
     out_path = OUTPUT_DIR / f"{stem_out}{caminho.suffix}"
+    sidecar_path = OUTPUT_DIR / f"{stem_out}{SUFIXO_SIDECAR}"
 
-    # Se já existe, ignora
-    if out_path.exists():
-        return f"🔁 ignorado (já existe): {out_path.name}"
+    # Se já existe (planilha ou sidecar), ignora
+    for existente in (out_path, sidecar_path):
+        if existente.exists():
+            return f"🔁 ignorado (já existe): {existente.name}"
+
+    if modo in ("cabecalho", "sidecar"):
+        try:
+            if modo == "sidecar":
+                colunas = gravar_sidecar(caminho, sidecar_path)
+                return f"✅ sidecar: {sidecar_path.name} ({len(colunas)} colunas)"
+            colunas = reescrever_cabecalho(caminho, out_path)
+            return f"✅ salvo (só cabeçalho): {out_path.name} ({len(colunas)} colunas)"
+        except (CabecalhoNaoSuportado, KeyError, ET.ParseError) as e:
+            print(f"[AVISO] {caminho.name}: {e}; usando o modo completo")
 
     df = ler_excel_sem_mudar_dados(caminho)
     df.columns = padronizar_colunas(df.columns)
@@ -84,6 +295,10 @@ def processar_arquivo(caminho: Path) -> str:
     return f"✅ salvo: {out_path.name}"
 
 def main() -> None:
+    ap = argparse.ArgumentParser(description="Padroniza o cabeçalho das planilhas (raw → clean)")
+    ap.add_argument("--modo", choices=MODOS, default=os.getenv("LIMPEZA_MODO", "cabecalho"))
+    args = ap.parse_args()
+
     print(f"📂 Entrada : {INPUT_DIR}")
     print(f"📁 Saída   : {OUTPUT_DIR}")
     garantir_pastas()
@@ -97,7 +312,7 @@ def main() -> None:
 
     for arq in arquivos:
         try:
-            msg = processar_arquivo(arq)
+            msg = processar_arquivo(arq, args.modo)
             print(f"{arq.name} -> {msg}")
         except Exception as e:
             print(f"{arq.name} -> ❌ erro: {e}")
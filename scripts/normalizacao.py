@@ -0,0 +1,90 @@
+# scripts/normalizacao.py
+# -*- coding: utf-8 -*-
+"""
+Normalização de textos numa passada por coluna (usada pela ETL e pelo VR.py).
+
+Faz de uma vez o que antes eram várias cadeias .str por coluna:
+  • NBSP e qualquer espaço Unicode -> espaço comum; espaços internos colapsados; pontas aparadas
+  • (opcional) MAIÚSCULAS
+  • (opcional) sem acentos (NFKD + só ASCII — o mesmo que normalize/encode/decode)
+  • (opcional) vazio -> NA
+
+Como:
+  • Com pyarrow instalado, usa os kernels de string do Arrow (C++, sem loop Python).
+  • Sem pyarrow, um único loop Python por valor (todas as etapas juntas).
+  • Colunas de baixa cardinalidade (sindicato, UF, situação...) são normalizadas só
+    nos valores distintos e expandidas pelos códigos (pd.factorize).
+"""
+
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow é opcional: cai no loop Python
+    pa = pc = None
+
+AMOSTRA_CARDINALIDADE = 2000
+LIMITE_DISTINTOS = 0.5  # distintos/linhas na amostra abaixo disso => memoiza nos distintos
+
+# Os dois caminhos precisam dar o MESMO resultado (as chaves dos joins não podem depender de ter
+# pyarrow). \s do RE2 não cobre \v, \x1c-\x1f e \x85, que o str.split() trata como espaço; e o
+# utf8_upper do Arrow não faz as maiúsculas de mais de um caractere do Python (ß -> SS, ﬁ -> FI):
+# valores com esses caracteres passam pelo str.upper().
+_RE_ESPACOS = r"[\s\x0b\x1c-\x1f\x85\p{Z}]+"
+_RE_MAIUSCULA_ESPECIAL = "[" + "".join(
+    f"\\x{{{i:04X}}}" for i in range(0x10000) if len(chr(i).upper()) > 1) + "]"
+
+# --------- Kernels ---------
+def _valor(v: str, maiusculas: bool, sem_acentos: bool) -> str:
+    v = " ".join(v.split())  # split() sem argumento já trata NBSP e demais espaços Unicode
+    if sem_acentos:
+        v = unicodedata.normalize("NFKD", v).encode("ascii", errors="ignore").decode("ascii")
+    return v.upper() if maiusculas else v
+
+def _normalizar_python(txt: pd.Series, maiusculas: bool, sem_acentos: bool, vazio_na: bool) -> pd.Series:
+    valores = [
+        _valor(v, maiusculas, sem_acentos) if isinstance(v, str) else None  # NA/NaN
+        for v in txt.array
+    ]
+    out = pd.Series(valores, index=txt.index, dtype="string")
+    return out.mask(out == "") if vazio_na else out
+
+def _normalizar_arrow(txt: pd.Series, maiusculas: bool, sem_acentos: bool, vazio_na: bool) -> pd.Series:
+    arr = pa.array(txt.astype("string[pyarrow]").array)
+    arr = pc.utf8_trim_whitespace(pc.replace_substring_regex(arr, _RE_ESPACOS, " "))
+    if sem_acentos:
+        arr = pc.replace_substring_regex(pc.utf8_normalize(arr, "NFKD"), r"[^\x00-\x7F]", "")
+    if maiusculas:
+        especiais = pc.fill_null(pc.match_substring_regex(arr, _RE_MAIUSCULA_ESPECIAL), False)
+        upper = pc.utf8_upper(arr)
+        if pc.any(especiais).as_py():
+            trocas = pa.array([v.upper() for v in arr.filter(especiais).to_pylist()], arr.type)
+            upper = pc.replace_with_mask(upper, especiais, trocas)
+        arr = upper
+    if vazio_na:
+        arr = pc.if_else(pc.equal(arr, ""), pa.scalar(None, pa.string()), arr)
+    return pd.Series(pd.arrays.ArrowStringArray(arr), index=txt.index)
+
+def _normalizar(txt: pd.Series, *opcoes) -> pd.Series:
+    return (_normalizar_arrow if pa is not None else _normalizar_python)(txt, *opcoes)
+
+def _baixa_cardinalidade(txt: pd.Series) -> bool:
+    amostra = txt.head(AMOSTRA_CARDINALIDADE)
+    return len(txt) > 1 and amostra.nunique(dropna=True) <= LIMITE_DISTINTOS * max(1, amostra.notna().sum())
+
+# --------- API ---------
+def normalizar_texto(s: pd.Series, *, maiusculas: bool = False, sem_acentos: bool = False,
+                     vazio_na: bool = True) -> pd.Series:
+    """Série "string" normalizada (NA preservado); valores não texto viram texto antes."""
+    txt = s if isinstance(s.dtype, pd.StringDtype) else s.astype("string")
+    opcoes = (maiusculas, sem_acentos, vazio_na)
+    if not _baixa_cardinalidade(txt):
+        return _normalizar(txt, *opcoes)
+    codigos, distintos = pd.factorize(txt, use_na_sentinel=True)
+    feitos = _normalizar(pd.Series(distintos, dtype="string"), *opcoes)
+    expandido = feitos.array.take(np.asarray(codigos), allow_fill=True)
+    return pd.Series(expandido, index=s.index, name=s.name)
@@ -0,0 +1,30 @@
+# scripts/ufs.py
+# -*- coding: utf-8 -*-
+"""
+UFs e nomes dos estados por extenso — tabela única usada pelo cálculo (VR.py) e
+pela validação (validacao.py), para que as duas nunca divirjam.
+"""
+
+import unicodedata
+
+UF_SET = {
+    "AC","AL","AM","AP","BA","CE","DF","ES","GO","MA","MG","MS","MT",
+    "PA","PB","PE","PI","PR","RJ","RN","RO","RR","RS","SC","SE","SP","TO"
+}
+NOME2UF = {
+    "ACRE":"AC","ALAGOAS":"AL","AMAPA":"AP","AMAZONAS":"AM","BAHIA":"BA","CEARA":"CE",
+    "DISTRITOFEDERAL":"DF","ESPIRITOSANTO":"ES","GOIAS":"GO","MARANHAO":"MA","MINASGERAIS":"MG",
+    "MATOGROSSO":"MT","MATOGROSSODOSUL":"MS","PARA":"PA","PARAIBA":"PB","PERNAMBUCO":"PE","PIAUI":"PI",
+    "PARANA":"PR","RIODEJANEIRO":"RJ","RIOGRANDEDONORTE":"RN","RONDONIA":"RO","RORAIMA":"RR",
+    "RIOGRANDEDOSUL":"RS","SANTACATARINA":"SC","SERGIPE":"SE","SAOPAULO":"SP","TOCANTINS":"TO"
+}
+
+def strip_accents(s: str) -> str:
+    return "".join(ch for ch in unicodedata.normalize("NFD", s) if unicodedata.category(ch) != "Mn")
+
+def nome_estado_para_uf(nome: str) -> str | None:
+    """'São Paulo' / 'SAO  PAULO' -> 'SP' (sem acentos, caixa e espaços, inclusive NBSP)."""
+    if not isinstance(nome, str):
+        return None
+    t = "".join(strip_accents(nome).upper().split())
+    return NOME2UF.get(t)
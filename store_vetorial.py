@@ -0,0 +1,428 @@
+# store_vetorial.py
+# -------------------------------------------
+# Armazenamento vetorial da collection VR atrás de uma interface única
+# -------------------------------------------
+#   StoreQdrant — Qdrant Cloud/servidor (ou ":memory:"), filtros empurrados ao Qdrant
+#   StoreLocal  — índice embutido em disco (data/ETL_OK/_vetores): matriz float32
+#                 memory-mapped com top-k por força bruta (BLAS) e, acima de
+#                 HNSW_MIN vetores, um grafo HNSW (hnswlib, opcional)
+#
+# A ingestão (ingest_excel_to_qdrant.py) e a busca usam só os métodos abaixo:
+#   garantir(dim) · hashes(sources) · gravar(docs, vetores) · remover(ids)
+#   finalizar() · contar() · versao() · buscar(vetor, k, filtros, source)
+# e os resultados da busca têm sempre o formato {"id","score","page_content","metadata"}.
+
+import os
+import json
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
+
+from busca_vetorial import CAMPOS_PAYLOAD, criar_indices_payload, filtro_qdrant
+
+VECTOR_STORE = os.getenv("VECTOR_STORE", "qdrant").strip().lower()   # qdrant | local
+VECTOR_DIR = os.getenv("VECTOR_DIR", "./data/ETL_OK/_vetores")
+HNSW_MIN = int(os.getenv("VECTOR_HNSW_MIN", "20000"))  # abaixo disso, força bruta é mais rápida e exata
+# Parâmetros do índice (valem para o Qdrant e para o HNSW local)
+HNSW_M = int(os.getenv("VECTOR_HNSW_M", "16"))
+HNSW_EF_CONSTRUCT = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCT", "200"))
+HNSW_EF = int(os.getenv("VECTOR_HNSW_EF", "128"))                      # busca: maior ⇒ mais recall, mais latência
+CHECKPOINT_LOTES = int(os.getenv("VECTOR_CHECKPOINT_LOTES", "20"))  # índice local: grava em disco a cada N lotes
+# Armazenamento da collection no Qdrant
+QUANTIZACOES = ("nenhuma", "scalar", "binary")
+VECTOR_QUANTIZACAO = os.getenv("VECTOR_QUANTIZACAO", "nenhuma").strip().lower()
+VECTOR_ON_DISK = os.getenv("VECTOR_ON_DISK", "0").strip().lower() in ("1", "true", "sim")
+VECTOR_OVERSAMPLING = float(os.getenv("VECTOR_OVERSAMPLING", "2.0"))  # reavaliação em float32 após a busca quantizada
+
+def _quantizacao(tipo: str):
+    """Config de quantização do Qdrant (vetores quantizados sempre em RAM, originais onde on_disk mandar)."""
+    if tipo == "scalar":  # int8: ~4× menos memória, recall quase igual
+        return rest.ScalarQuantization(scalar=rest.ScalarQuantizationConfig(
+            type=rest.ScalarType.INT8, quantile=0.99, always_ram=True))
+    if tipo == "binary":  # 1 bit/dim: ~32× menos memória; bom para dims altas (≥ 1024) com rescore
+        return rest.BinaryQuantization(binary=rest.BinaryQuantizationConfig(always_ram=True))
+    return None
+
+# --------- Qdrant ---------
+class StoreQdrant:
+    """Collection do Qdrant. Opções (padrão: env VECTOR_*) — quantização 'nenhuma'|'scalar'|'binary',
+    vetores originais em disco (on_disk) e parâmetros do HNSW (m, ef_construct; ef na busca)."""
+
+    def __init__(self, client: QdrantClient, collection: str, quantizacao: str | None = None,
+                 on_disk: bool | None = None, hnsw_m: int | None = None, hnsw_ef_construct: int | None = None,
+                 hnsw_ef: int | None = None, oversampling: float | None = None):
+        self.client = client
+        self.collection = collection
+        self.quantizacao = (quantizacao or VECTOR_QUANTIZACAO).strip().lower()
+        if self.quantizacao not in QUANTIZACOES:
+            raise ValueError(f"Quantização inválida: {self.quantizacao} (use {', '.join(QUANTIZACOES)})")
+        self.on_disk = VECTOR_ON_DISK if on_disk is None else on_disk
+        self.hnsw_m = hnsw_m or HNSW_M
+        self.hnsw_ef_construct = hnsw_ef_construct or HNSW_EF_CONSTRUCT
+        self.hnsw_ef = hnsw_ef or HNSW_EF
+        self.oversampling = oversampling or VECTOR_OVERSAMPLING
+
+    @property
+    def escrita_concorrente(self) -> bool:
+        """Modo embutido do cliente (":memory:"/path) não suporta escrita concorrente."""
+        return type(getattr(self.client, "_client", None)).__name__ != "QdrantLocal"
+
+    def garantir(self, dim: int) -> None:
+        existing = [c.name for c in self.client.get_collections().collections]
+        if self.collection in existing:
+            print(f"[INFO] Collection '{self.collection}' já existe. Usando existente.")
+            if self.escrita_concorrente:
+                self._reconciliar()
+        else:
+            print(f"[INFO] Criando collection '{self.collection}' (dim={dim}, métrica=Cosine, "
+                  f"quantização={self.quantizacao}, on_disk={self.on_disk}, "
+                  f"hnsw m={self.hnsw_m} ef_construct={self.hnsw_ef_construct})")
+            self.client.create_collection(
+                collection_name=self.collection,
+                vectors_config=rest.VectorParams(size=dim, distance=rest.Distance.COSINE, on_disk=self.on_disk),
+                hnsw_config=rest.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct),
+                quantization_config=_quantizacao(self.quantizacao),
+                on_disk_payload=self.on_disk,
+            )
+        if self.escrita_concorrente:  # o modo embutido ignora índices de payload
+            criar_indices_payload(self.client, self.collection)
+
+    def _reconciliar(self) -> None:
+        """Aplica na collection existente só as opções que mudaram (evita reindexação à toa)."""
+        cfg = self.client.get_collection(self.collection).config
+        vetores = cfg.params.vectors
+        atual_on_disk = bool(getattr(vetores, "on_disk", None))
+        q = cfg.quantization_config
+        atual_q = "scalar" if isinstance(q, rest.ScalarQuantization) else \
+                  "binary" if isinstance(q, rest.BinaryQuantization) else "nenhuma"
+        mudancas = {}
+        if atual_on_disk != self.on_disk:
+            mudancas["vectors_config"] = {"": rest.VectorParamsDiff(on_disk=self.on_disk)}
+        if (cfg.hnsw_config.m, cfg.hnsw_config.ef_construct) != (self.hnsw_m, self.hnsw_ef_construct):
+            mudancas["hnsw_config"] = rest.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+        if atual_q != self.quantizacao:
+            mudancas["quantization_config"] = _quantizacao(self.quantizacao) or rest.Disabled.DISABLED
+        if mudancas:
+            print(f"[INFO] Atualizando collection '{self.collection}': {', '.join(mudancas)}")
+            self.client.update_collection(collection_name=self.collection, **mudancas)
+
+    def hashes(self, sources: list[str]) -> dict[str, str]:
+        """{point_id: content_hash} dos pontos já gravados para as fontes (scroll sem vetores)."""
+        flt = rest.Filter(must=[rest.FieldCondition(key="metadata.source", match=rest.MatchAny(any=sources))])
+        out, offset = {}, None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection, scroll_filter=flt, limit=1024, offset=offset,
+                with_payload=["metadata.content_hash"], with_vectors=False,
+            )
+            for p in points:
+                out[str(p.id)] = ((p.payload or {}).get("metadata") or {}).get("content_hash")
+            if offset is None:
+                return out
+
+    def gravar(self, docs: list, vetores: list) -> None:
+        self.client.upsert(collection_name=self.collection, wait=True, points=[
+            rest.PointStruct(id=d.metadata["point_id"], vector=v,
+                             payload={"page_content": d.page_content, "metadata": d.metadata})
+            for d, v in zip(docs, vetores)
+        ])
+
+    def remover(self, ids: list[str]) -> None:
+        if ids:
+            self.client.delete(collection_name=self.collection, points_selector=rest.PointIdsList(points=ids))
+
+    def finalizar(self) -> None:
+        """Cada upsert já é persistido pelo Qdrant; aqui só carimba a ingestão (ver versao())."""
+        try:
+            self.client.update_collection(collection_name=self.collection,
+                                          metadata={"ultima_ingestao": f"{time.time():.6f}"})
+        except Exception as e:  # servidor antigo sem metadata de collection
+            print(f"[AVISO] Não foi possível marcar a ingestão na collection: {e}")
+
+    def contar(self) -> int:
+        return self.client.count(self.collection, count_filter=None, exact=True).count
+
+    def versao(self) -> str:
+        """Pontos + marca da última ingestão: muda a cada ingestão (para invalidar caches de busca)."""
+        info = self.client.get_collection(self.collection)
+        marca = (info.config.metadata or {}).get("ultima_ingestao", "")
+        return f"{info.points_count}:{marca}"
+
+    def buscar(self, vetor: list[float], k: int = 5, filtros=None, source: str | None = None) -> list[dict]:
+        params = rest.SearchParams(
+            hnsw_ef=max(self.hnsw_ef, k),
+            quantization=(rest.QuantizationSearchParams(rescore=True, oversampling=self.oversampling)
+                          if self.quantizacao != "nenhuma" else None),
+        )
+        pontos = self.client.query_points(
+            collection_name=self.collection, query=vetor, limit=k, with_payload=True,
+            query_filter=filtro_qdrant(filtros, source), search_params=params,
+        ).points
+        return [{"id": str(p.id), "score": float(p.score),
+                 "page_content": (p.payload or {}).get("page_content", ""),
+                 "metadata": (p.payload or {}).get("metadata", {})} for p in pontos]
+
+# --------- Índice local ---------
+def _normalizar_linhas(m: np.ndarray) -> np.ndarray:
+    n = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.where(n == 0, 1.0, n)
+
+class StoreLocal:
+    """Índice vetorial embutido, persistido em `diretorio`:
+
+    - vetores.f32  matriz N×dim float32 normalizada (lida via np.memmap)
+    - pontos.json  ids + payloads (page_content/metadata), na ordem das linhas
+    - hnsw.bin     grafo HNSW (só quando N ≥ hnsw_min e hnswlib está instalado)
+
+    Escritas ficam em memória e são consolidadas em disco a cada `checkpoint_lotes`
+    lotes (sem o HNSW) e em finalizar() (com o HNSW): se a ingestão cair, o que já
+    foi consolidado tem content_hash gravado e a próxima execução pula essas linhas.
+    Vetores normalizados ⇒ produto interno = similaridade do cosseno.
+    """
+
+    def __init__(self, diretorio: str, hnsw_min: int = HNSW_MIN, hnsw_m: int | None = None,
+                 hnsw_ef_construct: int | None = None, hnsw_ef: int | None = None,
+                 checkpoint_lotes: int = CHECKPOINT_LOTES):
+        self.diretorio = diretorio
+        self.checkpoint_lotes = checkpoint_lotes
+        self._lotes = 0
+        self.hnsw_min = hnsw_min
+        self.hnsw_m = hnsw_m or HNSW_M
+        self.hnsw_ef_construct = hnsw_ef_construct or HNSW_EF_CONSTRUCT
+        self.ef = hnsw_ef or HNSW_EF
+        self.escrita_concorrente = True  # gravar() só acumula sob lock
+        self._lock = threading.Lock()
+        self._novos: dict[str, tuple[np.ndarray, dict]] = {}
+        self._removidos: set[str] = set()
+        self._carregar()
+
+    # --------- Persistência ---------
+    def _arq(self, nome: str) -> str:
+        return os.path.join(self.diretorio, nome)
+
+    def _carregar(self) -> None:
+        self.dim: int | None = None
+        self._ids: list[str] = []
+        self._payloads: list[dict] = []
+        self._mat = np.empty((0, 0), dtype=np.float32)
+        self._hnsw = None
+        if os.path.exists(self._arq("pontos.json")):
+            with open(self._arq("pontos.json"), "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            self.dim, self._ids, self._payloads = dados["dim"], dados["ids"], dados["payloads"]
+            if self._ids:
+                self._mat = np.memmap(self._arq("vetores.f32"), dtype=np.float32, mode="r",
+                                      shape=(len(self._ids), self.dim))
+            if len(self._ids) >= self.hnsw_min and os.path.exists(self._arq("hnsw.bin")):
+                try:
+                    import hnswlib
+                    self._hnsw = hnswlib.Index(space="ip", dim=self.dim)
+                    self._hnsw.load_index(self._arq("hnsw.bin"), max_elements=len(self._ids))
+                except ImportError:
+                    self._hnsw = None
+        self._pos = {pid: i for i, pid in enumerate(self._ids)}
+        self._assinatura = self._assinatura_disco()
+        # grafo faltando (checkpoint sem finalizar, ou execução interrompida): finalizar() refaz
+        self._hnsw_pendente = len(self._ids) >= self.hnsw_min and not os.path.exists(self._arq("hnsw.bin"))
+        # colunas filtráveis (mesmos campos indexados no Qdrant) + source, já convertidas
+        # para arrays numpy: (presente, valores numéricos ou texto)
+        meta = [p.get("metadata", {}) for p in self._payloads]
+        self._colunas: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for c in [*CAMPOS_PAYLOAD, "source"]:
+            s = pd.Series([m.get(c) for m in meta], dtype=object)
+            numerico = c in CAMPOS_PAYLOAD and CAMPOS_PAYLOAD[c][1] != rest.PayloadSchemaType.KEYWORD
+            valores = (pd.to_numeric(s, errors="coerce").to_numpy(dtype=float) if numerico
+                       else s.astype(str).to_numpy(dtype=object))
+            self._colunas[c] = (s.notna().to_numpy(), valores)
+
+    def finalizar(self) -> None:
+        """Consolida gravações/remoções pendentes em disco (escrita atômica), refaz o HNSW e recarrega."""
+        with self._lock:
+            if self._hnsw_pendente and not self._novos and not self._removidos:
+                self._construir_hnsw(np.asarray(self._mat, dtype=np.float32))  # só checkpoints até aqui
+                self._carregar()
+                return
+            self._consolidar(indexar=True)
+
+    def _consolidar(self, indexar: bool) -> None:
+        """Regrava vetores.f32/pontos.json com as pendências (chamar com o lock).
+
+        indexar=False (checkpoint): só descarta o hnsw.bin desatualizado — a busca cai
+        na força bruta até o finalizar() reconstruir o grafo.
+        """
+        if not self._novos and not self._removidos:
+            return
+        manter = [i for i, pid in enumerate(self._ids) if pid not in self._removidos and pid not in self._novos]
+        ids = [self._ids[i] for i in manter] + list(self._novos)
+        payloads = [self._payloads[i] for i in manter] + [p for _, p in self._novos.values()]
+        partes = [np.asarray(self._mat[manter], dtype=np.float32)] if manter else []
+        if self._novos:
+            partes.append(_normalizar_linhas(np.stack([v for v, _ in self._novos.values()])))
+        mat = np.concatenate(partes) if partes else np.empty((0, self.dim or 0), dtype=np.float32)
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._mat = np.empty((0, 0), dtype=np.float32)  # solta o memmap antes de substituir o arquivo
+        mat.astype(np.float32).tofile(self._arq("vetores.f32.tmp"))
+        with open(self._arq("pontos.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "ids": ids, "payloads": payloads}, f, ensure_ascii=False)
+        os.replace(self._arq("vetores.f32.tmp"), self._arq("vetores.f32"))
+        os.replace(self._arq("pontos.json.tmp"), self._arq("pontos.json"))
+        if indexar:
+            self._construir_hnsw(mat)
+        elif os.path.exists(self._arq("hnsw.bin")):
+            os.remove(self._arq("hnsw.bin"))
+        self._novos.clear()
+        self._removidos.clear()
+        self._carregar()
+
+    def _construir_hnsw(self, mat: np.ndarray) -> None:
+        if os.path.exists(self._arq("hnsw.bin")):
+            os.remove(self._arq("hnsw.bin"))
+        if len(mat) < self.hnsw_min:
+            return
+        try:
+            import hnswlib
+        except ImportError:
+            print("[AVISO] hnswlib não instalado: busca local seguirá por força bruta.")
+            return
+        idx = hnswlib.Index(space="ip", dim=mat.shape[1])
+        idx.init_index(max_elements=len(mat), M=self.hnsw_m, ef_construction=self.hnsw_ef_construct)
+        idx.add_items(mat, np.arange(len(mat)))
+        idx.save_index(self._arq("hnsw.bin"))
+
+    # --------- Interface ---------
+    def garantir(self, dim: int) -> None:
+        if self.dim is None:
+            self.dim = dim
+        elif self.dim != dim:
+            raise ValueError(f"Índice local em {self.diretorio} tem dim={self.dim}, embeddings têm dim={dim}. "
+                             "Apague o diretório para reindexar com outro modelo.")
+        print(f"[INFO] Índice local em '{self.diretorio}' ({len(self._ids)} vetores, dim={self.dim})")
+
+    def hashes(self, sources: list[str]) -> dict[str, str]:
+        alvo = set(sources)
+        return {pid: p["metadata"].get("content_hash") for pid, p in zip(self._ids, self._payloads)
+                if p.get("metadata", {}).get("source") in alvo}
+
+    def gravar(self, docs: list, vetores: list) -> None:
+        with self._lock:
+            for d, v in zip(docs, vetores):
+                self._novos[d.metadata["point_id"]] = (
+                    np.asarray(v, dtype=np.float32),
+                    {"page_content": d.page_content, "metadata": d.metadata},
+                )
+            self._lotes += 1
+            if self.checkpoint_lotes and self._lotes % self.checkpoint_lotes == 0:
+                self._consolidar(indexar=False)
+
+    def remover(self, ids: list[str]) -> None:
+        with self._lock:
+            self._removidos.update(ids)
+
+    def contar(self) -> int:
+        return len(self._ids)
+
+    def versao(self) -> str:
+        """Pontos + mtime do pontos.json. Se outro processo regravou o índice, recarrega antes."""
+        with self._lock:
+            if self._assinatura_disco() != self._assinatura:
+                self._carregar()
+            return f"{len(self._ids)}:{self._assinatura}"
+
+    def _assinatura_disco(self) -> str:
+        try:
+            st = os.stat(self._arq("pontos.json"))
+        except OSError:
+            return "ausente"
+        return f"{st.st_mtime_ns}-{st.st_size}"
+
+    def _mascara(self, filtros, source: str | None) -> np.ndarray | None:
+        """Mesmos filtros/semântica de busca_vetorial.filtro_qdrant, avaliados com numpy."""
+        if isinstance(filtros, str):
+            try:
+                filtros = json.loads(filtros) if filtros.strip() else []
+            except Exception:
+                filtros = []
+        conds = [c for c in (filtros if isinstance(filtros, list) else [])
+                 if isinstance(c, dict) and c.get("col") in CAMPOS_PAYLOAD]
+        if not conds and not source:
+            return None
+        m = np.ones(len(self._ids), dtype=bool)
+        if source:
+            m &= self._colunas["source"][1] == source
+        for c in conds:
+            op, val = c.get("op"), c.get("value")
+            presente, valores = self._colunas[c["col"]]
+            numerico = CAMPOS_PAYLOAD[c["col"]][1] != rest.PayloadSchemaType.KEYWORD
+            try:
+                alvo = [float(x) if numerico else str(x) for x in (val if isinstance(val, list) else [val])]
+            except (TypeError, ValueError):
+                continue
+            if op in (">", ">=", "<", "<="):
+                if numerico:
+                    v = alvo[0]
+                    m &= {">": valores > v, ">=": valores >= v, "<": valores < v, "<=": valores <= v}[op]
+            elif op in ("==", "!="):
+                igual = presente & (valores == alvo[0])
+                m &= igual if op == "==" else ~igual
+            elif op in ("in", "not_in"):
+                dentro = presente & np.isin(valores, alvo)
+                m &= dentro if op == "in" else ~dentro
+        return m
+
+    def buscar(self, vetor: list[float], k: int = 5, filtros=None, source: str | None = None) -> list[dict]:
+        if not self._ids:
+            return []
+        q = np.asarray(vetor, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        mascara = self._mascara(filtros, source)
+        candidatos = len(self._ids) if mascara is None else int(mascara.sum())
+        if candidatos == 0:
+            return []
+        k = min(k, candidatos)
+        # HNSW sem filtro a partir de hnsw_min; com filtro o callback Python por nó custa caro,
+        # então a força bruta sobre o subconjunto filtrado vence até ~5×hnsw_min candidatos
+        limiar = self.hnsw_min if mascara is None else 5 * self.hnsw_min
+        if self._hnsw is not None and candidatos >= limiar:
+            filtro = None if mascara is None else (lambda i: bool(mascara[i]))
+            self._hnsw.set_ef(max(self.ef, k))
+            rotulos, dist = self._hnsw.knn_query(q, k=k, filter=filtro)
+            linhas, scores = rotulos[0], 1.0 - dist[0]  # espaço "ip": distância = 1 - produto interno
+        else:
+            if mascara is None:  # sem fancy indexing: o produto lê direto do memmap
+                idx, sims = np.arange(len(self._ids)), self._mat @ q
+            else:
+                idx = np.flatnonzero(mascara)
+                sims = self._mat[idx] @ q
+            top = np.argpartition(-sims, k - 1)[:k] if k < len(sims) else np.arange(len(sims))
+            top = top[np.argsort(-sims[top])]
+            linhas, scores = idx[top], sims[top]
+        return [{"id": self._ids[i], "score": float(sc), **self._payloads[i]} for i, sc in zip(linhas, scores)]
+
+# --------- Fábrica ---------
+def abrir_store(collection: str | None = None, tipo: str | None = None, **opcoes) -> StoreQdrant | StoreLocal:
+    """Store configurado por env: VECTOR_STORE=local usa VECTOR_DIR/<collection>;
+    senão Qdrant em QDRANT_URL/QDRANT_API_KEY (QDRANT_URL=:memory: roda embutido).
+
+    opcoes: quantizacao, on_disk (só Qdrant), hnsw_m, hnsw_ef_construct, hnsw_ef — None = padrão do env.
+    O índice local já é memory-mapped (em disco) e não tem quantização.
+    """
+    collection = collection or os.getenv("QDRANT_COLLECTION", "desafio4_vr").strip()
+    tipo = (tipo or VECTOR_STORE).strip().lower()
+    opcoes = {k: v for k, v in opcoes.items() if v is not None}
+    if tipo == "local":
+        return StoreLocal(os.path.join(VECTOR_DIR, collection),
+                          **{k: v for k, v in opcoes.items() if k.startswith("hnsw_")})
+    url = os.getenv("QDRANT_URL", "").strip()
+    api_key = os.getenv("QDRANT_API_KEY", "").strip()
+    if url == ":memory:":
+        return StoreQdrant(QdrantClient(":memory:"), collection, **opcoes)
+    if not url or not api_key:
+        raise ValueError("Defina QDRANT_URL e QDRANT_API_KEY no .env "
+                         "(ou QDRANT_URL=:memory: / VECTOR_STORE=local para rodar sem servidor)")
+    return StoreQdrant(QdrantClient(url=url, api_key=api_key, prefer_grpc=False, timeout=120.0),
+                       collection, **opcoes)
@@ -0,0 +1,54 @@
+# test_agente.py
+# -------------------------------------------
+# Agente sem chave da OpenAI: importação leve e perguntas resolvidas pelo roteador
+# -------------------------------------------
+
+import json
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import agente
+import ferramentas
+from conftest import RAIZ
+from ferramentas import aggregate, rotear_pergunta
+
+def test_importar_nao_carrega_langchain_nem_exige_chave():
+    codigo = ("import sys, agente; "
+              "print(any(m == 'langchain' or m.startswith(('langchain.', 'langchain_openai')) for m in sys.modules))")
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True,
+                           env={"PATH": "", "OPENAI_API_KEY": "", "CACHE_RESPOSTAS_ARQUIVO": ""})
+    assert saida.returncode == 0, saida.stderr
+    assert saida.stdout.strip() == "False"
+
+def test_llm_so_exige_chave_no_primeiro_uso():
+    agente._llm.cache_clear()
+    with pytest.raises(RuntimeError, match="OPENAI_API_KEY"):
+        agente._llm()
+
+def test_roteador_responde_sem_llm():
+    esperado = json.loads(aggregate("sum", "VR_EMPRESA"))["fmt"]
+    rota = rotear_pergunta("Qual o custo total da empresa?")
+    assert rota["ok"] and rota["ferramentas"] == ["aggregate"]
+    assert esperado in rota["resposta"]
+    # responder_pergunta usa o roteador (sem chave, o LLM levantaria erro)
+    assert agente.responder_pergunta("Qual o custo total da empresa?") == rota["resposta"]
+
+def test_pergunta_composta_nao_e_roteada():
+    assert rotear_pergunta("Custo total da empresa por sindicato") is None
+
+def test_resposta_de_erro_do_roteador_nao_vai_ao_cache():
+    agente.cache_respostas.limpar()
+    resposta = agente.responder_pergunta("VR da matrícula 999999999")
+    assert "não encontrada" in resposta
+    assert agente.estatisticas_cache()["itens"] == 0
+
+def test_vr_por_matricula_usa_o_indice_do_frame_que_leu(monkeypatch):
+    v1 = pd.DataFrame({"MATRICULA": ["1", "2"], "VR_COLAB": [10.0, 20.0], "VR_EMPRESA": 0.0, "VR_PROFISSIONAL": 0.0})
+    v2 = v1.iloc[1:].assign(VR_COLAB=99.0).reset_index(drop=True)  # RESULT regravado no meio da consulta
+    versoes = iter([v1, v2, v2])
+    monkeypatch.setattr(ferramentas, "carregar_result", lambda: next(versoes))
+    r = json.loads(ferramentas.vr_por_matricula("1"))
+    assert r["ok"] and r["vr_colaborador"] == 10.0
@@ -0,0 +1,70 @@
+# test_agente_async.py
+# -------------------------------------------
+# Laço assíncrono LLM→tools com um chat model falso (sem rede, sem chave)
+# -------------------------------------------
+
+import asyncio
+import json
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import agente
+from ferramentas import aggregate, rotear_pergunta
+
+PERGUNTAS = [  # abertas: o roteador não resolve, vão ao LLM
+    "Descreva em uma frase a situação do fechamento",
+    "Faça um resumo do fechamento deste mês",
+    "Escreva uma frase curta sobre o pagamento do mês",
+]
+
+class ModeloFalso(BaseChatModel):
+    """1ª rodada: pede aggregate(sum, VR_COLAB); 2ª: responde com o "fmt" devolvido pela tool.
+    sempre_tools=True nunca responde (para testar o limite de passos)."""
+
+    sempre_tools: bool = False
+    chamadas: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "falso"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.chamadas += 1
+        ultima = messages[-1]
+        if isinstance(ultima, HumanMessage) or self.sempre_tools:
+            ai = AIMessage(content="", tool_calls=[{
+                "name": "aggregate", "args": {"op": "sum", "column": "VR_COLAB"}, "id": f"c{self.chamadas}"}])
+        else:
+            assert isinstance(ultima, ToolMessage)
+            ai = AIMessage(content=f"Total de VR: {json.loads(ultima.content)['fmt']}")
+        return ChatResult(generations=[ChatGeneration(message=ai)])
+
+def test_perguntas_do_teste_vao_ao_llm():
+    assert all(rotear_pergunta(p) is None for p in PERGUNTAS)
+
+def test_lote_usa_tools_mantem_ordem_e_cacheia():
+    agente.cache_respostas.limpar()
+    esperado = json.loads(aggregate("sum", "VR_COLAB"))["fmt"]
+    modelo = ModeloFalso()
+
+    saidas = asyncio.run(agente.aresponder_lote(PERGUNTAS, modelo=modelo, max_llm=2))
+    assert [s["pergunta"] for s in saidas] == PERGUNTAS
+    for s in saidas:
+        assert s["origem"] == "llm"
+        assert s["ferramentas"] == ["aggregate"]
+        assert s["resposta"] == f"Total de VR: {esperado}"
+    assert modelo.chamadas == 2 * len(PERGUNTAS)
+
+    de_novo = asyncio.run(agente.aresponder_lote(PERGUNTAS, modelo=modelo))
+    assert {s["origem"] for s in de_novo} == {"cache"}
+    assert modelo.chamadas == 2 * len(PERGUNTAS)
+
+def test_limite_de_passos_nao_vai_ao_cache():
+    agente.cache_respostas.limpar()
+    modelo = ModeloFalso(sempre_tools=True)
+    saida = asyncio.run(agente.aresponder_detalhado(PERGUNTAS[0], modelo=modelo))
+    assert "limite de passos" in saida["resposta"]
+    assert modelo.chamadas == agente.MAX_PASSOS_AGENTE
+    assert agente.estatisticas_cache()["itens"] == 0
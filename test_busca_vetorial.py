@@ -0,0 +1,64 @@
+# test_busca_vetorial.py
+# -------------------------------------------
+# Ingestão incremental + filtros no Qdrant embutido (":memory:") com embeddings falsos
+# -------------------------------------------
+
+import pandas as pd
+import pytest
+from qdrant_client import QdrantClient
+
+from ingest_excel_to_qdrant import iter_documents, sync_documents
+from modelos_embedding import FakeEmbeddings
+from store_vetorial import StoreQdrant
+
+FONTE = "VR_MENSAL_RESULT"
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "MATRICULA": [101, 102, 103, 104, 105, 106],
+        "SINDICATO": ["SINDPD SP", "SINDPD SP", "SINDPPD RS", "SINDPPD RS", "SITEPD PR", "SINDPD RJ"],
+        "UF_BASE": ["SP", "SP", "RS", "RS", "PR", "RJ"],
+        "EMPRESA": [1, 1, 2, 2, 1, 3],
+        "VR_COLAB": [0.0, 770.0, 660.0, 0.0, 770.0, 735.0],
+    })
+
+def _sync(store, embeddings, df):
+    return sync_documents(store, embeddings, iter_documents(df, FONTE, batch_size=2), [FONTE],
+                          embed_workers=1, upsert_workers=1)
+
+@pytest.fixture
+def store():
+    s = StoreQdrant(QdrantClient(":memory:"), "teste_vr")
+    s.garantir(32)
+    return s
+
+def test_ingestao_incremental(store):
+    emb = FakeEmbeddings(dim=32)
+    df = _frame()
+    primeira = _sync(store, emb, df)
+    assert (primeira["novos"], primeira["gravados"]) == (len(df), len(df))
+    assert store.contar() == len(df)
+
+    segunda = _sync(store, emb, df)
+    assert (segunda["inalterados"], segunda["gravados"]) == (len(df), 0)
+
+    df2 = df.iloc[1:].copy()
+    df2.loc[df2["MATRICULA"] == 102, "VR_COLAB"] = 700.0
+    terceira = _sync(store, emb, df2)
+    assert (terceira["alterados"], terceira["removidos"], terceira["gravados"]) == (1, 1, 1)
+    assert store.contar() == len(df2)
+
+@pytest.mark.parametrize("filtros, confere", [
+    ([{"col": "UF_BASE", "op": "==", "value": "RS"}], lambda m: m["UF_BASE"] == "RS"),
+    ([{"col": "VR_COLAB", "op": ">", "value": 0}], lambda m: m["VR_COLAB"] > 0),
+    ([{"col": "EMPRESA", "op": "in", "value": [2, 3]}], lambda m: m["EMPRESA"] in (2, 3)),
+    ([{"col": "SINDICATO", "op": "!=", "value": "SINDPD SP"}], lambda m: m["SINDICATO"] != "SINDPD SP"),
+])
+def test_filtros_aplicados_dentro_da_busca(store, filtros, confere):
+    emb = FakeEmbeddings(dim=32)
+    df = _frame()
+    _sync(store, emb, df)
+    hits = store.buscar(emb.embed_query("colaborador"), k=len(df), filtros=filtros, source=FONTE)
+    esperados = sum(confere(m) for m in df.to_dict("records"))
+    assert len(hits) == esperados
+    assert all(confere(h["metadata"]) for h in hits)
@@ -0,0 +1,47 @@
+# test_datas.py
+# -------------------------------------------
+# parse_datas: formato inferido, sobras valor a valor, serial do Excel e cache de formatos
+# -------------------------------------------
+
+import pandas as pd
+
+import datas
+from datas import parse_datas
+
+def _ts(*valores):
+    return [pd.Timestamp(v) if v else pd.NaT for v in valores]
+
+def test_formato_brasileiro_sem_trocar_iso_das_sobras():
+    s = pd.Series(["01/04/2024"] * datas.AMOSTRA + ["2024-04-01", "05/04/2024 08:30", "lixo", None])
+    out = parse_datas(s, "t_br.xlsx", "ADMISSAO")
+    assert datas._formatos["t_br.xlsx|ADMISSAO"] == "%d/%m/%Y"
+    assert out.iloc[-4:].tolist() == _ts("2024-04-01", "2024-04-05 08:30", None, None)
+
+def test_coluna_mista_sem_formato_unico():
+    s = pd.Series(["02/03/2024", "2024-03-04", 45383, "45384", "15.03.2024", ""])
+    out = parse_datas(s, "t_mista.xlsx", "DATA")
+    assert out.tolist() == _ts("2024-03-02", "2024-03-04", "2024-04-01", "2024-04-02", "2024-03-15", None)
+
+def test_serial_do_excel():
+    assert parse_datas(pd.Series([45383, 45384.0, None]), "t_serial.xlsx", "DATA").tolist() == \
+        _ts("2024-04-01", "2024-04-02", None)
+    assert parse_datas(pd.Series(["45383", "45384"]), "t_serial_txt.xlsx", "DATA").tolist() == \
+        _ts("2024-04-01", "2024-04-02")
+
+def test_formato_do_cache_que_nao_cobre_a_amostra_e_reinferido(monkeypatch):
+    monkeypatch.setitem(datas._formatos, "t_cache.xlsx|DATA", "%d/%m/%Y")
+    out = parse_datas(pd.Series(["2024-04-01", "2024-12-31"]), "t_cache.xlsx", "DATA")
+    assert out.tolist() == _ts("2024-04-01", "2024-12-31")
+    assert datas._formatos["t_cache.xlsx|DATA"] == "%Y-%m-%d"
+
+def test_formato_do_cache_ainda_valido_e_reaproveitado(monkeypatch):
+    monkeypatch.setitem(datas._formatos, "t_cache2.xlsx|DATA", "%d/%m/%Y")
+    assert parse_datas(pd.Series(["03/02/2024"]), "t_cache2.xlsx", "DATA").tolist() == _ts("2024-02-03")
+
+def test_texto_fica_intacto_com_somente_se_data():
+    s = pd.Series(["São Paulo", "Rio"])
+    assert parse_datas(s, "t_texto.xlsx", "DATA_LOCAL", somente_se_data=True) is s
+
+def test_coluna_ja_datetime_nao_e_reconvertida():
+    s = pd.Series(pd.to_datetime(["2024-04-01"]))
+    assert parse_datas(s, "t_dt.xlsx", "DATA") is s
@@ -0,0 +1,61 @@
+# test_esquemas.py
+# -------------------------------------------
+# esquemas.py: registro, aplicação idempotente e leitura tipada (read_excel já no formato final)
+# -------------------------------------------
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import esquemas
+from esquemas import aplicar_esquema, esquema_para, ler_planilha
+
+ESQUEMA = {
+    "renomear": {"DIAS": "DIAS_DE_FERIAS"},
+    "tipos": {"MATRICULA": "texto", "DIAS_DE_FERIAS": "numero", "INICIO": "data"},
+    "obrigatorias": ["MATRICULA"],
+}
+
+def test_esquema_para_casa_sem_acento_e_aplica_o_padrao():
+    esq = esquema_para("FÉRIAS_FORM_OK.xlsx")
+    assert esq["nome"] == "FERIAS" and esq["descartar_unnamed"] is True
+    assert esquema_para("PLANILHA_QUALQUER.xlsx") == {}
+
+def test_tipo_invalido_no_registro(tmp_path, monkeypatch):
+    yml = tmp_path / "esquemas.yml"
+    yml.write_text("datasets:\n  X:\n    tipos: {A: inteiro}\n", encoding="utf-8")
+    monkeypatch.setattr(esquemas, "ESQUEMAS_YAML", yml)
+    monkeypatch.setitem(esquemas._memo, "mtime", None)
+    with pytest.raises(ValueError, match="tipo inválido 'inteiro'"):
+        esquemas.carregar_esquemas()
+
+def test_aplicar_esquema_tipa_descarta_e_e_idempotente():
+    df = pd.DataFrame({"MATRICULA": [1, None, 3], "DIAS": ["10", "x", "5"],
+                       "INICIO": ["01/04/2025", "02/04/2025", None]})
+    uma = aplicar_esquema(df, ESQUEMA, "t_esquema.xlsx")
+    assert uma["MATRICULA"].tolist() == ["1", "3"]
+    assert uma["DIAS_DE_FERIAS"].tolist() == [10, 5]
+    assert uma["INICIO"].tolist() == [pd.Timestamp("2025-04-01"), pd.NaT]
+    pd.testing.assert_frame_equal(aplicar_esquema(uma.copy(), ESQUEMA, "t_esquema.xlsx"), uma)
+
+def test_posicoes_com_linhas_de_rotulo():
+    df = pd.DataFrame({"Unnamed: 0": ["ESTADO", "São Paulo"], "Unnamed: 1": ["VALOR", 37.5], "Unnamed: 2": [None, None]})
+    out = aplicar_esquema(df, {"posicoes": ["ESTADO", "VALOR"], "pular_linhas": 1, "tipos": {"VALOR": "numero"}})
+    assert out.columns.tolist() == ["ESTADO", "VALOR"] and out.values.tolist() == [["São Paulo", 37.5]]
+
+def test_ler_planilha_le_texto_como_texto_e_nao_le_unnamed(tmp_path):
+    wb = openpyxl.Workbook()
+    for linha in (["MATRICULA", None, "DIAS", "INICIO"], ["00123", "sobra", 10, "01/04/2025"], [456, None, 5, None]):
+        wb.active.append(linha)
+    caminho = tmp_path / "FERIAS_teste.xlsx"
+    wb.save(caminho)
+
+    df = ler_planilha(caminho, {**ESQUEMA, "descartar_unnamed": True})
+    assert df.columns.tolist() == ["MATRICULA", "DIAS_DE_FERIAS", "INICIO"]
+    assert df["MATRICULA"].tolist() == ["00123", "456"]  # dtype string no read_excel: zeros à esquerda ficam
+    assert df["DIAS_DE_FERIAS"].tolist() == [10, 5]
+
+    # mapa do sidecar (nome no arquivo -> nome final): o dtype texto vale para o nome original
+    mapa = {"MATRICULA": "MATR", "DIAS": "DIAS", "INICIO": "INICIO"}
+    df = ler_planilha(caminho, {"tipos": {"MATR": "texto"}, "descartar_unnamed": True}, mapa=mapa)
+    assert df.columns.tolist() == ["MATR", "DIAS", "INICIO"] and df["MATR"].tolist() == ["00123", "456"]
@@ -0,0 +1,63 @@
+# test_ingest_cct.py
+# -------------------------------------------
+# Fatiamento das CCTs e re-ingestão quando o fatiamento muda (sem PDF real, sem rede)
+# -------------------------------------------
+
+import random
+
+import pandas as pd
+import pytest
+from qdrant_client import QdrantClient
+
+import ingest_cct_pdfs
+from ingest_cct_pdfs import fatiar, sync_pdfs
+from modelos_embedding import FakeEmbeddings
+from store_vetorial import StoreQdrant
+
+def _texto(rng: random.Random) -> str:
+    palavras = lambda: " ".join("x" * rng.randint(1, 14) for _ in range(rng.randint(1, 12)))
+    return "\n\n".join(palavras() for _ in range(rng.randint(1, 5)))
+
+@pytest.mark.parametrize("tamanho, sobreposicao", [(4, 3), (7, 6), (13, 12), (2, 1), (1, 0), (30, 0), (50, 20)])
+def test_trecho_nunca_passa_do_tamanho(tamanho, sobreposicao):
+    rng = random.Random(tamanho * 100 + sobreposicao)
+    for _ in range(200):
+        paginas = [_texto(rng) for _ in range(rng.randint(1, 3))]
+        for _, trecho in fatiar(paginas, tamanho, sobreposicao):
+            assert 0 < len(trecho) <= tamanho
+
+def test_sobreposicao_repete_o_fim_do_trecho_anterior():
+    trechos = [t for _, t in fatiar(["aaa bbb ccc ddd eee fff"], tamanho=11, sobreposicao=4)]
+    assert trechos[0] == "aaa bbb ccc"
+    assert trechos[1].startswith("ccc ")
+
+def test_sobreposicao_invalida():
+    with pytest.raises(ValueError):
+        fatiar(["texto"], tamanho=10, sobreposicao=10)
+
+def test_mudar_o_fatiamento_refaz_os_trechos(tmp_path, monkeypatch):
+    pdf = tmp_path / "CCT_SINDPD_SP_2025.pdf"
+    pdf.write_bytes(b"%PDF-1.4 conteudo qualquer")
+    paginas = ["Cláusula primeira. " * 40, "Cláusula segunda. " * 40]
+    extraidos = []
+
+    def extrair(paths, processos):
+        extraidos.extend(paths)
+        return {p: paginas for p in paths}
+
+    monkeypatch.setattr(ingest_cct_pdfs, "extrair_pdfs", extrair)
+    store = StoreQdrant(QdrantClient(":memory:"), "teste_cct")
+    store.garantir(16)
+    conhecidos = pd.DataFrame(columns=["SINDICATO", "UF_BASE"])
+
+    def sync(tamanho):
+        return sync_pdfs(store, FakeEmbeddings(dim=16), [str(pdf)], conhecidos, processos=1,
+                         tamanho=tamanho, sobreposicao=20, embed_workers=1, upsert_workers=1)
+
+    primeira = sync(300)
+    assert primeira["processados"] == 1 and store.contar() == primeira["trechos"]
+    assert sync(300)["pulados"] == 1 and len(extraidos) == 1
+
+    menor = sync(120)
+    assert menor["processados"] == 1 and menor["trechos"] > primeira["trechos"]
+    assert store.contar() == menor["trechos"]
@@ -0,0 +1,71 @@
+# test_limpeza.py
+# -------------------------------------------
+# limpeza.py: os três modos (cabecalho, sidecar, completo) leem igual por ler_clean
+# -------------------------------------------
+
+import re
+import zipfile
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import limpeza
+
+CABECALHO = ["Matrícula ", "Nome  do Colaborador", None, "Nome  do Colaborador", "Admissão"]
+LINHAS = [
+    ["123", "Ana", "x", "Ana B", datetime(2025, 4, 1)],
+    [456, "José", None, None, datetime(2025, 4, 15)],
+]
+ABA = "xl/worksheets/sheet1.xml"
+
+@pytest.fixture
+def origem(tmp_path, monkeypatch):
+    monkeypatch.setattr(limpeza, "OUTPUT_DIR", tmp_path / "clean")
+    limpeza.garantir_pastas()
+    wb = openpyxl.Workbook()
+    wb.active.append(CABECALHO)
+    for linha in LINHAS:
+        wb.active.append(linha)
+    caminho = tmp_path / "ATIVOS.xlsx"
+    wb.save(caminho)
+    return caminho
+
+def _saida(modo: str) -> str:
+    return "ATIVOS_clean.colunas.json" if modo == "sidecar" else "ATIVOS_clean.xlsx"
+
+@pytest.mark.parametrize("modo", ["cabecalho", "sidecar"])
+def test_modos_rapidos_leem_igual_ao_completo(origem, tmp_path, modo):
+    assert limpeza.processar_arquivo(origem, modo).startswith("✅")
+    rapido = limpeza.ler_clean(tmp_path / "clean" / _saida(modo))
+    (tmp_path / "clean" / _saida(modo)).unlink()  # saída existente faz o arquivo ser ignorado
+    limpeza.processar_arquivo(origem, "completo")
+    completo = limpeza.ler_clean(tmp_path / "clean" / "ATIVOS_clean.xlsx")
+    assert list(rapido.columns) == ["MATRICULA", "NOME_DO_COLABORADOR", "NOME_DO_COLABORADOR_1", "ADMISSAO"]
+    pd.testing.assert_frame_equal(rapido, completo)
+    assert rapido["MATRICULA"].tolist() == ["123", "456"]  # esquema ATIVOS: MATRICULA texto
+
+def test_cabecalho_so_troca_a_primeira_linha(origem, tmp_path):
+    destino = tmp_path / "clean" / "ATIVOS_clean.xlsx"
+    limpeza.reescrever_cabecalho(origem, destino)
+    with zipfile.ZipFile(origem) as a, zipfile.ZipFile(destino) as b:
+        assert a.namelist() == b.namelist()
+        for nome in a.namelist():
+            antes, depois = a.read(nome), b.read(nome)
+            if nome == ABA:  # tudo depois da 1ª linha segue byte a byte
+                antes, depois = antes.split(b"</row>", 1)[1], depois.split(b"</row>", 1)[1]
+            assert antes == depois, nome
+
+def test_celula_sem_referencia_cai_no_modo_completo(origem, tmp_path, capsys):
+    sem_r = tmp_path / "ATIVOS_sem_r.xlsx"
+    with zipfile.ZipFile(origem) as zin, zipfile.ZipFile(sem_r, "w") as zout:
+        for info in zin.infolist():
+            dados = zin.read(info)
+            if info.filename == ABA:  # r é opcional no OOXML
+                dados = re.sub(rb' r="[A-Z]+1"', b"", dados, count=2)
+            zout.writestr(info, dados)
+    assert limpeza.processar_arquivo(sem_r, "cabecalho") == "✅ salvo: ATIVOS_sem_r_clean.xlsx"
+    assert "usando o modo completo" in capsys.readouterr().out
+    df = limpeza.ler_clean(tmp_path / "clean" / "ATIVOS_sem_r_clean.xlsx")
+    assert list(df.columns)[:2] == ["MATRICULA", "NOME_DO_COLABORADOR"]
@@ -0,0 +1,38 @@
+# test_normalizacao.py
+# -------------------------------------------
+# normalizar_texto: mesmo resultado com e sem pyarrow (as chaves dos joins dependem disso)
+# -------------------------------------------
+
+import itertools
+
+import pandas as pd
+import pytest
+
+import normalizacao
+from normalizacao import normalizar_texto
+
+ENTRADAS = [
+    "  Sindpd  SP ", "São Paulo", "x　y", "a\tb\nc", "a\x0bb", "a\x1cb", "a\x1fb", "a\x85b",
+    "a b", "straße", "ﬁm", "ŉ", "Ação ÇÃO", "ÉSTAGIÁRIO", "", "   ", None,
+]
+OPCOES = list(itertools.product([False, True], repeat=3))  # (maiusculas, sem_acentos, vazio_na)
+
+@pytest.mark.skipif(normalizacao.pa is None, reason="sem pyarrow")
+@pytest.mark.parametrize("opcoes", OPCOES)
+def test_arrow_e_python_dao_o_mesmo_resultado(opcoes):
+    s = pd.Series(ENTRADAS, dtype="string")
+    python = normalizacao._normalizar_python(s, *opcoes)
+    arrow = normalizacao._normalizar_arrow(s, *opcoes)
+    assert python.tolist() == arrow.tolist()
+
+def test_espacos_acentos_e_maiusculas():
+    s = pd.Series([" são  paulo ", "straße", "", None])
+    assert normalizar_texto(s, maiusculas=True).tolist() == ["SÃO PAULO", "STRASSE", pd.NA, pd.NA]
+    assert normalizar_texto(s, sem_acentos=True).tolist() == ["sao paulo", "strae", pd.NA, pd.NA]
+    assert normalizar_texto(s, vazio_na=False).tolist() == ["são paulo", "straße", "", pd.NA]
+
+def test_baixa_cardinalidade_igual_ao_caminho_direto():
+    s = pd.Series(["sindpd  sp", "SINDPD SP ", None, "sitepd pr"] * 50, index=range(100, 300), name="SINDICATO")
+    memoizado = normalizar_texto(s, maiusculas=True)
+    assert memoizado.index.equals(s.index) and memoizado.name == "SINDICATO"
+    assert memoizado.tolist() == normalizacao._normalizar(s.astype("string"), True, False, True).tolist()
@@ -0,0 +1,33 @@
+# test_painel.py
+# -------------------------------------------
+# Grade do dashboard: ordenação (vazios no fim) e máscara de filtros reaproveitada
+# -------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel import PainelResult
+
+@pytest.fixture
+def painel():
+    return PainelResult(pd.DataFrame({
+        "MATRICULA": ["10", "11", "20", "21"],
+        "UF_BASE": ["SP", "SP", "RS", None],
+        "VR_COLAB": [5.0, np.nan, 7.0, 1.0],
+        "VR_EMPRESA": 0.0, "VR_PROFISSIONAL": 0.0,
+    }))
+
+@pytest.mark.parametrize("asc, esperado", [(True, ["21", "10", "20", "11"]), (False, ["20", "10", "21", "11"])])
+def test_vazios_ficam_no_fim_nos_dois_sentidos(painel, asc, esperado):
+    janela, total = painel.pagina(ordenar_por="VR_COLAB", asc=asc)
+    assert janela["MATRICULA"].tolist() == esperado and total == 4
+
+def test_contar_e_pagina_usam_a_mesma_mascara(painel):
+    filtros = {"UF_BASE": ["SP"], "MATRICULA_PREFIXO": "1"}
+    assert painel.contar(filtros) == 2
+    m = painel.mascara(dict(filtros))
+    assert painel.mascara(filtros) is m
+    janela, total = painel.pagina(filtros, "VR_COLAB", False, pagina=1, tamanho=1)
+    assert total == 2 and janela["MATRICULA"].tolist() == ["10"]
+    assert painel.mascara({"UF_BASE": ["RS"]}) is not m
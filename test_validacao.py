@@ -0,0 +1,72 @@
+# test_validacao.py
+# -------------------------------------------
+# compilar/validar com regras e tabelas em memória (uma violação por regra)
+# -------------------------------------------
+
+import pandas as pd
+import pytest
+
+from validacao import compilar, validar
+
+def _regra(regra, tabela="RESULT", colunas=("X",), nivel="erro", **extra):
+    return {"descricao": regra, "regra": regra, "tabela": tabela, "colunas": list(colunas), "nivel": nivel, **extra}
+
+def _regras(*validacoes, obrigatorias=()):
+    return {"regras_negocio": {"validacoes": list(validacoes)}, "layout": {"required_sources": list(obrigatorias)}}
+
+# --------- compilar ---------
+def test_compilar_uma_checagem_por_coluna_e_colunas_em_uma_so():
+    checagens = compilar(_regras(
+        "texto livre do formato antigo",
+        _regra("nao_negativo", colunas=["A", "B"]),
+        _regra("colunas", colunas=["A", "B", "C"]),
+        obrigatorias=["MATRICULA"]))
+    assert [(c["regra"], c["coluna"]) for c in checagens] == [
+        ("nao_negativo", "A"), ("nao_negativo", "B"), ("colunas", ["A", "B", "C"]), ("colunas", ["MATRICULA"])]
+
+@pytest.mark.parametrize("regra, mensagem", [
+    (_regra("maior_que"), "regra/nivel inválido"),
+    (_regra("unico", nivel="fatal"), "regra/nivel inválido"),
+    ({"regra": "unico", "colunas": ["X"]}, "precisa de tabela"),
+    (_regra("referencia", em={"tabela": "ATIVOS"}), "em.tabela e em.coluna"),
+])
+def test_compilar_rejeita_regra_mal_escrita(regra, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        compilar(_regras(regra))
+
+# --------- validar ---------
+def _violacoes(regra, tabelas):
+    return validar(_regras(regra), tabelas=tabelas)
+
+def test_nao_negativo():
+    rel = _violacoes(_regra("nao_negativo"), {"RESULT": pd.DataFrame({"MATRICULA": ["1", "2"], "X": [-1.0, 5.0]})})
+    assert rel[["coluna", "violacoes", "exemplos"]].values.tolist() == [["X", 1, "1"]]
+
+def test_nao_nulo_conta_texto_so_de_espacos():
+    df = pd.DataFrame({"X": ["a", None, " \xa0 ", "b"]})
+    rel = _violacoes(_regra("nao_nulo"), {"RESULT": df})
+    assert rel[["violacoes", "exemplos"]].values.tolist() == [[2, "linha 3; linha 4"]]
+
+def test_unico():
+    rel = _violacoes(_regra("unico"), {"RESULT": pd.DataFrame({"X": ["1", "2", "1", None, None]})})
+    assert rel[["violacoes", "exemplos"]].values.tolist() == [[2, "1"]]
+
+def test_referencia_ignora_caixa_e_espacos():
+    tabelas = {"ATIVOS": pd.DataFrame({"X": ["sindpd  sp", "SITEPD PR", None]}),
+               "DIAS_UTEIS": pd.DataFrame({"SINDICATO": ["SINDPD SP "]})}
+    rel = _violacoes(_regra("referencia", tabela="ATIVOS", em={"tabela": "DIAS_UTEIS", "coluna": "SINDICATO"}), tabelas)
+    assert rel[["violacoes", "exemplos"]].values.tolist() == [[1, "SITEPD PR"]]
+
+def test_referencia_como_uf():
+    tabelas = {"RESULT": pd.DataFrame({"X": ["SP", "RS", "PR"]}),
+               "SINDICATO_VALOR": pd.DataFrame({"ESTADO": ["São Paulo", "Rio Grande do Sul", "Atlântida"]})}
+    regra = _regra("referencia", em={"tabela": "SINDICATO_VALOR", "coluna": "ESTADO", "como": "uf"})
+    assert _violacoes(regra, tabelas)[["violacoes", "exemplos"]].values.tolist() == [[1, "PR"]]
+
+def test_colunas_ausentes():
+    rel = _violacoes(_regra("colunas", colunas=["X", "Y", "Z"]), {"RESULT": pd.DataFrame({"X": [1]})})
+    assert rel[["regra", "coluna", "violacoes"]].values.tolist() == [["colunas", "Y; Z", 2]]
+
+def test_tabela_ausente_e_sem_violacoes():
+    assert _violacoes(_regra("unico"), {})["exemplos"].tolist() == ["tabela ausente"]
+    assert _violacoes(_regra("unico"), {"RESULT": pd.DataFrame({"X": ["1", "2"]})}).empty
@@ -0,0 +1,206 @@
+# validacao.py
+# -------------------------------------------
+# Validação dos dados do pipeline a partir do regras.yml
+# (regras_negocio.validacoes + layout.required_sources).
+# -------------------------------------------
+# As regras declarativas são compiladas em checagens vetorizadas por coluna
+# (sem loop por linha) e executadas de uma vez sobre as saídas das etapas:
+# cada tabela (validacao.tabelas) é lida UMA vez, só com as colunas que as
+# regras usam. O resultado é um relatório compacto (uma linha por regra/coluna
+# violada, com contagem e exemplos), gravado em validacao.relatorio.
+#
+# Uso: python validacao.py [--regras regras.yml]   (etapa do jobs.py, depois do VR.py)
+# Sai com código 1 se alguma regra de nivel "erro" for violada — o job para
+# antes do export.
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from scripts.normalizacao import normalizar_texto  # mesma normalização do VR.py nas chaves
+from scripts.ufs import nome_estado_para_uf        # mesma tabela estado -> UF do VR.py
+
+RAIZ = Path(__file__).resolve().parent
+REGRAS_YAML = os.getenv("REGRAS_YAML", str(RAIZ / "regras.yml"))
+EXEMPLOS = 5
+REGRAS = ("nao_negativo", "nao_nulo", "unico", "referencia", "colunas")
+NIVEIS = ("erro", "aviso")
+
+# --------- Compilação ---------
+def compilar(regras: dict) -> list[dict]:
+    """Lista plana de checagens {descricao, regra, tabela, coluna, nivel, em} (uma por coluna;
+    a regra 'colunas' vira uma só checagem, com a lista de colunas exigidas).
+
+    layout.required_sources vira uma checagem 'colunas' (presença) sobre o RESULT.
+    Regras mal escritas falham aqui, antes de qualquer leitura de planilha.
+    """
+    checagens = []
+    for i, r in enumerate((regras.get("regras_negocio") or {}).get("validacoes") or [], start=1):
+        if not isinstance(r, dict):  # texto livre (formato antigo): só documentação
+            continue
+        regra, nivel = r.get("regra"), r.get("nivel", "erro")
+        if regra not in REGRAS or nivel not in NIVEIS:
+            raise ValueError(f"regras.yml: validação #{i} com regra/nivel inválido ({regra}/{nivel})")
+        if not r.get("tabela"):
+            raise ValueError(f"regras.yml: validação #{i} ({regra}) precisa de tabela")
+        if regra == "referencia" and not {"tabela", "coluna"} <= set(r.get("em") or {}):
+            raise ValueError(f"regras.yml: validação #{i} (referencia) precisa de em.tabela e em.coluna")
+        if regra == "colunas":  # presença: uma checagem com a lista inteira
+            checagens.append({"descricao": r.get("descricao", regra), "regra": regra, "tabela": r["tabela"],
+                              "coluna": list(r.get("colunas") or []), "nivel": nivel, "em": None})
+            continue
+        for col in r.get("colunas") or []:
+            checagens.append({"descricao": r.get("descricao", regra), "regra": regra, "tabela": r["tabela"],
+                              "coluna": col, "nivel": nivel, "em": r.get("em")})
+    obrigatorias = (regras.get("layout") or {}).get("required_sources") or []
+    if obrigatorias:
+        checagens.append({"descricao": "Colunas mínimas do RESULT (layout.required_sources)",
+                          "regra": "colunas", "tabela": "RESULT", "coluna": list(obrigatorias),
+                          "nivel": "erro", "em": None})
+    return checagens
+
+def _colunas_por_tabela(checagens: list[dict]) -> dict[str, set]:
+    """Tabela -> colunas que alguma checagem usa (inclusive as referenciadas)."""
+    usadas: dict[str, set] = {}
+    for c in checagens:
+        if c["regra"] == "colunas":
+            usadas.setdefault(c["tabela"], set())
+            continue
+        usadas.setdefault(c["tabela"], set()).add(c["coluna"])
+        if c["em"]:
+            usadas.setdefault(c["em"]["tabela"], set()).add(c["em"]["coluna"])
+    return usadas
+
+# --------- Leitura ---------
+def ler_tabelas(caminhos: dict, usadas: dict[str, set], base: Path = RAIZ) -> dict:
+    """Lê cada tabela uma vez, só com as colunas usadas. Tabela ausente -> None."""
+    tabelas = {}
+    for nome, cols in usadas.items():
+        caminho = caminhos.get(nome)
+        p = Path(caminho) if caminho else None
+        if p is not None and not p.is_absolute():
+            p = base / p
+        if p is None or not p.exists():
+            tabelas[nome] = None
+            continue
+        # cabeçalho primeiro (barato): usecols com coluna inexistente quebraria a leitura
+        cabecalho = list(pd.read_excel(p, engine="openpyxl", nrows=0).columns)
+        df = pd.read_excel(p, engine="openpyxl", usecols=[c for c in cabecalho if c in cols] or None)
+        df.attrs["colunas_arquivo"] = cabecalho
+        tabelas[nome] = df
+    return tabelas
+
+# --------- Checagens (vetorizadas) ---------
+def _chave_texto(s: pd.Series) -> pd.Series:
+    """Chave como o VR.py casa SINDICATO/ESTADO: espaços Unicode colapsados, maiúsculas (vazio -> NA)."""
+    return normalizar_texto(s, maiusculas=True)
+
+def _uf_de_estado(s: pd.Series) -> pd.Series:
+    """Nome do estado por extenso -> UF, como o VR.py monta o UF_REF da base sindicato x valor."""
+    return s.map(nome_estado_para_uf)
+
+def _mascara(c: dict, col: pd.Series, tabelas: dict) -> pd.Series | str:
+    """Máscara booleana das linhas violadas, ou texto explicando por que não dá para checar."""
+    if c["regra"] == "nao_negativo":
+        return pd.to_numeric(col, errors="coerce") < 0
+    if c["regra"] == "nao_nulo":
+        return _chave_texto(col).isna()
+    if c["regra"] == "unico":
+        return col.notna() & col.duplicated(keep=False)
+    ref = tabelas.get(c["em"]["tabela"])
+    if ref is None or c["em"]["coluna"] not in ref.columns:
+        return f"referência ausente: {c['em']['tabela']}.{c['em']['coluna']}"
+    validos = ref[c["em"]["coluna"]]
+    validos = _uf_de_estado(validos) if c["em"].get("como") == "uf" else _chave_texto(validos)
+    chave = _chave_texto(col)
+    return chave.notna() & ~chave.isin(validos.dropna())
+
+def _exemplos(df: pd.DataFrame, c: dict, mask: pd.Series) -> str:
+    linhas = df.loc[mask]
+    if c["regra"] == "referencia":  # o valor que não casou já é o exemplo útil
+        valores = linhas[c["coluna"]].dropna().astype(str).unique()[:EXEMPLOS]
+    elif "MATRICULA" in df.columns and c["coluna"] != "MATRICULA":
+        valores = linhas["MATRICULA"].astype(str).unique()[:EXEMPLOS]
+    elif c["regra"] == "unico":
+        valores = linhas[c["coluna"]].astype(str).unique()[:EXEMPLOS]
+    else:
+        valores = [f"linha {i + 2}" for i in linhas.index[:EXEMPLOS]]  # linha no Excel (cabeçalho = 1)
+    return "; ".join(map(str, valores))
+
+def validar(regras: dict, base: Path = RAIZ, tabelas: dict | None = None) -> pd.DataFrame:
+    """Executa todas as checagens e devolve o relatório (só regras violadas).
+    tabelas: {nome: DataFrame} já carregadas (senão lê validacao.tabelas do disco)."""
+    checagens = compilar(regras)
+    if tabelas is None:
+        tabelas = ler_tabelas((regras.get("validacao") or {}).get("tabelas") or {},
+                              _colunas_por_tabela(checagens), base)
+    linhas = []
+
+    def violacao(c: dict, coluna: str, qtd: int, total: int | None, exemplos: str) -> None:
+        linhas.append({"nivel": c["nivel"], "regra": c["regra"], "tabela": c["tabela"], "coluna": coluna,
+                       "violacoes": qtd, "linhas": total, "exemplos": exemplos, "descricao": c["descricao"]})
+
+    for c in checagens:
+        df = tabelas.get(c["tabela"])
+        if df is None:
+            violacao(c, str(c["coluna"]), 1, None, "tabela ausente")
+            continue
+        if c["regra"] == "colunas":
+            faltam = [col for col in c["coluna"] if col not in df.attrs.get("colunas_arquivo", df.columns)]
+            if faltam:
+                violacao(c, "; ".join(faltam), len(faltam), None, "coluna ausente")
+            continue
+        if c["coluna"] not in df.columns:
+            violacao(c, c["coluna"], 1, len(df), "coluna ausente")
+            continue
+        mask = _mascara(c, df[c["coluna"]], tabelas)
+        if isinstance(mask, str):
+            violacao(c, c["coluna"], 1, len(df), mask)
+            continue
+        qtd = int(mask.sum())
+        if qtd:
+            violacao(c, c["coluna"], qtd, len(df), _exemplos(df, c, mask))
+    relatorio = pd.DataFrame(linhas, columns=["nivel", "regra", "tabela", "coluna", "violacoes",
+                                              "linhas", "exemplos", "descricao"])
+    return relatorio.astype({"violacoes": "int64", "linhas": "Int64"})
+
+# --------- CLI ---------
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Valida as saídas do pipeline conforme o regras.yml")
+    ap.add_argument("--regras", default=REGRAS_YAML, help="caminho do regras.yml (padrão: env REGRAS_YAML)")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    regras_path = Path(args.regras)
+    with open(regras_path, "r", encoding="utf-8") as f:
+        regras = yaml.safe_load(f) or {}
+    relatorio = validar(regras, base=regras_path.resolve().parent)
+    segundos = round(time.perf_counter() - t0, 2)
+
+    destino = (regras.get("validacao") or {}).get("relatorio")
+    if destino:
+        destino = Path(destino) if Path(destino).is_absolute() else regras_path.resolve().parent / destino
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        relatorio.to_excel(destino, index=False)
+
+    if relatorio.empty:
+        print(f"[OK] Validação: nenhuma violação ({len(compilar(regras))} checagens, {segundos}s).")
+        return
+    with pd.option_context("display.max_colwidth", 60, "display.width", 200):
+        print(relatorio.drop(columns=["descricao"]).to_string(index=False))
+    erros = relatorio[relatorio["nivel"] == "erro"]
+    avisos = len(relatorio) - len(erros)
+    if destino:
+        print(f"[INFO] Relatório de validação: {destino}")
+    if not erros.empty:
+        print(f"[ERRO] Validação: {len(erros)} regra(s) de erro violada(s), {avisos} aviso(s) ({segundos}s).")
+        sys.exit(1)
+    print(f"[AVISO] Validação: {avisos} aviso(s), nenhum erro ({segundos}s).")
+
+if __name__ == "__main__":
+    main()